@@ -0,0 +1,201 @@
+import itertools
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from heap import IndexedHeap
+from pathfinding import (
+    MASK_STEPS,
+    is_valid,
+    neighbor_masks,
+    octile_heuristic,
+    path_cost,
+)
+
+# One path found by ara_star. bound is the proven suboptimality bound: the cost of
+# the path is at most bound times the optimal cost. expanded counts the expansions
+# of the whole anytime search so far.
+AnytimeSolution = namedtuple(
+    "AnytimeSolution", ["path", "cost", "bound", "epsilon", "expanded"]
+)
+
+
+class _Budget:
+    """
+    The time and node limits of an anytime search.
+    """
+
+    def __init__(self, time_limit, node_budget):
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.node_budget = node_budget
+        self.expanded = 0
+
+    def exhausted(self):
+        if self.node_budget is not None and self.expanded >= self.node_budget:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+
+def ara_star(
+    grid,
+    start,
+    goal,
+    epsilon=3.0,
+    epsilon_step=0.5,
+    time_limit=None,
+    node_budget=None,
+    heuristic=octile_heuristic,
+    masks=None,
+    observer=None,
+):
+    """
+    Anytime Repairing A* (ARA*, Likhachev et al. 2003). Runs weighted A* with a
+    large epsilon to find a first path quickly and then repeatedly lowers epsilon
+    and repairs the search, reusing the g-scores of the previous iterations, until
+    the path is proven optimal or the budget runs out.
+
+    Nodes that improve after they have been expanded in the current iteration are
+    kept aside and only reopened in the next one, so no node is expanded twice per
+    iteration. Every improved path is yielded with its proven bound: the smaller of
+    epsilon and the path cost divided by the smallest unweighted f-score of the
+    nodes still to be expanded.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        epsilon (float, optional): The weight of the first iteration. Defaults to 3.
+        epsilon_step (float, optional): How much epsilon is lowered after each
+            iteration, down to 1. Defaults to 0.5.
+        time_limit (float, optional): Seconds after which no more iterations are
+            started or continued. Defaults to no limit.
+        node_budget (int, optional): The number of expansions after which the
+            search stops. Defaults to no limit.
+        heuristic (callable, optional): A consistent heuristic(node, goal).
+            Defaults to octile_heuristic.
+        masks (numpy.ndarray, optional): See astar.
+        observer (callable, optional): Called as observer("expand", node) for every
+            expanded node.
+    Yields:
+        AnytimeSolution: Each path that is cheaper than the previous one or comes
+        with a tighter bound. The last one has bound 1 unless the budget ran out.
+        When start is the goal, the only solution is [start] with bound 1.
+    """
+    if not is_valid(start[0], start[1], grid) or not is_valid(goal[0], goal[1], grid):
+        return
+    if start == goal:
+        yield AnytimeSolution([start], 0, 1.0, epsilon, 0)
+        return
+    if masks is None:
+        masks = neighbor_masks(grid)
+    budget = _Budget(time_limit, node_budget)
+
+    g_score = {start: 0}
+    came_from = {}
+    unexplored_nodes = IndexedHeap()
+    closed = set()
+    inconsistent = set()
+
+    def key(node):
+        g = g_score[node]
+        return (g + epsilon * heuristic(node, goal), -g)
+
+    def improve_path():
+        """
+        Expands nodes until the goal is the best node on the open list. Returns
+        False if the budget ran out first.
+        """
+        while unexplored_nodes and g_score.get(goal, np.inf) > (
+            unexplored_nodes.peek()[1][0]
+        ):
+            if budget.exhausted():
+                return False
+            current, _ = unexplored_nodes.pop()
+            if observer is not None:
+                observer("expand", current)
+            budget.expanded += 1
+            closed.add(current)
+            current_g = g_score[current]
+            x, y = current
+            for dx, dy, cost in MASK_STEPS[masks[x, y]]:
+                neighbor = (x + dx, y + dy)
+                new_g_score = current_g + cost
+                if new_g_score >= g_score.get(neighbor, np.inf):
+                    continue
+                g_score[neighbor] = new_g_score
+                came_from[neighbor] = current
+                if neighbor in closed:
+                    inconsistent.add(neighbor)
+                else:
+                    unexplored_nodes.push(neighbor, key(neighbor))
+        return True
+
+    def suboptimality_bound():
+        lower_bound = min(
+            (
+                g_score[node] + heuristic(node, goal)
+                for node in itertools.chain(unexplored_nodes, inconsistent)
+            ),
+            default=np.inf,
+        )
+        if lower_bound == 0:
+            return 1.0  # Nothing to improve on a path of cost 0
+        return max(1.0, min(epsilon, g_score[goal] / lower_bound))
+
+    def path_to_goal():
+        path = [goal]
+        while path[-1] != start:
+            path.append(came_from[path[-1]])
+        return path[::-1]
+
+    unexplored_nodes.push(start, key(start))
+    best = None
+    while improve_path():
+        if goal not in g_score:
+            return  # No path found
+        bound = suboptimality_bound()
+        if (
+            best is None
+            or g_score[goal] < best.cost - 1e-9
+            or bound < best.bound - 1e-9
+        ):
+            path = path_to_goal()
+            best = AnytimeSolution(
+                path, path_cost(path), bound, epsilon, budget.expanded
+            )
+            yield best
+        if bound <= 1 or epsilon <= 1:
+            return
+
+        # Lower epsilon, reopen the nodes that improved after their expansion and
+        # reorder the open list by the new weight
+        epsilon = max(1.0, epsilon - epsilon_step)
+        for node in inconsistent:
+            unexplored_nodes.push(node, key(node))
+        inconsistent.clear()
+        for node in list(unexplored_nodes):
+            unexplored_nodes.push(node, key(node))
+        closed.clear()
+
+
+def anytime_astar(grid, start, goal, time_limit=None, node_budget=None, **kwargs):
+    """
+    Runs ara_star until the path is proven optimal or the budget runs out and
+    returns the best path found.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        time_limit (float, optional): See ara_star.
+        node_budget (int, optional): See ara_star.
+        **kwargs: Passed on to ara_star, e.g. epsilon.
+    Returns:
+        AnytimeSolution or None: The last solution, None if no path was found
+        within the budget.
+    """
+    solution = None
+    for solution in ara_star(
+        grid, start, goal, time_limit=time_limit, node_budget=node_budget, **kwargs
+    ):
+        pass
+    return solution
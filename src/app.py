@@ -1,11 +1,17 @@
-import time
-
 import pygame
 
 from helpers import convert_map_to_grid
-from pathfinding import astar, jps
-from settings import A_STAR_COLOR, JPS_COLOR
-from ui import draw_button, draw_grid, handle_mouse_click
+from pathfinding import astar, jps, neighbor_masks
+from search_stats import run_search
+from search_trace import TraceRecorder
+from settings import A_STAR_COLOR, DRAW_IN_PROGRESS, JPS_COLOR, RECORD_TRACE
+from ui import (
+    TraceReplay,
+    draw_button,
+    draw_grid,
+    handle_mouse_click,
+    search_observer,
+)
 
 
 class App:
@@ -15,6 +21,7 @@ class App:
         The method listens for mouse clicks to set the start and goal positions on the grid.
         It also initiates the comparison of the A* and JPS pathfinding algorithms when a button on the screen is clicked.
         The results of the comparison, including path lengths and execution times, are printed to the console.
+        If the searches were recorded (RECORD_TRACE without DRAW_IN_PROGRESS), they are replayed one after the other.
         The paths found by both algorithms are then drawn on the grid.
 
         Events handled:
@@ -25,6 +32,7 @@ class App:
         """
         pygame.init()
         grid, _, _ = convert_map_to_grid()
+        masks = neighbor_masks(grid)  # Shared by all the searches on this grid
         comparison_started = False
         goal, start = None, None
 
@@ -53,47 +61,76 @@ class App:
                     print("Please set the start and goal positions on the grid.")
                     comparison_started = False
                     continue
-                astar_path, astar_time, astar_length = self.run_algorithm(
-                    astar, grid, start, goal
+                recorders = {}
+                if RECORD_TRACE and not DRAW_IN_PROGRESS:
+                    recorders = {
+                        name: TraceRecorder(grid.shape) for name in ("A*", "JPS")
+                    }
+                astar_result = self.run_algorithm(
+                    astar, grid, start, goal, recorders.get("A*"), masks
                 )
-                jps_path, jps_time, jps_length = self.run_algorithm(
-                    jps, grid, start, goal
+                jps_result = self.run_algorithm(
+                    jps, grid, start, goal, recorders.get("JPS"), masks
                 )
 
                 print("Comparison Results:")
-                print(f"A* Path Length: {astar_length}")
-                print(f"A* Time: {astar_time:.4f} seconds")
-                # print(f"A* Path: {astar_path}")
-                print(f"JPS Path Length: {jps_length}")
-                print(f"JPS Time: {jps_time:.4f} seconds")
-                # print(f"JPS Path: {jps_path}")
-                print("JPS is faster" if jps_time < astar_time else "A* is faster")
+                self.print_result("A*", astar_result)
+                self.print_result("JPS", jps_result)
+                print(
+                    "JPS is faster"
+                    if jps_result.stats.cpu_time < astar_result.stats.cpu_time
+                    else "A* is faster"
+                )
 
                 comparison_started = False
-                self.draw_paths(grid, astar_path, jps_path)
+                for name, recorder in recorders.items():
+                    print(f"Replaying {name}: space pauses, arrows scrub, click skips")
+                    if not TraceReplay(grid, recorder.trace(start, goal)).run():
+                        pygame.quit()
+                        return
+                self.draw_paths(grid, astar_result.path, jps_result.path)
 
             draw_button()
 
-    def run_algorithm(self, algorithm, grid, start, goal):
+    def run_algorithm(self, algorithm, grid, start, goal, recorder=None, masks=None):
         """
         Executes the given pathfinding algorithm on the provided grid.
+        The search is drawn while it runs if DRAW_IN_PROGRESS is set to True, otherwise
+        it is recorded into recorder if one is given.
 
         Args:
-            algorithm (callable): The pathfinding algorithm to execute. It should take three arguments: grid, start, and goal.
+            algorithm (callable): The pathfinding algorithm to execute. It should take the arguments grid, start and goal,
+                and accept the observer and stats keyword arguments.
             grid (list): The grid on which the pathfinding algorithm will be executed.
             start (tuple): The starting point coordinates (x, y) on the grid.
             goal (tuple): The goal point coordinates (x, y) on the grid.
+            recorder (TraceRecorder, optional): Records the search for replaying it later.
+            masks (numpy.ndarray, optional): The neighbour masks of the grid, computed
+                once and passed to every search.
 
         Returns:
-            tuple: A tuple containing:
-                - path (list): The path found by the algorithm from start to goal.
-                - elapsed_time (float): The time taken to execute the algorithm.
-                - path_length (int): The length of the path found by the algorithm.
+            SearchResult: The path, its length and cost, and the search's counters
+            and times (see search_stats.run_search).
+        """
+        observer = search_observer(grid, start, goal) if DRAW_IN_PROGRESS else recorder
+        return run_search(algorithm, grid, start, goal, observer=observer, masks=masks)
+
+    def print_result(self, name, result):
+        """
+        Prints the path and the work done by one search.
+        Args:
+            name (str): The name of the algorithm.
+            result (SearchResult): The result from run_algorithm.
         """
-        start_time = time.process_time()
-        path, path_length = algorithm(grid, start, goal)
-        elapsed_time = time.process_time() - start_time
-        return path, elapsed_time, path_length
+        stats = result.stats
+        print(f"{name} Path Length: {result.length}")
+        print(f"{name} Path Cost: {result.cost:.2f}")
+        print(f"{name} Time: {stats.cpu_time:.4f} seconds")
+        print(
+            f"{name} Expanded: {stats.expanded}, generated: {stats.generated}, "
+            f"heap pushes/pops: {stats.pushes}/{stats.pops}, "
+            f"peak open list: {stats.peak_open}, jump steps: {stats.jump_steps}"
+        )
 
     def draw_paths(self, grid, astar_path, jps_path):
         """
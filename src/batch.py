@@ -0,0 +1,107 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pathfinding import astar, neighbor_masks
+
+# State of a worker process, set by _attach_grid
+_worker_grid = None
+_worker_masks = None
+_worker_memory = None
+_worker_algorithm = None
+
+
+def _attach_grid(name, shape, dtype, algorithm):
+    """
+    Initializer of the worker processes: maps the grid and its neighbour masks from
+    shared memory without copying them. The masks follow the grid in the block.
+    """
+    global _worker_grid, _worker_masks, _worker_memory, _worker_algorithm
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    dtype = np.dtype(dtype)
+    grid_bytes = int(np.prod(shape)) * dtype.itemsize
+    _worker_grid = np.ndarray(shape, dtype=dtype, buffer=_worker_memory.buf)
+    _worker_grid.flags.writeable = False
+    _worker_masks = np.ndarray(
+        shape, dtype=np.uint8, buffer=_worker_memory.buf, offset=grid_bytes
+    )
+    _worker_masks.flags.writeable = False
+    _worker_algorithm = algorithm
+
+
+def _share_grid(grid):
+    """
+    Copies a contiguous grid and its neighbour masks into a new shared memory
+    block, in the layout _attach_grid expects. The caller unlinks the block.
+    """
+    masks = neighbor_masks(grid)
+    memory = shared_memory.SharedMemory(
+        create=True, size=max(grid.nbytes + masks.nbytes, 1)
+    )
+    np.ndarray(grid.shape, dtype=grid.dtype, buffer=memory.buf)[...] = grid
+    shared_masks = np.ndarray(
+        masks.shape, dtype=np.uint8, buffer=memory.buf, offset=grid.nbytes
+    )
+    shared_masks[...] = masks
+    return memory
+
+
+def _solve_chunk(queries):
+    return [
+        _worker_algorithm(_worker_grid, start, goal, masks=_worker_masks)
+        for start, goal in queries
+    ]
+
+
+def _chunks(queries, chunksize):
+    queries = iter(queries)
+    while True:
+        chunk = list(islice(queries, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_many(grid, queries, algorithm=astar, workers=None, chunksize=64):
+    """
+    Solves many start/goal queries on the same grid in a pool of worker processes.
+    The grid and its neighbour masks are computed and copied once into shared
+    memory and every worker maps them directly, so only the queries and the results
+    are pickled and no query rebuilds the masks. Queries are sent to the
+    workers in chunks, a bounded number of chunks at a time, and the results are
+    yielded in submission order as soon as they are ready.
+    Args:
+        grid (numpy.ndarray): The grid to search.
+        queries (iterable of tuple): (start, goal) pairs. Can be a lazy iterator.
+        algorithm (callable, optional): A module level search function such as
+            astar or jps that takes a masks argument. Defaults to astar.
+        workers (int, optional): The number of worker processes. Defaults to the
+            number of CPUs.
+        chunksize (int, optional): The number of queries sent to a worker at once.
+            Defaults to 64.
+    Yields:
+        tuple: The (path, length) result of each query, in the order of queries.
+    """
+    workers = workers or os.cpu_count() or 1
+    grid = np.ascontiguousarray(grid)
+    memory = _share_grid(grid)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_grid,
+            initargs=(memory.name, grid.shape, grid.dtype, algorithm),
+        ) as executor:
+            pending = deque()
+            for chunk in _chunks(queries, chunksize):
+                pending.append(executor.submit(_solve_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    finally:
+        memory.close()
+        memory.unlink()
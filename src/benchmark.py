@@ -0,0 +1,198 @@
+import argparse
+import csv
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from helpers import convert_map_to_grid
+from pathfinding import astar, bidirectional_astar, jps, neighbor_masks
+from search_stats import run_search
+
+ALGORITHMS = {"astar": astar, "bidirectional_astar": bidirectional_astar, "jps": jps}
+
+# start and goal are (x, y) grid positions, i.e. (row, column)
+Scenario = namedtuple("Scenario", ["bucket", "map_name", "start", "goal", "optimal"])
+
+CSV_FIELDS = [
+    "bucket",
+    "algorithm",
+    "start",
+    "goal",
+    "optimal",
+    "cost",
+    "suboptimality",
+    "expansions",
+    "generated",
+    "peak_open",
+    "time_ms",
+]
+
+
+def read_scenarios(source):
+    """
+    Reads a Moving AI .scen scenario file one query at a time.
+    Each line after the 'version' header has the tab separated fields bucket, map,
+    map width, map height, start x, start y, goal x, goal y and optimal length.
+    Moving AI coordinates are (column, row); they are converted to the (row, column)
+    positions used by the grid.
+    Args:
+        source (str, os.PathLike or file object): The scenario file.
+    Yields:
+        Scenario: The queries in file order.
+    """
+    if not hasattr(source, "read"):
+        with open(source) as file:
+            yield from read_scenarios(file)
+        return
+
+    for line in source:
+        fields = line.split()
+        if len(fields) < 9 or fields[0] == "version":
+            continue
+        start_col, start_row, goal_col, goal_row = map(int, fields[4:8])
+        yield Scenario(
+            int(fields[0]),
+            fields[1],
+            (start_row, start_col),
+            (goal_row, goal_col),
+            float(fields[8]),
+        )
+
+
+def run_scenarios(grid, scenarios, algorithms=ALGORITHMS):
+    """
+    Runs every algorithm on every scenario.
+    Args:
+        grid (numpy.ndarray): The map grid.
+        scenarios (iterable of Scenario): The queries to run.
+        algorithms (dict, optional): Algorithm names mapped to search functions.
+            Defaults to astar, bidirectional_astar and jps.
+    Yields:
+        dict: One result row per scenario and algorithm with the fields in CSV_FIELDS.
+    """
+    masks = neighbor_masks(grid)
+    for scenario in scenarios:
+        for name, algorithm in algorithms.items():
+            result = run_search(
+                algorithm, grid, scenario.start, scenario.goal, masks=masks
+            )
+            cost = result.cost
+            yield {
+                "bucket": scenario.bucket,
+                "algorithm": name,
+                "start": scenario.start,
+                "goal": scenario.goal,
+                "optimal": scenario.optimal,
+                "cost": cost,
+                "suboptimality": cost / scenario.optimal if scenario.optimal else 1.0,
+                "expansions": result.stats.expanded,
+                "generated": result.stats.generated,
+                "peak_open": result.stats.peak_open,
+                "time_ms": result.stats.wall_time * 1000,
+            }
+
+
+def summarize(rows, percentiles=(50, 90, 99)):
+    """
+    Groups result rows by algorithm and bucket.
+    Args:
+        rows (iterable of dict): Rows from run_scenarios.
+        percentiles (tuple of int, optional): The time percentiles to report.
+    Returns:
+        dict: {algorithm: {bucket: statistics}} with the query count, time
+        percentiles in milliseconds, mean expansions, worst suboptimality and the
+        number of queries where no path was found.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(row["algorithm"], {}).setdefault(row["bucket"], []).append(
+            row
+        )
+
+    summary = {}
+    for algorithm, buckets in groups.items():
+        summary[algorithm] = {}
+        for bucket, bucket_rows in sorted(buckets.items()):
+            times = np.array([row["time_ms"] for row in bucket_rows])
+            found = [row for row in bucket_rows if row["cost"] != float("inf")]
+            stats = {"queries": len(bucket_rows)}
+            for percentile in percentiles:
+                stats[f"time_ms_p{percentile}"] = float(
+                    np.percentile(times, percentile)
+                )
+            stats["mean_expansions"] = float(
+                np.mean([row["expansions"] for row in bucket_rows])
+            )
+            stats["max_suboptimality"] = max(
+                (row["suboptimality"] for row in found), default=None
+            )
+            stats["not_found"] = len(bucket_rows) - len(found)
+            summary[algorithm][str(bucket)] = stats
+    return summary
+
+
+def run_benchmark(map_path, scenario_path, output_prefix, algorithms=ALGORITHMS):
+    """
+    Runs a scenario file and writes the per-query results to <output_prefix>.csv
+    and the per-bucket summary to <output_prefix>.json. Rows are written as soon as
+    each query finishes.
+    Args:
+        map_path (str): The map file.
+        scenario_path (str): The .scen file.
+        output_prefix (str): Path prefix of the output files.
+        algorithms (dict, optional): Algorithm names mapped to search functions.
+    Returns:
+        dict: The summary written to the JSON file.
+    """
+    grid, _, _ = convert_map_to_grid(map_path)
+    directory = os.path.dirname(output_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    rows = []
+    with open(f"{output_prefix}.csv", "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for row in run_scenarios(grid, read_scenarios(scenario_path), algorithms):
+            writer.writerow(row)
+            rows.append(row)
+
+    summary = summarize(rows)
+    with open(f"{output_prefix}.json", "w") as file:
+        json.dump(
+            {"map": map_path, "scenarios": scenario_path, "results": summary},
+            file,
+            indent=2,
+        )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Moving AI scenario benchmark")
+    parser.add_argument("map", help="the .map file")
+    parser.add_argument("scenarios", help="the .scen file")
+    parser.add_argument(
+        "--output", default="benchmark", help="prefix of the CSV and JSON output"
+    )
+    parser.add_argument(
+        "--algorithms",
+        default=",".join(ALGORITHMS),
+        help="comma separated algorithms to run",
+    )
+    args = parser.parse_args(argv)
+    algorithms = {name: ALGORITHMS[name] for name in args.algorithms.split(",")}
+
+    summary = run_benchmark(args.map, args.scenarios, args.output, algorithms)
+    for algorithm, buckets in summary.items():
+        for bucket, stats in buckets.items():
+            print(
+                f"{algorithm} bucket {bucket}: {stats['queries']} queries, "
+                f"p50 {stats['time_ms_p50']:.2f} ms, p99 {stats['time_ms_p99']:.2f} ms, "
+                f"{stats['mean_expansions']:.0f} expansions"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from helpers import load_map
+from pathfinding import row_neighbor_masks
+
+
+class BitGrid:
+    """
+    A grid stored with one bit per cell: each row is packed with np.packbits, most
+    significant bit first, so a 10000 x 10000 map takes 12.5 MB instead of 100 MB
+    as a uint8 array.
+
+    It can be passed wherever astar, jps and ui.draw_grid take a grid. A single
+    cell is read with grid[x, y] like an array, and rows, columns and slices are
+    unpacked to uint8 arrays on demand. The searches read their neighbour masks
+    from a BandedNeighborMasks, and the renderer unpacks a band of rows at a time,
+    so neither holds the map at more than one bit per cell. np.asarray(grid)
+    unpacks the whole grid for the functions that precompute tables from it.
+    """
+
+    ndim = 2
+    dtype = np.dtype(np.uint8)
+
+    def __init__(self, bits, width):
+        """
+        Args:
+            bits (numpy.ndarray): The packed rows, a uint8 array of shape
+                (height, ceil(width / 8)).
+            width (int): The number of cells in a row.
+        """
+        self.bits = np.ascontiguousarray(bits, dtype=np.uint8)
+        self.shape = (self.bits.shape[0], int(width))
+
+    @classmethod
+    def from_array(cls, grid):
+        """
+        Packs a grid where nonzero cells are obstacles.
+        """
+        blocked = np.asarray(grid) != 0
+        return cls(np.packbits(blocked, axis=1), blocked.shape[1])
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def copy(self):
+        return BitGrid(self.bits.copy(), self.shape[1])
+
+    def neighbor_masks(self):
+        """
+        Returns lazily computed neighbour masks, see pathfinding.neighbor_masks.
+        Like the grid, they are a snapshot: get new ones after changing cells.
+        """
+        return BandedNeighborMasks(self)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"BitGrid(shape={self.shape}, nbytes={self.nbytes})"
+
+    def __array__(self, dtype=None, copy=None):
+        grid = np.unpackbits(self.bits, axis=1, count=self.shape[1])
+        return grid if dtype is None else grid.astype(dtype)
+
+    def __eq__(self, other):
+        if isinstance(other, BitGrid):
+            return self.shape == other.shape and np.array_equal(self.bits, other.bits)
+        return NotImplemented
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple) and len(key) == 2:
+            x, y = key
+            if isinstance(x, (int, np.integer)) and isinstance(y, (int, np.integer)):
+                return self.cell(x, y)
+            return self._unpack(x)[..., y]
+        return self._unpack(key)
+
+    def __setitem__(self, key, value):
+        x, y = key
+        x, y = self._check(x, y)
+        bit = np.uint8(0x80 >> (y & 7))
+        if value:
+            self.bits[x, y >> 3] |= bit
+        else:
+            self.bits[x, y >> 3] &= ~bit
+
+    def cell(self, x, y):
+        """
+        Returns the value of a cell, 1 for an obstacle and 0 for a free cell.
+        """
+        x, y = self._check(x, y)
+        return int(self.bits[x, y >> 3]) >> (7 - (y & 7)) & 1
+
+    def is_free(self, x, y):
+        """
+        Returns True if (x, y) is inside the grid and free, like pathfinding.is_valid.
+        """
+        return (
+            0 <= x < self.shape[0]
+            and 0 <= y < self.shape[1]
+            and not int(self.bits[x, y >> 3]) >> (7 - (y & 7)) & 1
+        )
+
+    def row(self, x):
+        """
+        Returns row x as a uint8 array.
+        """
+        return self._unpack(x)
+
+    def column(self, y):
+        """
+        Returns column y as a uint8 array. Only the byte of each row that holds the
+        column is read.
+        """
+        y = self._check(0, y)[1]
+        return (self.bits[:, y >> 3] >> (7 - (y & 7))) & 1
+
+    def _check(self, x, y):
+        height, width = self.shape
+        if x < 0:
+            x += height
+        if y < 0:
+            y += width
+        if not (0 <= x < height and 0 <= y < width):
+            raise IndexError(f"Cell {(x, y)} is outside the grid of shape {self.shape}")
+        return int(x), int(y)
+
+    def _unpack(self, rows):
+        return np.unpackbits(self.bits[rows], axis=-1, count=self.shape[1])
+
+
+class BandedNeighborMasks:
+    """
+    The neighbour masks of a BitGrid (see pathfinding.neighbor_masks), computed
+    for a band of rows when a search first reads a cell in it. The least recently
+    used bands are dropped once they take more than max_bytes, so a search on a
+    huge map keeps only the bands around its frontier in memory.
+
+    Read a mask with masks[x, y], like from the array of an unpacked grid.
+    """
+
+    def __init__(self, grid, band_rows=64, max_bytes=16 * 1024 * 1024):
+        """
+        Args:
+            grid (BitGrid): The grid.
+            band_rows (int, optional): The number of rows computed at a time.
+                Defaults to 64.
+            max_bytes (int, optional): The memory the cached bands may use.
+                Defaults to 16 MiB.
+        """
+        self.grid = grid
+        self.shape = grid.shape
+        self.band_rows = band_rows
+        self.max_bands = max(1, max_bytes // (band_rows * max(grid.shape[1], 1)))
+        self._bands = OrderedDict()
+
+    @property
+    def nbytes(self):
+        return sum(band.nbytes for band in self._bands.values())
+
+    def __getitem__(self, key):
+        x, y = key
+        index = x // self.band_rows
+        band = self._bands.get(index)
+        if band is None:
+            band = self._load(index)
+        elif index != next(reversed(self._bands)):
+            self._bands.move_to_end(index)
+        return band[x - index * self.band_rows, y]
+
+    def _load(self, index):
+        top = index * self.band_rows
+        bottom = min(top + self.band_rows, self.shape[0])
+        band = row_neighbor_masks(self.grid, top, bottom)
+        self._bands[index] = band
+        while len(self._bands) > self.max_bands:
+            self._bands.popitem(last=False)
+        return band
+
+
+def load_bit_grid(source):
+    """
+    Loads a Moving AI format map into a BitGrid, see helpers.load_map.
+    """
+    return BitGrid.from_array(load_map(source))
@@ -0,0 +1,163 @@
+import numpy as np
+
+from pathfinding import jump_diagonal, neighbor_masks, search_jump_points
+
+
+def _pack_lines(blocked):
+    """
+    Packs every row of a boolean array into an integer with one bit per cell, bit j
+    set if cell j is blocked. The cell just past the end of the row is also set, and
+    a fully blocked line is added before the first and after the last row, so the
+    edges of the grid behave like obstacles.
+    """
+    length = blocked.shape[1]
+    packed = np.packbits(blocked, axis=1, bitorder="little")
+    edge = 1 << length
+    wall = (1 << (length + 1)) - 1
+    lines = [int.from_bytes(row.tobytes(), "little") | edge for row in packed]
+    return [wall] + lines + [wall]
+
+
+def _stop_bits(lines, step):
+    """
+    For every line, the bits where a scan along it in the direction step has to
+    stop: the blocked cells and the cells with a forced neighbour on either
+    neighbouring line (a blocked cell there followed by a free one).
+    """
+    stops = []
+    for index in range(1, len(lines) - 1):
+        forced = 0
+        for side in (lines[index - 1], lines[index + 1]):
+            # The side cell after each position, out of the grid counts as blocked
+            ahead = side >> 1 if step > 0 else (side << 1) | 1
+            forced |= side & ~ahead
+        stops.append(lines[index] | forced)
+    return stops
+
+
+class BitRows:
+    """
+    A grid packed into bit rows and bit columns for block-based jump point search.
+
+    Each row (and each column of the transposed grid) is packed with np.packbits
+    into a single integer, and for each of the four cardinal directions the bits
+    where a straight jump has to stop are precomputed. A straight jump is then a
+    mask and a count-trailing-zeros (or bit length for count-leading-zeros) over the
+    whole line instead of three is_valid calls per cell. Nothing depends on paths
+    or goals, so building it costs about as much as copying the grid.
+
+    The bit rows are a snapshot: build a new BitRows after changing the grid.
+    """
+
+    def __init__(self, grid):
+        """
+        Args:
+            grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+        """
+        blocked = np.asarray(grid) != 0
+        self.shape = blocked.shape
+        rows = _pack_lines(blocked)
+        columns = _pack_lines(blocked.T)
+        self.rows = rows[1:-1]
+        self.columns = columns[1:-1]
+        # Stop bits for moving right, left, down and up
+        self.stops_right = _stop_bits(rows, 1)
+        self.stops_left = _stop_bits(rows, -1)
+        self.stops_down = _stop_bits(columns, 1)
+        self.stops_up = _stop_bits(columns, -1)
+
+    @staticmethod
+    def _scan(line, stops, position, step, goal_position):
+        """
+        Finds the first stop bit after position on a line. Returns the position of
+        the jump point or goal, or None if the scan ends in an obstacle.
+        """
+        if step > 0:
+            ahead = stops >> (position + 1)
+            # The edge bit guarantees that ahead is never zero
+            stop = position + (ahead & -ahead).bit_length()
+        else:
+            stop = (stops & ((1 << position) - 1)).bit_length() - 1
+
+        if (
+            goal_position is not None
+            and 0 <= (stop - goal_position) * step < (stop - position) * step
+        ):
+            return goal_position
+        if stop < 0 or line >> stop & 1:
+            return None
+        return stop
+
+    def jump_straight(self, masks, node, direction, goal):
+        """
+        A drop-in replacement for pathfinding.jump_straight that scans whole bit
+        rows or columns at once.
+
+        Args:
+            masks: Unused, the bit rows are used instead.
+            node (tuple of int): The cell the jump starts from (x, y).
+            direction (tuple of int): One of the four cardinal DIRECTIONS.
+            goal (tuple of int): The goal of the search.
+
+        Returns:
+            tuple of int or None: The jump point or goal reached, or None.
+        """
+        x, y = int(node[0]), int(node[1])
+        dx, dy = direction
+        if dx == 0:
+            stops = self.stops_right[x] if dy > 0 else self.stops_left[x]
+            goal_y = goal[1] if goal is not None and goal[0] == x else None
+            stop = self._scan(self.rows[x], stops, y, dy, goal_y)
+            return None if stop is None else (x, stop)
+        stops = self.stops_down[y] if dx > 0 else self.stops_up[y]
+        goal_x = goal[0] if goal is not None and goal[1] == y else None
+        stop = self._scan(self.columns[y], stops, x, dx, goal_x)
+        return None if stop is None else (stop, y)
+
+
+def block_jps(
+    grid,
+    start,
+    goal,
+    bits=None,
+    state=None,
+    observer=None,
+    components=None,
+    stats=None,
+    masks=None,
+):
+    """
+    Perform Jump Point Search with block-based straight jumps. The straight jumps
+    use the bit rows of BitRows; diagonal jumps still step one cell at a time but
+    use the bit-parallel straight jumps at every step. Unlike JPS+ this needs no
+    per-map preprocessing beyond packing the grid, so it suits maps that change
+    often.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        bits (BitRows, optional): The packed grid. Built from grid if not given.
+        state (optional): The search state backend. Defaults to a new DictSearchState.
+        observer (callable, optional): See jps.
+        components (ComponentIndex, optional): See jps.
+        stats (SearchStats, optional): See jps. jump_steps counts only the cells
+            walked by diagonal jumps, the straight jumps are bit scans.
+        masks (numpy.ndarray, optional): See jps. Used by the diagonal jumps.
+    Returns:
+        tuple: A tuple containing:
+            - list of tuple of int: The full path from start to goal as a list of positions (x, y).
+            - int: The length of the path.
+    """
+    if bits is None:
+        bits = BitRows(grid)
+    if masks is None:
+        masks = neighbor_masks(grid)
+
+    def jump(node, direction):
+        if direction[0] == 0 or direction[1] == 0:
+            return bits.jump_straight(masks, node, direction, goal)
+        return jump_diagonal(masks, node, direction, goal, bits.jump_straight, stats)
+
+    return search_jump_points(
+        grid, start, goal, jump, state, observer, components, stats, masks
+    )
@@ -0,0 +1,253 @@
+import numpy as np
+
+from helpers import load_cached_array, load_map
+from pathfinding import DIRECTIONS
+
+# Every 8-connected pair of cells is covered once by these offsets
+_EDGE_OFFSETS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+def label_components(grid):
+    """
+    Labels the connected components of the free cells of a grid under the same
+    8-connected movement as DIRECTIONS (diagonal moves are allowed between any two
+    free cells).
+    The labelling is vectorized: every round hooks the root of each edge's larger
+    root to the smaller one and then compresses all pointers, until no edge connects
+    two different roots.
+    Args:
+        grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+    Returns:
+        numpy.ndarray: An int32 array of the grid's shape with the component label
+        (0, 1, ...) of each free cell, in order of each component's first cell in
+        row-major order, and -1 for obstacles.
+    """
+    free = np.asarray(grid) == 0
+    height, width = free.shape
+    cells = np.flatnonzero(free)
+    index = np.full(free.size, -1, dtype=np.int64)
+    index[cells] = np.arange(len(cells))
+    index = index.reshape(free.shape)
+
+    sources, targets = [], []
+    for dx, dy in _EDGE_OFFSETS:
+        rows = slice(0, height - dx)
+        columns = slice(max(0, -dy), width - max(0, dy))
+        shifted_columns = slice(max(0, dy), width - max(0, -dy))
+        a = index[rows, columns]
+        b = index[dx:, shifted_columns]
+        both = (a >= 0) & (b >= 0)
+        sources.append(a[both])
+        targets.append(b[both])
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+
+    parent = np.arange(len(cells))
+    while True:
+        source_roots = parent[sources]
+        target_roots = parent[targets]
+        different = source_roots != target_roots
+        if not different.any():
+            break
+        high = np.maximum(source_roots, target_roots)[different]
+        low = np.minimum(source_roots, target_roots)[different]
+        np.minimum.at(parent, high, low)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    labels = np.full(free.size, -1, dtype=np.int32)
+    labels[cells] = np.unique(parent, return_inverse=True)[1]
+    return labels.reshape(free.shape)
+
+
+def load_component_labels(map_path):
+    """
+    Loads the component labels of a map file, computing them on the first use and
+    storing them in the on-disk cache next to the map (see helpers.load_cached_array).
+    Args:
+        map_path (str or os.PathLike): The map file.
+    Returns:
+        numpy.ndarray: The int32 labels.
+    """
+    return load_cached_array(
+        map_path, "components", lambda: label_components(load_map(map_path))
+    )
+
+
+class ComponentIndex:
+    """
+    The connected components of a grid, kept up to date when cells are toggled.
+
+    Pass it as the components argument of astar or jps to reject queries between
+    different components in O(1) instead of exhausting the start's component.
+
+    Each label keeps the bounding box of its component, so an update only relabels
+    cells inside the bounding boxes of the affected components, never the whole map.
+    """
+
+    def __init__(self, grid, labels=None):
+        """
+        Args:
+            grid (numpy.ndarray): The grid. set_cell writes to it, so it must be
+                writable if cells are going to be toggled.
+            labels (numpy.ndarray, optional): Labels from label_components or
+                load_component_labels. Computed if not given.
+        """
+        self.grid = grid
+        if labels is None:
+            labels = label_components(grid)
+        self.labels = np.array(labels, dtype=np.int32)
+        self.next_label = int(self.labels.max(initial=-1)) + 1
+        self.boxes = self._bounding_boxes(self.labels)
+
+    @staticmethod
+    def _bounding_boxes(labels, offset=(0, 0)):
+        """
+        Returns {label: [top, bottom, left, right]} with inclusive bounds.
+        """
+        rows, columns = np.nonzero(labels >= 0)
+        values = labels[rows, columns]
+        if len(values) == 0:
+            return {}
+        count = int(values.max()) + 1
+        top = np.full(count, np.iinfo(np.int64).max)
+        left = np.full(count, np.iinfo(np.int64).max)
+        bottom = np.full(count, -1)
+        right = np.full(count, -1)
+        np.minimum.at(top, values, rows)
+        np.maximum.at(bottom, values, rows)
+        np.minimum.at(left, values, columns)
+        np.maximum.at(right, values, columns)
+        return {
+            int(label): [
+                int(top[label]) + offset[0],
+                int(bottom[label]) + offset[0],
+                int(left[label]) + offset[1],
+                int(right[label]) + offset[1],
+            ]
+            for label in np.unique(values)
+        }
+
+    def component(self, node):
+        """
+        Returns the component label of a cell, or -1 for obstacles and cells
+        outside the grid.
+        """
+        x, y = node
+        if 0 <= x < self.labels.shape[0] and 0 <= y < self.labels.shape[1]:
+            return int(self.labels[x, y])
+        return -1
+
+    def connected(self, a, b):
+        """
+        Returns True if a path between the free cells a and b exists.
+        """
+        label = self.component(a)
+        return label >= 0 and label == self.component(b)
+
+    def _box_slice(self, label):
+        top, bottom, left, right = self.boxes[label]
+        return slice(top, bottom + 1), slice(left, right + 1)
+
+    def _neighbor_labels(self, node):
+        labels = set()
+        for dx, dy in DIRECTIONS:
+            label = self.component((node[0] + dx, node[1] + dy))
+            if label >= 0:
+                labels.add(label)
+        return labels
+
+    def set_cell(self, node, blocked):
+        """
+        Sets a cell of the grid to blocked or free and updates the components.
+        Freeing a cell joins the components around it; blocking one may split its
+        component, which is checked by relabelling only that component.
+        Args:
+            node (tuple of int): The cell (x, y).
+            blocked (bool): True to add an obstacle, False to remove one.
+        """
+        x, y = node
+        if bool(self.grid[x, y] != 0) == blocked:
+            return
+        self.grid[x, y] = 1 if blocked else 0
+        if blocked:
+            self._block(node)
+        else:
+            self._free(node)
+
+    def _free(self, node):
+        x, y = node
+        neighbors = sorted(self._neighbor_labels(node))
+        if not neighbors:
+            label = self.next_label
+            self.next_label += 1
+            self.labels[x, y] = label
+            self.boxes[label] = [x, x, y, y]
+            return
+
+        label = neighbors[0]
+        self.labels[x, y] = label
+        box = self.boxes[label]
+        box[0], box[1] = min(box[0], x), max(box[1], x)
+        box[2], box[3] = min(box[2], y), max(box[3], y)
+        for other in neighbors[1:]:
+            region = self._box_slice(other)
+            window = self.labels[region]
+            window[window == other] = label
+            other_box = self.boxes.pop(other)
+            box[0], box[1] = min(box[0], other_box[0]), max(box[1], other_box[1])
+            box[2], box[3] = min(box[2], other_box[2]), max(box[3], other_box[3])
+
+    def _block(self, node):
+        x, y = node
+        label = int(self.labels[x, y])
+        self.labels[x, y] = -1
+        neighbors = self._neighbor_cells(node, label)
+        if not neighbors:
+            del self.boxes[label]
+            return
+        if self._locally_connected(neighbors):
+            return  # The neighbours still reach each other around the cell
+
+        region = self._box_slice(label)
+        window = self.labels[region]
+        member = window == label
+        pieces = label_components(~member)
+        boxes = self._bounding_boxes(pieces, (region[0].start, region[1].start))
+        del self.boxes[label]
+        for piece, box in boxes.items():
+            new_label = label if piece == 0 else self.next_label
+            if piece != 0:
+                self.next_label += 1
+            window[pieces == piece] = new_label
+            self.boxes[new_label] = box
+
+    @staticmethod
+    def _locally_connected(cells):
+        """
+        Returns True if the cells are 8-connected to each other directly, which
+        means removing the cell they surround cannot disconnect them.
+        """
+        reached = {cells[0]}
+        queue = [cells[0]]
+        while queue:
+            x, y = queue.pop()
+            for cell in cells:
+                if (
+                    cell not in reached
+                    and abs(cell[0] - x) <= 1
+                    and abs(cell[1] - y) <= 1
+                ):
+                    reached.add(cell)
+                    queue.append(cell)
+        return len(reached) == len(cells)
+
+    def _neighbor_cells(self, node, label):
+        return [
+            (node[0] + dx, node[1] + dy)
+            for dx, dy in DIRECTIONS
+            if self.component((node[0] + dx, node[1] + dy)) == label
+        ]
@@ -0,0 +1,297 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from flowfield import FlowFieldCache
+from heap import IndexedHeap
+from pathfinding import MASK_STEPS, is_valid, neighbor_masks
+
+# The cost of staying in place for one time step
+WAIT_COST = 1
+
+# The outcome of cooperative_paths. paths[i] holds agent i's cell at every time
+# step, and the agent stays in its last cell after its path ends. arrived[i] tells
+# whether it ended at its goal.
+CooperativeResult = namedtuple(
+    "CooperativeResult",
+    ["paths", "arrived", "makespan", "wall_time", "agents_per_second"],
+)
+
+
+class ReservationTable:
+    """
+    The cells and moves claimed by agents in space-time. A cell reserved at time t
+    is occupied at that step. A move from a to b reserved at t keeps other agents
+    from moving from b to a at the same step, because two agents cannot swap places
+    through each other.
+    """
+
+    def __init__(self):
+        self._cells = {}  # (cell, t) -> agent
+        self._moves = {}  # (from, to, t) -> agent
+
+    def __len__(self):
+        return len(self._cells)
+
+    def reserve(self, agent, path, start_time=0):
+        """
+        Reserves the cells of a path, one per time step from start_time on.
+        """
+        for offset, cell in enumerate(path):
+            self._cells[(cell, start_time + offset)] = agent
+        for offset, (a, b) in enumerate(zip(path, path[1:])):
+            if a != b:
+                self._moves[(a, b, start_time + offset)] = agent
+
+    def release(self, agent, path, start_time=0):
+        """
+        Drops the reservations of agent along a path reserved with reserve().
+        """
+        for offset, cell in enumerate(path):
+            if self._cells.get((cell, start_time + offset)) == agent:
+                del self._cells[(cell, start_time + offset)]
+        for offset, (a, b) in enumerate(zip(path, path[1:])):
+            if self._moves.get((a, b, start_time + offset)) == agent:
+                del self._moves[(a, b, start_time + offset)]
+
+    def is_free(self, agent, cell, t):
+        """
+        Returns True if no other agent has reserved cell at time t.
+        """
+        owner = self._cells.get((cell, t))
+        return owner is None or owner == agent
+
+    def path_is_free(self, agent, path, start_time=0):
+        """
+        Returns True if agent can follow path from start_time on.
+        """
+        return self.is_free(agent, path[0], start_time) and all(
+            self.can_move(agent, a, b, start_time + offset)
+            for offset, (a, b) in enumerate(zip(path, path[1:]))
+        )
+
+    def can_move(self, agent, a, b, t):
+        """
+        Returns True if agent can move (or wait, when a == b) from a at time t to b
+        at time t + 1 without running into another agent.
+        """
+        if not self.is_free(agent, b, t + 1):
+            return False
+        owner = self._moves.get((b, a, t))
+        return owner is None or owner == agent
+
+
+def _plan_window(masks, distances, table, agent, start, goal, start_time, window):
+    """
+    Space-time A* over (cell, t) from start at start_time to the end of the window.
+    The moves and waits inside the window must be free in the reservation table;
+    the true distances to the goal (ignoring the other agents) guide the search
+    and estimate the rest of the route beyond the window.
+    Returns:
+        list of tuple or None: The cells at the times start_time ... start_time +
+        window, or None if every route runs into reserved cells.
+    """
+    if not np.isfinite(distances[start]):
+        return None
+    end_time = start_time + window
+    initial = (start, start_time)
+    g_score = {initial: 0}
+    came_from = {}
+    unexplored_nodes = IndexedHeap()  # (cell, t) states ordered by (f, -g)
+    unexplored_nodes.push(initial, (float(distances[start]), 0))
+
+    while unexplored_nodes:
+        current, _ = unexplored_nodes.pop()
+        cell, t = current
+        rests_at_goal = cell == goal and all(
+            table.is_free(agent, goal, later) for later in range(t + 1, end_time + 1)
+        )
+        if t == end_time or rests_at_goal:
+            path = [cell]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current[0])
+            path.reverse()
+            return path + [goal] * (end_time - t)
+
+        current_g = g_score[current]
+        x, y = cell
+        for dx, dy, cost in MASK_STEPS[masks[x, y]] + ((0, 0, WAIT_COST),):
+            neighbor = (x + dx, y + dy)
+            if not table.can_move(agent, cell, neighbor, t):
+                continue
+            state = (neighbor, t + 1)
+            new_g_score = current_g + cost
+            if new_g_score >= g_score.get(state, np.inf):
+                continue
+            g_score[state] = new_g_score
+            came_from[state] = current
+            unexplored_nodes.push(
+                state, (new_g_score + float(distances[neighbor]), -new_g_score)
+            )
+    return None
+
+
+def _plan_batch(masks, flow_fields, paths, goals, order, t, window):
+    """
+    Plans the next window of every agent in priority order against one shared
+    reservation table. Every agent holds its current cell for the first step until
+    it is planned, so no agent is planned into another one that cannot get away.
+    Returns:
+        tuple: (plans, blocked) where plans maps agents to their cells at the times
+        t ... t + window. blocked is None if every agent got a plan, otherwise the
+        agent that could neither move nor wait and plans is incomplete.
+    """
+    table = ReservationTable()
+    for agent in order:
+        table.reserve(agent, [paths[agent][-1]] * 2, t)
+    plans = {}
+    for agent in order:
+        position = paths[agent][-1]
+        table.release(agent, [position] * 2, t)
+        plan = _plan_window(
+            masks,
+            flow_fields.field(goals[agent]).distances,
+            table,
+            agent,
+            position,
+            goals[agent],
+            t,
+            window,
+        )
+        if plan is None:
+            plan = [position] * (window + 1)  # Boxed in, wait
+            if not table.path_is_free(agent, plan, t):
+                return plans, agent
+        table.reserve(agent, plan, t)
+        plans[agent] = plan
+    return plans, None
+
+
+def cooperative_paths(
+    grid, agents, window=16, max_time=None, masks=None, flow_fields=None
+):
+    """
+    Plans conflict-free paths for a batch of agents with Windowed Hierarchical
+    Cooperative A* (WHCA*, Silver 2005).
+
+    The agents are planned one after another in space-time (x, y, t) against a
+    shared reservation table: each one avoids the cells and moves the agents before
+    it have reserved, then reserves its own. Only the next window time steps are
+    planned cooperatively; beyond them the exact distance to the goal from a flow
+    field is used as the heuristic. The agents follow the first half of their
+    plans, the priority order is rotated, and the batch is planned again, until
+    every agent is at its goal or max_time is reached.
+
+    The movement model is the one of astar: the 8 DIRECTIONS with octile costs,
+    plus waiting in place for WAIT_COST. Two agents never occupy the same cell at
+    the same time or swap cells in one step: every agent holds its cell for the
+    next step until it is planned, and an agent that is boxed in waits in place.
+    If it cannot even wait because an agent before it was planned through its cell,
+    it is moved to the front of the priority order and the batch is planned again.
+    Like any WHCA*, the planner is not complete: agents may fail to arrive by
+    max_time in tight spaces, and planning stops early, with those agents off
+    their goals, when no priority order lets every agent move or wait.
+    Args:
+        grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+        agents (list of tuple): (start, goal) pairs of (x, y) positions. The starts
+            must be distinct, and so must the goals.
+        window (int, optional): The number of time steps planned cooperatively.
+            Defaults to 16.
+        max_time (int, optional): The most time steps to plan. Defaults to four
+            times the sum of the grid's dimensions.
+        masks (numpy.ndarray, optional): The neighbour masks of the grid from
+            neighbor_masks. Computed if not given.
+        flow_fields (FlowFieldCache, optional): The distance fields to the goals,
+            reused between batches. Defaults to a new cache for this batch.
+    Returns:
+        CooperativeResult: The paths, which agents arrived, the makespan in time
+        steps, the planning time and the throughput in agents per second.
+    Raises:
+        ValueError: If a start or goal is blocked or two agents share one.
+    """
+    begin = time.perf_counter()
+    starts = [tuple(start) for start, _ in agents]
+    goals = [tuple(goal) for _, goal in agents]
+    for cell in starts + goals:
+        if not is_valid(cell[0], cell[1], grid):
+            raise ValueError(f"Agent position {cell} is blocked or outside the grid")
+    if len(set(starts)) < len(starts) or len(set(goals)) < len(goals):
+        raise ValueError("Agents must have distinct starts and distinct goals")
+
+    if masks is None:
+        masks = neighbor_masks(grid)
+    if flow_fields is None:
+        flow_fields = FlowFieldCache(grid)
+    if max_time is None:
+        max_time = 4 * sum(grid.shape)
+    step = max(1, window // 2)
+
+    paths = [[start] for start in starts]
+    order = list(range(len(agents)))
+    t = 0
+    while t < max_time and any(path[-1] != goal for path, goal in zip(paths, goals)):
+        plans = None
+        for _ in range(len(order)):
+            plans, blocked = _plan_batch(
+                masks, flow_fields, paths, goals, order, t, window
+            )
+            if blocked is None:
+                break
+            # Give the agent that was boxed in the highest priority and try again
+            order.remove(blocked)
+            order.insert(0, blocked)
+            plans = None
+        if plans is None:
+            break  # Stop before a collision, the agents off their goals did not arrive
+        for agent, plan in plans.items():
+            paths[agent].extend(plan[1 : step + 1])
+        t += step
+        order = order[1:] + order[:1]
+
+    # An agent stays in its last cell, so the waits at the end carry no information
+    for path in paths:
+        while len(path) > 1 and path[-2] == path[-1]:
+            path.pop()
+    wall_time = time.perf_counter() - begin
+    return CooperativeResult(
+        paths,
+        [path[-1] == goal for path, goal in zip(paths, goals)],
+        max((len(path) - 1 for path in paths), default=0),
+        wall_time,
+        len(agents) / wall_time if wall_time > 0 else float("inf"),
+    )
+
+
+def find_conflicts(paths):
+    """
+    Checks paths for collisions, with every agent staying in its last cell after
+    its path ends.
+    Args:
+        paths (list of list): The cells of every agent at every time step.
+    Returns:
+        list of tuple: (t, agent, other, kind) for every pair of agents in the same
+        cell at time t ("vertex") or swapping cells between t and t + 1 ("swap").
+    """
+    makespan = max((len(path) for path in paths), default=0)
+
+    def at(path, t):
+        return path[min(t, len(path) - 1)]
+
+    conflicts = []
+    for t in range(makespan):
+        occupied = {}
+        for agent, path in enumerate(paths):
+            cell = at(path, t)
+            if cell in occupied:
+                conflicts.append((t, occupied[cell], agent, "vertex"))
+            occupied[cell] = agent
+        moves = {}
+        for agent, path in enumerate(paths):
+            move = (at(path, t), at(path, t + 1))
+            if move[0] != move[1]:
+                if (move[1], move[0]) in moves:
+                    conflicts.append((t, moves[(move[1], move[0])], agent, "swap"))
+                moves[move] = agent
+    return conflicts
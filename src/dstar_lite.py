@@ -0,0 +1,175 @@
+import numpy as np
+
+from heap import IndexedHeap
+from pathfinding import (
+    DIRECTIONS,
+    MASK_STEPS,
+    is_valid,
+    neighbor_masks,
+    octile_heuristic,
+    update_neighbor_masks,
+)
+
+
+class DStarLite:
+    """
+    An incremental planner (D* Lite, Koenig and Likhachev 2002) for a grid whose
+    obstacles change between queries.
+
+    The search runs backwards from the goal, so the distances it keeps stay valid
+    while the unit moves towards the goal. When cells change, only the nodes whose
+    distance is affected are put back on the open list, and replan() repairs just
+    that part of the search instead of starting over. Small changes near the unit
+    therefore cost a small number of expansions regardless of the size of the map.
+
+    The movement model is the same as in astar: 8-connected with octile costs, and
+    a move is possible whenever the target cell is free.
+    """
+
+    def __init__(self, grid, start, goal, observer=None):
+        """
+        Args:
+            grid (numpy.ndarray): The grid. update_cells writes to it, so it must be
+                writable if cells are going to change.
+            start (tuple of int): The starting position in the grid (x, y).
+            goal (tuple of int): The goal position in the grid (x, y).
+            observer (callable, optional): Called as observer("expand", node) for
+                every expanded node, like in astar.
+        """
+        self.grid = grid
+        self.masks = neighbor_masks(grid)
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+        self.observer = observer
+        self.g_score = {}
+        self.rhs = {self.goal: 0}
+        self.key_modifier = 0  # km: how far the heuristic origin has moved
+        self.last_start = self.start
+        self.open = IndexedHeap()
+        self.open.push(self.goal, self._key(self.goal))
+
+    def _g(self, node):
+        return self.g_score.get(node, np.inf)
+
+    def _rhs(self, node):
+        return self.rhs.get(node, np.inf)
+
+    def _key(self, node):
+        best = min(self._g(node), self._rhs(node))
+        # Rounded so that keys tied on f compare equal despite floating point error
+        # in summing sqrt(2) steps in a different order, otherwise the search can
+        # stop before a node tied with the start has been repaired
+        f_score = round(
+            best + octile_heuristic(self.start, node) + self.key_modifier, 9
+        )
+        return (f_score, best)
+
+    def _neighbors(self, node):
+        """
+        Yields the free neighbours of a node and the cost of moving to them.
+        """
+        for dx, dy, cost in MASK_STEPS[self.masks[node[0], node[1]]]:
+            yield (node[0] + dx, node[1] + dy), cost
+
+    def _update_node(self, node):
+        if node != self.goal:
+            if is_valid(node[0], node[1], self.grid):
+                self.rhs[node] = min(
+                    (
+                        cost + self._g(neighbor)
+                        for neighbor, cost in self._neighbors(node)
+                    ),
+                    default=np.inf,
+                )
+            else:
+                self.rhs[node] = np.inf
+        if self._g(node) != self._rhs(node):
+            self.open.push(node, self._key(node))
+        elif node in self.open:
+            self.open.remove(node)
+
+    def _compute_shortest_path(self):
+        while self.open and (
+            self.open.peek()[1] < self._key(self.start)
+            or self._rhs(self.start) != self._g(self.start)
+        ):
+            node, old_key = self.open.peek()
+            new_key = self._key(node)
+            if old_key < new_key:
+                self.open.push(node, new_key)
+                continue
+            self.open.pop()
+            if self.observer is not None:
+                self.observer("expand", node)
+
+            if self._g(node) > self._rhs(node):
+                self.g_score[node] = self.rhs[node]
+                for neighbor, _ in self._neighbors(node):
+                    self._update_node(neighbor)
+            else:
+                self.g_score[node] = np.inf
+                self._update_node(node)
+                for neighbor, _ in self._neighbors(node):
+                    self._update_node(neighbor)
+
+    def update_cells(self, changes):
+        """
+        Changes cells of the grid and marks the affected part of the search for
+        repair by the next replan().
+        Args:
+            changes (iterable): (node, blocked) pairs, where node is the cell
+                (x, y) and blocked is True to add an obstacle or False to remove one.
+        """
+        changed = set()
+        for node, blocked in changes:
+            node = tuple(node)
+            if bool(self.grid[node] != 0) == blocked:
+                continue
+            self.grid[node] = 1 if blocked else 0
+            update_neighbor_masks(self.masks, self.grid, node)
+            changed.add(node)
+            for dx, dy in DIRECTIONS:
+                changed.add((node[0] + dx, node[1] + dy))
+        if not changed:
+            return
+
+        self.key_modifier += octile_heuristic(self.last_start, self.start)
+        self.last_start = self.start
+        for node in changed:
+            if 0 <= node[0] < self.grid.shape[0] and 0 <= node[1] < self.grid.shape[1]:
+                if self.grid[node] != 0:
+                    self.g_score.pop(node, None)
+                self._update_node(node)
+
+    def move_start(self, node):
+        """
+        Moves the start of the search, e.g. to the next cell of the path when the
+        unit has taken a step. The search effort so far is kept.
+        """
+        self.start = tuple(node)
+
+    def replan(self):
+        """
+        Repairs the search after the changes since the last call and returns the
+        current shortest path.
+        Returns:
+            tuple: A tuple containing:
+                - list of tuple of int: The path from start to goal as a list of positions (x, y).
+                - int: The length of the path.
+        """
+        if not is_valid(*self.start, self.grid) or not is_valid(*self.goal, self.grid):
+            return [], 0  # No path found
+        self._compute_shortest_path()
+        if self._g(self.start) == np.inf:
+            return [], 0  # No path found
+
+        # Follow the distances downhill from the start to the goal
+        path = [self.start]
+        node = self.start
+        while node != self.goal:
+            node = min(
+                self._neighbors(node),
+                key=lambda neighbor: neighbor[1] + self._g(neighbor[0]),
+            )[0]
+            path.append(node)
+        return path, len(path)
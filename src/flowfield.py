@@ -0,0 +1,225 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from pathfinding import DIRECTIONS, SQRT2
+
+# The cost of a step in each of the DIRECTIONS
+_STEP_COSTS = np.array([SQRT2 if dx and dy else 1.0 for dx, dy in DIRECTIONS])
+
+
+def compute_distances(grid, goal):
+    """
+    Calculates the cost of the shortest path from every cell to goal, with the
+    same octile movement model as astar.
+
+    This is Dijkstra's algorithm with buckets one cost unit wide (Dial's algorithm)
+    run on whole arrays at a time. No move costs less than 1, so every cell whose
+    tentative cost is less than the smallest tentative cost plus 1 is already final:
+    all of them are settled together and their neighbours relaxed with a single
+    np.minimum.at, instead of one heap operation per cell.
+    Args:
+        grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+        goal (tuple of int): The cell the distances are measured to (x, y).
+    Returns:
+        numpy.ndarray: A float64 array of the grid's shape with the distances, and
+        infinity for obstacles and cells that cannot reach the goal.
+    """
+    blocked = np.asarray(grid) != 0
+    height, width = blocked.shape
+    distances = np.full((height + 2, width + 2), np.inf)
+    x, y = goal
+    if not (0 <= x < height and 0 <= y < width) or blocked[x, y]:
+        return distances[1:-1, 1:-1].copy()
+
+    # The grid is padded with a blocked border so no neighbour index goes out of it
+    open_cells = ~np.pad(blocked, 1, constant_values=True).ravel()
+    settled = np.zeros(open_cells.size, dtype=bool)
+    flat = distances.ravel()
+    offsets = np.array([dx * (width + 2) + dy for dx, dy in DIRECTIONS])
+
+    goal_index = (x + 1) * (width + 2) + y + 1
+    flat[goal_index] = 0
+    pending = np.array([goal_index])
+    while pending.size:
+        tentative = flat[pending]
+        final = tentative < tentative.min() + 1
+        current = pending[final]
+        pending = pending[~final]
+        settled[current] = True
+
+        neighbors = (current[:, None] + offsets).ravel()
+        costs = (flat[current][:, None] + _STEP_COSTS).ravel()
+        usable = open_cells[neighbors] & ~settled[neighbors]
+        neighbors, costs = neighbors[usable], costs[usable]
+        before = flat[neighbors]
+        np.minimum.at(flat, neighbors, costs)
+        improved = neighbors[flat[neighbors] < before]
+        pending = np.union1d(pending, improved)
+    return distances[1:-1, 1:-1].copy()
+
+
+def compute_directions(distances):
+    """
+    Calculates the flow field of a distance field: for every cell, the index in
+    DIRECTIONS of the step that lowers the remaining cost the most.
+    Args:
+        distances (numpy.ndarray): The distances from compute_distances.
+    Returns:
+        numpy.ndarray: An int8 array of the grid's shape with the direction index,
+        and -1 for the goal, obstacles and cells that cannot reach the goal.
+    """
+    height, width = distances.shape
+    padded = np.pad(distances, 1, constant_values=np.inf)
+    through = np.stack(
+        [
+            padded[1 + dx : 1 + dx + height, 1 + dy : 1 + dy + width] + cost
+            for (dx, dy), cost in zip(DIRECTIONS, _STEP_COSTS)
+        ]
+    )
+    directions = np.argmin(through, axis=0).astype(np.int8)
+    directions[~np.isfinite(distances) | (distances == 0)] = -1
+    return directions
+
+
+class FlowField:
+    """
+    The distances to one goal from every cell of a grid and the best step to take
+    from each cell. Any number of agents heading to the goal can read their paths
+    from the same field in O(path length) without searching.
+    """
+
+    def __init__(self, grid, goal):
+        """
+        Args:
+            grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+            goal (tuple of int): The goal position in the grid (x, y).
+        """
+        self.goal = tuple(goal)
+        distances = compute_distances(grid, self.goal)
+        self.directions = compute_directions(distances)
+        self.distances = distances.astype(np.float32)
+
+    @property
+    def nbytes(self):
+        return self.distances.nbytes + self.directions.nbytes
+
+    def cost(self, node):
+        """
+        Returns the cost of the shortest path from node to the goal, infinity if
+        there is none.
+        """
+        return float(self.distances[node[0], node[1]])
+
+    def next_step(self, node):
+        """
+        Returns the next cell on a shortest path from node to the goal, or None at
+        the goal and for cells that cannot reach it.
+        """
+        index = self.directions[node[0], node[1]]
+        if index < 0:
+            return None
+        dx, dy = DIRECTIONS[index]
+        return node[0] + dx, node[1] + dy
+
+    def path_from(self, start):
+        """
+        Reads the shortest path from start to the goal.
+        Args:
+            start (tuple of int): The starting position in the grid (x, y).
+        Returns:
+            tuple: A tuple containing:
+                - list of tuple of int: The path from start to goal as a list of positions (x, y).
+                - int: The length of the path.
+        """
+        start = tuple(start)
+        if not (
+            0 <= start[0] < self.distances.shape[0]
+            and 0 <= start[1] < self.distances.shape[1]
+        ) or not np.isfinite(self.distances[start]):
+            return [], 0  # No path found
+
+        path = [start]
+        node = self.next_step(start)
+        while node is not None:
+            path.append(node)
+            node = self.next_step(node)
+        return path, len(path)
+
+
+class FlowFieldCache:
+    """
+    An LRU cache of flow fields, one per goal, for a single grid.
+
+    Call invalidate() after changing the grid: the fields are keyed by goal only.
+    """
+
+    def __init__(self, grid, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            grid (numpy.ndarray): The grid the fields are computed for.
+            max_bytes (int, optional): The memory the cached fields may use before
+                the least recently used ones are evicted. Defaults to 64 MiB.
+        """
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._fields = OrderedDict()
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, goal):
+        return tuple(goal) in self._fields
+
+    def field(self, goal):
+        """
+        Returns the flow field of a goal, computing it if it is not cached.
+        """
+        goal = tuple(goal)
+        field = self._fields.get(goal)
+        if field is not None:
+            self._fields.move_to_end(goal)
+            self.hits += 1
+            return field
+
+        self.misses += 1
+        field = FlowField(self.grid, goal)
+        if field.nbytes <= self.max_bytes:
+            self._fields[goal] = field
+            self.size_bytes += field.nbytes
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._fields.popitem(last=False)
+                self.size_bytes -= evicted.nbytes
+                self.evictions += 1
+        return field
+
+    def path(self, start, goal):
+        """
+        Returns the shortest path from start to goal as (path, length), like astar.
+        """
+        return self.field(goal).path_from(start)
+
+    def invalidate(self):
+        """
+        Drops every cached field, e.g. after the grid has been changed.
+        """
+        self._fields.clear()
+        self.size_bytes = 0
+
+    def stats(self):
+        """
+        Returns the hit and miss counters and the current size of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._fields),
+            "size_bytes": self.size_bytes,
+        }
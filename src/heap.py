@@ -0,0 +1,141 @@
+class IndexedHeap:
+    """
+    A binary min-heap of hashable items with an index from item to heap position.
+
+    The index makes it possible to change the priority of an item that is already
+    in the heap (decrease-key / increase-key) or to remove it in O(log n) time
+    instead of scanning the whole open list.
+
+    Priorities can be anything comparable, e.g. (f, -g) tuples for tie-breaking.
+    """
+
+    def __init__(self):
+        self._entries = []  # [priority, item] pairs in heap order
+        self._index = {}  # item -> position in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __contains__(self, item):
+        return item in self._index
+
+    def __iter__(self):
+        """
+        Iterates over the items in no particular order.
+        """
+        return iter(self._index)
+
+    def priority(self, item):
+        """
+        Returns the current priority of an item in the heap.
+
+        Args:
+            item: An item currently in the heap.
+
+        Returns:
+            The priority the item was last pushed with.
+        """
+        return self._entries[self._index[item]][0]
+
+    def push(self, item, priority):
+        """
+        Inserts an item or changes the priority of an item already in the heap.
+
+        Args:
+            item: A hashable item.
+            priority: The new priority of the item.
+        """
+        position = self._index.get(item)
+        if position is None:
+            self._entries.append([priority, item])
+            self._index[item] = len(self._entries) - 1
+            self._sift_up(len(self._entries) - 1)
+            return
+
+        old_priority = self._entries[position][0]
+        self._entries[position][0] = priority
+        if priority < old_priority:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def peek(self):
+        """
+        Returns the item with the smallest priority without removing it.
+
+        Returns:
+            tuple: (item, priority) of the smallest entry.
+        """
+        priority, item = self._entries[0]
+        return item, priority
+
+    def pop(self):
+        """
+        Removes and returns the item with the smallest priority.
+
+        Returns:
+            tuple: (item, priority) of the smallest entry.
+        """
+        priority, item = self._entries[0]
+        self._remove_at(0)
+        return item, priority
+
+    def remove(self, item):
+        """
+        Removes an item from the heap.
+
+        Args:
+            item: An item currently in the heap.
+        """
+        self._remove_at(self._index[item])
+
+    def clear(self):
+        self._entries.clear()
+        self._index.clear()
+
+    def _remove_at(self, position):
+        entries = self._entries
+        del self._index[entries[position][1]]
+        last = entries.pop()
+        if position == len(entries):
+            return
+        entries[position] = last
+        self._index[last[1]] = position
+        self._sift_up(position)
+        self._sift_down(self._index[last[1]])
+
+    def _sift_up(self, position):
+        entries = self._entries
+        index = self._index
+        entry = entries[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if entries[parent][0] <= entry[0]:
+                break
+            entries[position] = entries[parent]
+            index[entries[position][1]] = position
+            position = parent
+        entries[position] = entry
+        index[entry[1]] = position
+
+    def _sift_down(self, position):
+        entries = self._entries
+        index = self._index
+        size = len(entries)
+        entry = entries[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and entries[child + 1][0] < entries[child][0]:
+                child += 1
+            if entry[0] <= entries[child][0]:
+                break
+            entries[position] = entries[child]
+            index[entries[position][1]] = position
+            position = child
+        entries[position] = entry
+        index[entry[1]] = position
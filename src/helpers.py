@@ -1,45 +1,179 @@
+import hashlib
+import json
+import os
+import tempfile
+
 import numpy as np
 
-from settings import MAP_FILE_PATH
+from settings import MAP_CACHE, MAP_FILE_PATH
+
+OBSTACLE_CHARS = b"@TOSW"
+
+# Translation table mapping every byte of the map body to 1 (obstacle) or 0 (free)
+_OBSTACLE_TABLE = bytes(1 if byte in OBSTACLE_CHARS else 0 for byte in range(256))
 
 
-def convert_map_to_grid():
+def load_map(source):
     """
-    Converts a map file to a grid representation.
+    Loads a Moving AI format map into a grid.
     The map file should have the following format:
     - The first line contains the type information.
     - The second line contains the height of the map.
     - The third line contains the width of the map.
-    - The fourth line is the 'map' line which is skipped.
+    - The fourth line is the 'map' line.
     - The subsequent lines contain the map data where specific characters
       ('@', 'T', 'O', 'S', 'W') are converted to 1 in the grid, and all other
       characters are converted to 0.
+    The whole body is converted in one pass with a byte translation table instead
+    of looping over the characters in Python.
+    Args:
+        source (str, os.PathLike or file object): The path of the map file or an
+            open file object in text or binary mode.
+    Returns:
+        numpy.ndarray: A (height, width) uint8 array where 1 marks an obstacle.
+    Raises:
+        ValueError: If the header is malformed or does not match the map data.
+    """
+    if hasattr(source, "read"):
+        data = source.read()
+        if isinstance(data, str):
+            data = data.encode()
+    else:
+        with open(source, "rb") as file:
+            data = file.read()
+
+    data = data.replace(b"\r", b"")
+    lines = data.split(b"\n", 4)
+    if len(lines) < 5 or lines[3].strip() != b"map":
+        raise ValueError("Map header must have type, height, width and map lines")
+    try:
+        height = int(lines[1].split()[1])
+        width = int(lines[2].split()[1])
+    except (IndexError, ValueError):
+        raise ValueError("Map header has an invalid height or width") from None
+
+    body = lines[4].rstrip(b"\n")
+    rows = body.count(b"\n") + 1 if body else 0
+    if rows != height or len(body) != height * (width + 1) - 1:
+        raise ValueError(
+            f"Map header says {height}x{width} but the data has {rows} rows "
+            "or rows of the wrong width"
+        )
+
+    cells = np.frombuffer(body + b"\n", dtype=np.uint8).reshape(height, width + 1)
+    if np.any(cells[:, -1] != ord("\n")):
+        raise ValueError(f"Map rows are not all {width} characters wide")
+
+    grid = np.frombuffer(body.translate(_OBSTACLE_TABLE) + b"\0", dtype=np.uint8)
+    return grid.reshape(height, width + 1)[:, :width].copy()
+
+
+def _source_key(map_path, with_hash):
+    stat = os.stat(map_path)
+    key = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(map_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        key["sha256"] = digest.hexdigest()
+    return key
+
+
+def _write_atomically(path, write):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _write_meta(meta_path, key):
+    _write_atomically(meta_path, lambda file: file.write(json.dumps(key).encode()))
+
+
+def load_cached_array(map_path, name, build):
+    """
+    Returns an array derived from a map file, using a binary cache stored next to it.
+    The array is saved as <map_path>.<name>.npy together with a <map_path>.<name>.json
+    file holding the size, modification time and SHA-256 hash of the map it was built
+    from. If the size and modification time still match, the cache is used without
+    reading the map at all. If only the modification time changed, the hash decides.
+    Otherwise the array is rebuilt and the cache replaced atomically, so several
+    processes can use the same cache safely.
+    The cache is opened with np.load(mmap_mode="c"): only the pages that are actually
+    read are loaded, and processes using the same map share them through the page
+    cache. The map is copy-on-write, so the returned array can be modified like
+    any other; a written page is copied in memory and the cache file never changes.
+    Args:
+        map_path (str or os.PathLike): The map file the array is derived from.
+        name (str): The name of the cached array, e.g. "grid".
+        build (callable): A function without arguments that builds the array.
+    Returns:
+        numpy.ndarray: The cached array as a copy-on-write memory map, or the freshly
+        built array if the cache could not be written.
+    """
+    cache_path = f"{os.fspath(map_path)}.{name}.npy"
+    meta_path = f"{os.fspath(map_path)}.{name}.json"
+
+    try:
+        with open(meta_path) as file:
+            cached_key = json.load(file)
+    except (OSError, ValueError):
+        cached_key = None
+
+    key = _source_key(map_path, with_hash=False)
+    if cached_key is not None and os.path.exists(cache_path):
+        if all(cached_key.get(field) == value for field, value in key.items()):
+            return np.load(cache_path, mmap_mode="c")
+        key = _source_key(map_path, with_hash=True)
+        if cached_key.get("sha256") == key["sha256"]:
+            _write_meta(meta_path, key)
+            return np.load(cache_path, mmap_mode="c")
+    else:
+        key = _source_key(map_path, with_hash=True)
+
+    array = build()
+    try:
+        _write_atomically(cache_path, lambda file: np.save(file, array))
+        _write_meta(meta_path, key)
+    except OSError:
+        return array
+    return np.load(cache_path, mmap_mode="c")
+
+
+def load_grid_cached(map_path):
+    """
+    Loads a map through the on-disk grid cache, see load_cached_array.
+    Args:
+        map_path (str or os.PathLike): The map file.
+    Returns:
+        numpy.ndarray: The uint8 grid.
+    """
+    return load_cached_array(map_path, "grid", lambda: load_map(map_path))
+
+
+def convert_map_to_grid(map_file_path=MAP_FILE_PATH, use_cache=MAP_CACHE):
+    """
+    Converts a map file to a grid representation.
+    Args:
+        map_file_path (str, os.PathLike or file object, optional): The map to load.
+            Defaults to MAP_FILE_PATH.
+        use_cache (bool, optional): Whether to load the grid through the on-disk
+            cache when map_file_path is a path. Defaults to MAP_CACHE.
     Returns:
         tuple: A tuple containing:
-            - grid (numpy.ndarray): A 2D numpy array representing the map grid.
+            - grid (numpy.ndarray): A 2D uint8 numpy array representing the map grid.
             - width (int): The width of the map.
             - height (int): The height of the map.
     """
-    with open(MAP_FILE_PATH, "r") as file:
-        # Read header information
-        type_line = file.readline().strip()
-        height = int(file.readline().split()[1])
-        width = int(file.readline().split()[1])
-        file.readline()  # Skip 'map' line
-
-        # Initialize grid with zeros
-        grid = np.zeros((height, width), dtype=int)
-
-        # Process the map
-        for y, line in enumerate(file):
-            for x, char in enumerate(line.strip()):
-                if (
-                    char == "@"
-                    or char == "T"
-                    or char == "O"
-                    or char == "S"
-                    or char == "W"
-                ):
-                    grid[y, x] = 1
-
+    if use_cache and not hasattr(map_file_path, "read"):
+        grid = load_grid_cached(map_file_path)
+    else:
+        grid = load_map(map_file_path)
+    height, width = grid.shape
     return grid, width, height
@@ -0,0 +1,348 @@
+import numpy as np
+
+from heap import IndexedHeap
+from helpers import load_cached_array, load_grid_cached
+from pathfinding import (
+    SQRT2,
+    astar,
+    distance_field,
+    is_valid,
+    neighbor_masks,
+    octile_heuristic,
+)
+
+
+def _runs(mask, size):
+    """
+    Yields the (start, end) ranges, end exclusive, of the True runs of a boolean
+    line, split at every multiple of size so no run spans two clusters.
+    """
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    for start, end in zip(changes[::2].tolist(), changes[1::2].tolist()):
+        for block in range(start - start % size, end, size):
+            yield max(start, block), min(end, block + size)
+
+
+def _straight_transitions(free, size):
+    """
+    Returns the ((x, y), (x + 1, y)) cell pairs that connect vertically adjacent
+    clusters, one from the middle of every run of open cells along each border.
+    """
+    transitions = []
+    for row in range(size - 1, free.shape[0] - 1, size):
+        for start, end in _runs(free[row] & free[row + 1], size):
+            middle = (start + end - 1) // 2
+            transitions.append(((row, middle), (row + 1, middle)))
+    return transitions
+
+
+def _diagonal_transitions(free, size):
+    """
+    Returns the diagonal cell pairs between different clusters whose two corner
+    cells are both blocked. Every other diagonal crossing can be replaced by two
+    straight steps through a corner, which the straight transitions already cover.
+    """
+    transitions = []
+    width = free.shape[1]
+    blocked = ~free
+    for dy in (1, -1):
+        columns = slice(0, width - 1) if dy > 0 else slice(1, width)
+        shifted = slice(1, width) if dy > 0 else slice(0, width - 1)
+        crossing = (
+            free[:-1, columns]
+            & free[1:, shifted]
+            & blocked[1:, columns]
+            & blocked[:-1, shifted]
+        )
+        rows, cols = np.nonzero(crossing)
+        if dy < 0:
+            cols = cols + 1
+        for x, y in zip(rows.tolist(), cols.tolist()):
+            if x // size != (x + 1) // size or y // size != (y + dy) // size:
+                transitions.append(((x, y), (x + 1, y + dy)))
+    return transitions
+
+
+class HPAGraph:
+    """
+    A hierarchical abstraction of a grid for HPA* (Botea et al. 2004).
+
+    The grid is split into square clusters. Every run of open cells along a border
+    between two clusters gets one entrance: a pair of abstract nodes, one on each
+    side, joined by an inter-cluster edge. Within each cluster the entrances are
+    joined by intra-cluster edges weighted with the shortest path cost inside the
+    cluster. A query searches only this small graph and then refines the abstract
+    path one cluster at a time with astar, so its cost depends on the cluster size
+    and the length of the path rather than on the size of the map.
+
+    The paths are valid but not always optimal: with one entrance per border run the
+    cost is typically within a few percent of the optimum.
+
+    The graph is a snapshot: build a new HPAGraph after changing the grid.
+    """
+
+    def __init__(self, grid, cluster_size=16, edges=None):
+        """
+        Args:
+            grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+            cluster_size (int, optional): The side length of the clusters.
+                Defaults to 16.
+            edges (numpy.ndarray, optional): The edges from to_array() of a graph
+                built earlier for the same grid and cluster size. Built if not given.
+        """
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.adjacency = {}
+        self.cluster_nodes = {}
+        self._cluster_masks = {}  # Neighbour masks of the cluster views, see refine
+        if edges is None:
+            edges = self._build()
+        for x1, y1, x2, y2, cost in np.asarray(edges).tolist():
+            self._add_edge((int(x1), int(y1)), (int(x2), int(y2)), cost)
+
+    def __len__(self):
+        return len(self.adjacency)
+
+    def cluster_of(self, node):
+        return node[0] // self.cluster_size, node[1] // self.cluster_size
+
+    def cluster_view(self, cluster):
+        """
+        Returns the part of the grid covered by a cluster and its top left cell.
+        """
+        top = cluster[0] * self.cluster_size
+        left = cluster[1] * self.cluster_size
+        view = self.grid[top : top + self.cluster_size, left : left + self.cluster_size]
+        return view, (top, left)
+
+    def _add_edge(self, a, b, cost):
+        for node in (a, b):
+            if node not in self.adjacency:
+                self.adjacency[node] = []
+                self.cluster_nodes.setdefault(self.cluster_of(node), []).append(node)
+        self.adjacency[a].append((b, cost))
+        self.adjacency[b].append((a, cost))
+
+    def _build(self):
+        free = np.asarray(self.grid) == 0
+        size = self.cluster_size
+        transitions = _straight_transitions(free, size)
+        transitions += [
+            ((a[1], a[0]), (b[1], b[0])) for a, b in _straight_transitions(free.T, size)
+        ]
+        transitions += _diagonal_transitions(free, size)
+
+        edges = []
+        cluster_nodes = {}
+        for a, b in transitions:
+            edges.append((*a, *b, SQRT2 if a[0] != b[0] and a[1] != b[1] else 1))
+            for node in (a, b):
+                cluster_nodes.setdefault(self.cluster_of(node), set()).add(node)
+
+        for cluster, nodes in cluster_nodes.items():
+            view, (top, left) = self.cluster_view(cluster)
+            nodes = sorted(nodes)
+            for index, a in enumerate(nodes):
+                distances = distance_field(view, (a[0] - top, a[1] - left))
+                for b in nodes[index + 1 :]:
+                    distance = distances[b[0] - top, b[1] - left]
+                    if distance != np.inf:
+                        edges.append((*a, *b, distance))
+        return np.array(edges, dtype=np.float64).reshape(-1, 5)
+
+    def to_array(self):
+        """
+        Returns the edges of the graph as a float64 array with one (x1, y1, x2, y2,
+        cost) row per edge, the serialized form accepted by the constructor.
+        """
+        edges = [
+            (*a, *b, cost)
+            for a, neighbors in self.adjacency.items()
+            for b, cost in neighbors
+            if a < b
+        ]
+        return np.array(edges, dtype=np.float64).reshape(-1, 5)
+
+    def save(self, file):
+        """
+        Writes the graph to a .npz file.
+        """
+        np.savez(
+            file,
+            edges=self.to_array(),
+            cluster_size=self.cluster_size,
+            shape=np.array(np.shape(self.grid)),
+        )
+
+    @classmethod
+    def load(cls, file, grid):
+        """
+        Reads a graph written by save().
+        Args:
+            file (str or file object): The .npz file.
+            grid (numpy.ndarray): The grid the graph was built for.
+        Returns:
+            HPAGraph: The graph.
+        Raises:
+            ValueError: If the graph was built for a grid of a different shape.
+        """
+        with np.load(file) as data:
+            if tuple(data["shape"]) != np.shape(grid):
+                raise ValueError(
+                    f"Graph is for a {tuple(data['shape'])} grid, not {np.shape(grid)}"
+                )
+            return cls(grid, int(data["cluster_size"]), data["edges"])
+
+    def _connect(self, node, other, extra):
+        """
+        Adds temporary edges from node to the abstract nodes of its cluster, and to
+        other if it is in the same cluster.
+        """
+        cluster = self.cluster_of(node)
+        view, (top, left) = self.cluster_view(cluster)
+        distances = distance_field(view, (node[0] - top, node[1] - left))
+        targets = list(self.cluster_nodes.get(cluster, []))
+        if self.cluster_of(other) == cluster:
+            targets.append(other)
+        for target in targets:
+            distance = distances[target[0] - top, target[1] - left]
+            if target != node and distance != np.inf:
+                extra.setdefault(node, []).append((target, distance))
+                extra.setdefault(target, []).append((node, distance))
+
+    def abstract_path(self, start, goal):
+        """
+        Searches the abstract graph with the start and goal temporarily connected
+        to the entrances of their clusters.
+        Args:
+            start (tuple of int): The starting position in the grid (x, y).
+            goal (tuple of int): The goal position in the grid (x, y).
+        Returns:
+            tuple: A tuple containing:
+                - list of tuple of int: The waypoints from start to goal. Each pair
+                  of consecutive waypoints is in the same cluster or adjacent.
+                - float: The cost of the path, infinity if no path is found.
+        """
+        start, goal = tuple(map(int, start)), tuple(map(int, goal))
+        if not is_valid(*start, self.grid) or not is_valid(*goal, self.grid):
+            return [], np.inf
+        if start == goal:
+            return [start], 0
+
+        extra = {}
+        self._connect(start, goal, extra)
+        self._connect(goal, start, extra)
+
+        g_score = {start: 0}
+        came_from = {start: None}
+        closed = set()
+        unexplored_nodes = IndexedHeap()
+        unexplored_nodes.push(start, (octile_heuristic(start, goal), 0))
+        while unexplored_nodes:
+            current, _ = unexplored_nodes.pop()
+            if current == goal:
+                waypoints = []
+                while current is not None:
+                    waypoints.append(current)
+                    current = came_from[current]
+                return waypoints[::-1], g_score[goal]
+
+            closed.add(current)
+            current_g = g_score[current]
+            for neighbor, cost in self.adjacency.get(current, []) + extra.get(
+                current, []
+            ):
+                new_g_score = current_g + cost
+                if neighbor in closed or new_g_score >= g_score.get(neighbor, np.inf):
+                    continue
+                g_score[neighbor] = new_g_score
+                came_from[neighbor] = current
+                unexplored_nodes.push(
+                    neighbor,
+                    (new_g_score + octile_heuristic(neighbor, goal), -new_g_score),
+                )
+        return [], np.inf
+
+    def refine(self, waypoints):
+        """
+        Turns an abstract path into grid paths one segment at a time, so the caller
+        can start moving along the first segments before the rest is refined.
+        Args:
+            waypoints (list of tuple of int): The waypoints from abstract_path.
+        Yields:
+            list of tuple of int: The cells from each waypoint to the next, both
+            included.
+        """
+        for a, b in zip(waypoints, waypoints[1:]):
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):
+                yield [a, b]  # An inter-cluster edge is a single step
+                continue
+            view, (top, left) = self.cluster_view(cluster)
+            masks = self._cluster_masks.get(cluster)
+            if masks is None:
+                masks = self._cluster_masks[cluster] = neighbor_masks(view)
+            path, _ = astar(
+                view, (a[0] - top, a[1] - left), (b[0] - top, b[1] - left), masks=masks
+            )
+            yield [(x + top, y + left) for x, y in path]
+
+    def find_path(self, start, goal):
+        """
+        Finds a path from start to goal by searching the abstract graph and
+        refining every segment of the abstract path.
+        Returns:
+            tuple: A tuple containing:
+                - list of tuple of int: The path from start to goal as a list of positions (x, y).
+                - int: The length of the path.
+        """
+        waypoints, _ = self.abstract_path(start, goal)
+        if not waypoints:
+            return [], 0
+        path = waypoints[:1]
+        for segment in self.refine(waypoints):
+            path.extend(segment[1:])
+        return path, len(path)
+
+
+def load_hpa_graph(map_path, cluster_size=16, grid=None):
+    """
+    Loads the HPA* graph of a map file, building it on the first use and storing
+    its edges in the on-disk cache next to the map (see helpers.load_cached_array).
+    Args:
+        map_path (str or os.PathLike): The map file.
+        cluster_size (int, optional): The side length of the clusters.
+        grid (numpy.ndarray, optional): The grid of the map, if the caller has
+            already loaded it. Defaults to the grid from helpers.load_grid_cached,
+            so the map is only parsed when its grid cache is stale.
+    Returns:
+        HPAGraph: The graph of the map.
+    """
+    if grid is None:
+        grid = load_grid_cached(map_path)
+    edges = load_cached_array(
+        map_path,
+        f"hpa{cluster_size}",
+        lambda: HPAGraph(grid, cluster_size).to_array(),
+    )
+    return HPAGraph(grid, cluster_size, edges)
+
+
+def hpa_star(grid, start, goal, graph=None):
+    """
+    Perform hierarchical pathfinding (HPA*). See HPAGraph.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        graph (HPAGraph, optional): The abstract graph of the grid, built once and
+            reused between queries. Built if not given.
+    Returns:
+        tuple: A tuple containing:
+            - list of tuple of int: The path from start to goal as a list of positions (x, y).
+            - int: The length of the path.
+    """
+    if graph is None:
+        graph = HPAGraph(grid)
+    return graph.find_path(start, goal)
@@ -0,0 +1,194 @@
+import numpy as np
+
+from helpers import load_cached_array, load_map
+from pathfinding import DIRECTIONS, search_jump_points
+
+
+def _cardinal_table(blocked):
+    """
+    Computes the jump distances for moving right (0, 1) along every row.
+
+    A cell moving right is a jump point if it has a forced neighbour: the cell
+    above or below it is blocked while the cell diagonally ahead on that side is
+    free. The columns are swept from right to left so every cell can reuse the
+    distance of the cell next to it.
+    """
+    height, width = blocked.shape
+    padded = np.pad(blocked, 1, constant_values=True)
+    forced = ~blocked & (
+        (padded[:-2, 1:-1] & ~padded[:-2, 2:]) | (padded[2:, 1:-1] & ~padded[2:, 2:])
+    )
+
+    table = np.zeros((height, width), dtype=np.int16)
+    for column in range(width - 2, -1, -1):
+        ahead = table[:, column + 1]
+        table[:, column] = np.where(
+            blocked[:, column + 1],
+            0,
+            np.where(
+                forced[:, column + 1], 1, np.where(ahead > 0, ahead + 1, ahead - 1)
+            ),
+        )
+    table[blocked] = 0
+    return table
+
+
+def _diagonal_table(blocked):
+    """
+    Computes the jump distances for moving down-right (1, 1).
+
+    A cell on the diagonal is a jump point if it has a forced neighbour or if a
+    straight jump down or right from it finds a jump point. The rows are swept from
+    the bottom up so every cell can reuse the distance of the cell diagonally ahead.
+    """
+    height, width = blocked.shape
+    right = _cardinal_table(blocked)
+    down = _cardinal_table(blocked.T).T
+    padded = np.pad(blocked, 1, constant_values=True)
+    forced = ~blocked & (
+        (padded[:-2, 1:-1] & ~padded[:-2, 2:]) | (padded[1:-1, :-2] & ~padded[2:, :-2])
+    )
+    stops = forced | (right > 0) | (down > 0)
+
+    table = np.zeros((height, width), dtype=np.int16)
+    for row in range(height - 2, -1, -1):
+        ahead = table[row + 1, 1:]
+        table[row, :-1] = np.where(
+            blocked[row + 1, 1:],
+            0,
+            np.where(stops[row + 1, 1:], 1, np.where(ahead > 0, ahead + 1, ahead - 1)),
+        )
+    table[blocked] = 0
+    return table
+
+
+def _oriented(blocked, direction):
+    """
+    Flips and transposes the grid so that direction becomes right (0, 1) or
+    down-right (1, 1), and returns a function that undoes the transformation.
+    """
+    dx, dy = direction
+    if dx != 0 and dy != 0:
+        rows = slice(None, None, dx)
+        columns = slice(None, None, dy)
+        return blocked[rows, columns], lambda table: table[rows, columns]
+    if dx == 0:
+        columns = slice(None, None, dy)
+        return blocked[:, columns], lambda table: table[:, columns]
+    rows = slice(None, None, dx)
+    return blocked[rows].T, lambda table: table.T[rows]
+
+
+def compute_jump_table(grid):
+    """
+    Precomputes the JPS+ jump distances of every cell in every direction.
+
+    For each free cell and each of the 8 DIRECTIONS the table stores the number of
+    steps to the next jump point as a positive value. If there is no jump point
+    before the next obstacle, it stores the number of free steps to the obstacle as
+    zero or a negative value. The jump points are the same that jps finds.
+    Args:
+        grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+    Returns:
+        numpy.ndarray: An int16 array of shape (height, width, 8) in DIRECTIONS order.
+    Raises:
+        ValueError: If the grid is too large for int16 distances.
+    """
+    blocked = np.asarray(grid) != 0
+    if max(blocked.shape) > np.iinfo(np.int16).max:
+        raise ValueError("Grid is too large for an int16 jump table")
+
+    table = np.empty(blocked.shape + (len(DIRECTIONS),), dtype=np.int16)
+    for index, direction in enumerate(DIRECTIONS):
+        oriented, restore = _oriented(blocked, direction)
+        if direction[0] != 0 and direction[1] != 0:
+            table[..., index] = restore(_diagonal_table(oriented))
+        else:
+            table[..., index] = restore(_cardinal_table(oriented))
+    return table
+
+
+def load_jump_table(map_path):
+    """
+    Loads the jump table of a map file, computing it on the first use and storing
+    it in the on-disk cache next to the map (see helpers.load_cached_array).
+    Args:
+        map_path (str or os.PathLike): The map file.
+    Returns:
+        numpy.ndarray: The jump table.
+    """
+    return load_cached_array(
+        map_path, "jps_plus", lambda: compute_jump_table(load_map(map_path))
+    )
+
+
+def jps_plus(
+    grid,
+    start,
+    goal,
+    table=None,
+    state=None,
+    observer=None,
+    components=None,
+    stats=None,
+    masks=None,
+):
+    """
+    Perform Jump Point Search with precomputed jump distances (JPS+). Instead of
+    walking the grid one cell at a time, each jump is a single lookup in the jump
+    table. The goal is handled at query time: a cardinal jump stops at the goal if
+    it lies on the jump, and a diagonal jump stops at the row or column of the goal
+    if the goal lies ahead of it.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        table (numpy.ndarray, optional): The jump table of the grid from
+            compute_jump_table or load_jump_table. Computed if not given.
+        state (optional): The search state backend. Defaults to a new DictSearchState.
+        observer (callable, optional): See jps.
+        components (ComponentIndex, optional): See jps.
+        stats (SearchStats, optional): See jps. jump_steps counts the table
+            lookups, one per jump.
+        masks (numpy.ndarray, optional): See jps. Only used to prune the directions.
+    Returns:
+        tuple: A tuple containing:
+            - list of tuple of int: The full path from start to goal as a list of positions (x, y).
+            - int: The length of the path.
+    """
+    if table is None:
+        table = compute_jump_table(grid)
+    direction_index = {direction: index for index, direction in enumerate(DIRECTIONS)}
+
+    def jump(node, direction):
+        x, y = node
+        dx, dy = direction
+        distance = int(table[x, y, direction_index[direction]])
+        if stats is not None:
+            stats.jump_steps += 1
+        to_goal_x = (goal[0] - x) * dx
+        to_goal_y = (goal[1] - y) * dy
+
+        if dx == 0 or dy == 0:
+            # Is the goal straight ahead, before the jump point or wall?
+            if dx == 0:
+                on_line = goal[0] == x and to_goal_y > 0
+                steps = to_goal_y
+            else:
+                on_line = goal[1] == y and to_goal_x > 0
+                steps = to_goal_x
+            if on_line and steps <= abs(distance):
+                return goal
+        elif to_goal_x > 0 and to_goal_y > 0:
+            # Stop in the row or column of the goal if it comes first
+            steps = min(to_goal_x, to_goal_y)
+            if steps <= abs(distance):
+                return x + dx * steps, y + dy * steps
+
+        if distance > 0:
+            return x + dx * distance, y + dy * distance
+        return None
+
+    return search_jump_points(
+        grid, start, goal, jump, state, observer, components, stats, masks
+    )
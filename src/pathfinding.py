@@ -1,9 +1,9 @@
-from queue import PriorityQueue
+import heapq
 
 import numpy as np
 
-from settings import DRAW_IN_PROGRESS, DRAWING_FREQ
-from ui import draw_grid
+from heap import IndexedHeap
+from search_state import DictSearchState
 
 DIRECTIONS = [
     (0, 1),  # right
@@ -16,6 +16,21 @@ DIRECTIONS = [
     (1, -1),  # down-left
 ]
 
+SQRT2 = np.sqrt(2)
+
+# Bit i of a neighbour mask is set if the neighbour in DIRECTIONS[i] is free
+DIRECTION_BITS = {direction: 1 << index for index, direction in enumerate(DIRECTIONS)}
+
+# The (dx, dy, cost) steps to the free neighbours of every possible mask value
+MASK_STEPS = [
+    tuple(
+        (dx, dy, SQRT2 if dx and dy else 1)
+        for index, (dx, dy) in enumerate(DIRECTIONS)
+        if mask >> index & 1
+    )
+    for mask in range(256)
+]
+
 
 # Manhattan distance heuristic
 # def manhattan_heuristic(a, b):
@@ -50,7 +65,24 @@ def octile_heuristic(a, b):
     """
     dx = abs(b[0] - a[0])
     dy = abs(b[1] - a[1])
-    return dx + dy + (np.sqrt(2) - 2) * min(dx, dy)
+    return dx + dy + (SQRT2 - 2) * min(dx, dy)
+
+
+def path_cost(path):
+    """
+    Calculate the cost of a path under the octile movement model: 1 for every
+    cardinal step and sqrt(2) for every diagonal step.
+
+    Args:
+        path (list of tuple of int): The path as a list of positions (x, y).
+
+    Returns:
+        float: The total cost of the path, 0 for an empty or single node path.
+    """
+    cost = 0
+    for a, b in zip(path, path[1:]):
+        cost += octile_heuristic(a, b)
+    return cost
 
 
 def is_valid(x, y, grid):
@@ -72,242 +104,643 @@ def is_valid(x, y, grid):
     return 0 <= x < grid.shape[0] and 0 <= y < grid.shape[1] and grid[x, y] == 0
 
 
-def astar(grid, start, goal):
+def neighbor_masks(grid, band_rows=1024):
+    """
+    Precomputes which neighbours of every cell can be moved to.
+
+    The searches read one mask per expanded cell instead of checking the bounds
+    and the grid value of all eight neighbours with is_valid. Cells outside the
+    grid count as blocked, so the masks also replace the bounds checks.
+
+    The grid is read in bands of rows, so the temporary arrays stay small on huge
+    maps. A grid with its own neighbor_masks method, like bitgrid.BitGrid, returns
+    that instead: a BitGrid computes its masks lazily, so they never take a byte
+    for every cell of the map.
+
+    Args:
+        grid (numpy.ndarray or BitGrid): The grid, nonzero cells are obstacles.
+        band_rows (int, optional): The number of rows processed at a time.
+
+    Returns:
+        numpy.ndarray: A uint8 array of the grid's shape where bit i of each cell is
+        set if its neighbour in DIRECTIONS[i] is free (see DIRECTION_BITS). Only
+        masks[x, y] lookups may be used on the masks of a BitGrid.
+    """
+    if hasattr(grid, "neighbor_masks"):
+        return grid.neighbor_masks()
+    height, width = grid.shape
+    masks = np.empty((height, width), dtype=np.uint8)
+    for top in range(0, height, band_rows):
+        bottom = min(top + band_rows, height)
+        masks[top:bottom] = row_neighbor_masks(grid, top, bottom)
+    return masks
+
+
+def row_neighbor_masks(grid, top, bottom):
+    """
+    Computes the neighbour masks (see neighbor_masks) of the rows top ... bottom - 1
+    of a grid, reading only those rows and the ones next to them.
+    Returns:
+        numpy.ndarray: A uint8 array of shape (bottom - top, width).
+    """
+    height, width = grid.shape
+    # The rows and the ones around them, padded with blocked cells at the edges
+    begin, end = max(top - 1, 0), min(bottom + 1, height)
+    free = np.asarray(grid[begin:end]) == 0
+    padded = np.pad(
+        free,
+        ((1 - (top - begin), 1 - (end - bottom)), (1, 1)),
+        constant_values=False,
+    )
+    rows = bottom - top
+    masks = np.zeros((rows, width), dtype=np.uint8)
+    for index, (dx, dy) in enumerate(DIRECTIONS):
+        neighbor_free = padded[1 + dx : 1 + dx + rows, 1 + dy : 1 + dy + width]
+        masks |= neighbor_free.astype(np.uint8) << index
+    return masks
+
+
+def update_neighbor_masks(masks, grid, node):
+    """
+    Patches the masks from neighbor_masks after the cell at node has been changed
+    in the grid. Only the bits of its eight neighbours that point to it change.
+
+    Args:
+        masks (numpy.ndarray): The masks of the grid, updated in place.
+        grid (numpy.ndarray): The grid after the change.
+        node (tuple of int): The changed cell (x, y).
+    """
+    x, y = node
+    free = grid[x, y] == 0
+    for index, (dx, dy) in enumerate(DIRECTIONS):
+        # The neighbour whose step in this direction leads to node
+        nx, ny = x - dx, y - dy
+        if 0 <= nx < masks.shape[0] and 0 <= ny < masks.shape[1]:
+            if free:
+                masks[nx, ny] |= 1 << index
+            else:
+                masks[nx, ny] &= ~(1 << index) & 0xFF
+
+
+def astar(
+    grid,
+    start,
+    goal,
+    state=None,
+    observer=None,
+    components=None,
+    stats=None,
+    heuristic=octile_heuristic,
+    masks=None,
+    weight=1,
+):
     """
     Perform the A* pathfinding algorithm to find the shortest path from start to goal in a grid.
     Args:
         grid (np.array): The grid representing the map where the pathfinding is performed.
         start (tuple of int): The starting position in the grid (x, y).
         goal (tuple of int): The goal position in the grid (x, y).
+        state (optional): The search state backend, e.g. an ArraySearchState that is
+            reused between queries on the same grid. Defaults to a new DictSearchState.
+        observer (callable, optional): Called as observer("expand", node) for every
+            expanded node, e.g. to visualize the search.
+        components (ComponentIndex, optional): Connected components of the grid.
+            Queries between different components are rejected without searching.
+        stats (SearchStats, optional): Counters of the search's work, filled in if
+            given. See search_stats.run_search.
+        heuristic (callable, optional): heuristic(node, goal) estimates the cost from
+            node to goal. It must be consistent for the path to be optimal, e.g. a
+            landmarks.LandmarkHeuristic. Defaults to octile_heuristic.
+        masks (numpy.ndarray, optional): The neighbour masks of the grid from
+            neighbor_masks. Computing them takes a pass over the whole grid, so
+            compute them once and pass them to every query on the same grid.
+            Computed for this query only if not given.
+        weight (float, optional): The suboptimality factor epsilon of weighted A*.
+            The nodes are ordered by g + weight * h, which expands fewer nodes but
+            may return a path costing up to weight times the optimum. Defaults to 1,
+            plain A* with optimal paths.
     Returns:
         tuple: A tuple containing:
             - list of tuple of int: The path from start to goal as a list of positions (x, y).
             - int: The length of the path.
     Notes:
         - The grid is assumed to be a 2D list where each element represents a cell.
-        - The function uses a heuristic based on the Euclidean distance to estimate the cost from the current node to the goal.
-        - The function draws the grid at intervals if DRAW_IN_PROGRESS is set to True and DRAWING_FREQ is defined.
+        - The function uses the octile distance as the default heuristic to estimate the cost from the current node to the goal.
+        - The open list is an indexed binary heap ordered by (f, -g), so each expansion is O(log n)
+          and ties between equal f-scores are broken towards the node closest to the goal.
+        - The neighbours of a node are read from its neighbour mask with a single array lookup.
         - The function returns an empty list and a path length of 0 if no path is found.
     """
+    if not is_valid(start[0], start[1], grid) or not is_valid(goal[0], goal[1], grid):
+        return [], 0  # No path found
+    if components is not None and not components.connected(start, goal):
+        return [], 0  # No path found
+
+    if state is None:
+        state = DictSearchState()
+    else:
+        state.reset()
+    if masks is None:
+        masks = neighbor_masks(grid)
 
-    # Get the neighbors of a node
-    def get_neighbors(node):
-        """
-        Given a node, returns a list of valid neighboring nodes.
-
-        Args:
-            node (tuple): A tuple representing the coordinates of the current node (x, y).
-
-        Returns:
-            list: A list of tuples, each representing the coordinates of a valid neighboring node.
-
-        The function iterates over a predefined set of directions (DIRECTIONS) and calculates
-        the coordinates of neighboring nodes. It then checks if each neighboring node is valid
-        using the is_valid function. Valid neighbors are added to the result list.
-        """
-        result = []
-        for direction in DIRECTIONS:
-            neighbor = (node[0] + direction[0], node[1] + direction[1])
-            if is_valid(neighbor[0], neighbor[1], grid):
-                result.append(neighbor)
-        return result
-
-    visited_nodes = set()  # Nodes already evaluated
-    unexplored_nodes = {start}  # Nodes to be evaluated
-    came_from = {}  # Previous node for reconstructing the path
-
-    g_score = {start: 0}  # Cost from start along best path
-    f_score = {
-        start: octile_heuristic(start, goal)
-    }  # Estimated total cost from start to goal
-    drawingcounter = 0
+    unexplored_nodes = IndexedHeap()  # Nodes to be evaluated, ordered by (f, -g)
+    state.set(start, 0, None)
+    # Estimated total cost from start to goal, ties broken towards the larger g
+    unexplored_nodes.push(start, (weight * heuristic(start, goal), 0))
+    if stats is not None:
+        stats.pushed(1)
 
     while unexplored_nodes:
-        current = min(unexplored_nodes, key=lambda x: f_score[x])
+        current, _ = unexplored_nodes.pop()
+        if stats is not None:
+            stats.pops += 1
 
         if current == goal:
-            path_lenght = g_score[goal]
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            path.append(start)
-            return path[::-1], len(path)
-
-        drawingcounter += 1
-        if DRAW_IN_PROGRESS and drawingcounter % DRAWING_FREQ == 0:
-            draw_grid(
-                grid,
-                path=list(visited_nodes),
-                path_color=(66, 66, 66),
-                start=start,
-                goal=goal,
-            )
-            drawingcounter = 0
+            path = state.path_to(goal)
+            return path, len(path)
+
+        if observer is not None:
+            observer("expand", current)
 
-        unexplored_nodes.remove(current)
-        visited_nodes.add(current)
+        state.close(current)
+        current_g = state.get_g(current)
+        x, y = current
+        if stats is not None:
+            stats.expanded += 1
 
-        for neighbor in get_neighbors(current):
-            if neighbor in visited_nodes:
+        for dx, dy, cost in MASK_STEPS[masks[x, y]]:
+            neighbor = (x + dx, y + dy)
+            if state.is_closed(neighbor):
                 continue
+            if stats is not None:
+                stats.generated += 1
 
             # The distance from start to a neighbor
-            if abs(neighbor[0] - current[0]) + abs(neighbor[1] - current[1]) == 2:
-                new_g_score = g_score[current] + np.sqrt(2)
-            else:
-                new_g_score = g_score[current] + 1
-
-            if neighbor not in unexplored_nodes:
-                unexplored_nodes.add(neighbor)
-            elif new_g_score >= g_score[neighbor]:
+            new_g_score = current_g + cost
+            if new_g_score >= state.get_g(neighbor):
                 continue
 
-            came_from[neighbor] = current
-            g_score[neighbor] = new_g_score
-            f_score[neighbor] = g_score[neighbor] + octile_heuristic(neighbor, goal)
+            # Insert the neighbor or decrease its key in the open list
+            state.set(neighbor, new_g_score, current)
+            unexplored_nodes.push(
+                neighbor,
+                (new_g_score + weight * heuristic(neighbor, goal), -new_g_score),
+            )
+            if stats is not None:
+                stats.pushed(len(unexplored_nodes))
 
     return [], 0  # No path found
 
 
-def jps(grid, start, goal):
-
-    if start == goal:
-        return [start], 0
+def bidirectional_astar(
+    grid, start, goal, observer=None, components=None, stats=None, masks=None
+):
+    """
+    Perform A* from both ends at once: a forward search from start and a backward
+    search from goal, expanding the side with the smaller open list next.
+
+    Both searches use the average of the two octile estimates as their potential,
+    (octile_heuristic(node, goal) - octile_heuristic(start, node)) / 2 forwards and
+    its negation backwards, so the f-scores of a node on both sides add up to the
+    cost of the path through it. Every time one search reaches a node labelled by
+    the other, the joined path is a candidate for the shortest path, and the search
+    stops when the smallest f-scores of the two open lists add up to at least the
+    best candidate: no path through an unexpanded node can be shorter. Unlike
+    stopping when the searches first meet, this always returns an optimal path.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        observer (callable, optional): Called as observer("expand", node) for every
+            node expanded by either search.
+        components (ComponentIndex, optional): See astar.
+        stats (SearchStats, optional): See astar. The open list counters cover both
+            open lists, peak_open their largest combined size.
+        masks (numpy.ndarray, optional): See astar.
+    Returns:
+        tuple: The path from start to goal and its length, as returned by astar.
+    """
     if not is_valid(start[0], start[1], grid) or not is_valid(goal[0], goal[1], grid):
         return [], 0  # No path found
+    if components is not None and not components.connected(start, goal):
+        return [], 0  # No path found
+    if start == goal:
+        return [start], 1
+
+    if masks is None:
+        masks = neighbor_masks(grid)
+
+    def potential(side, node):
+        forward = (octile_heuristic(node, goal) - octile_heuristic(start, node)) / 2
+        return forward if side == 0 else -forward
+
+    # Index 0 is the forward search, index 1 the backward search
+    states = (DictSearchState(), DictSearchState())
+    open_lists = (IndexedHeap(), IndexedHeap())
+    for side, node in enumerate((start, goal)):
+        states[side].set(node, 0, None)
+        open_lists[side].push(node, (potential(side, node), 0))
+        if stats is not None:
+            stats.pushed(side + 1)
+
+    best_cost = np.inf
+    meeting_node = None
+    while open_lists[0] and open_lists[1]:
+        if open_lists[0].peek()[1][0] + open_lists[1].peek()[1][0] >= best_cost:
+            break
 
-    class PathFound(Exception):
-        pass
+        side = 0 if len(open_lists[0]) <= len(open_lists[1]) else 1
+        state, other = states[side], states[1 - side]
+        current, _ = open_lists[side].pop()
+        if observer is not None:
+            observer("expand", current)
+        if stats is not None:
+            stats.pops += 1
+            stats.expanded += 1
+        state.close(current)
+        current_g = state.get_g(current)
+
+        for dx, dy, cost in MASK_STEPS[masks[current[0], current[1]]]:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if state.is_closed(neighbor):
+                continue
+            if stats is not None:
+                stats.generated += 1
+            new_g_score = current_g + cost
+            if new_g_score >= state.get_g(neighbor):
+                continue
 
-    def jump(node):
-        if node is not None:
-            unexplored_nodes.put((octile_heuristic(node, goal), node))
+            state.set(neighbor, new_g_score, current)
+            open_lists[side].push(
+                neighbor, (new_g_score + potential(side, neighbor), -new_g_score)
+            )
+            if stats is not None:
+                stats.pushed(len(open_lists[0]) + len(open_lists[1]))
+            # A shorter path through a node the other search has reached
+            if new_g_score + other.get_g(neighbor) < best_cost:
+                best_cost = new_g_score + other.get_g(neighbor)
+                meeting_node = neighbor
+
+    if meeting_node is None:
+        return [], 0  # No path found
+    path = states[0].path_to(meeting_node) + states[1].path_to(meeting_node)[-2::-1]
+    return path, len(path)
 
-    def step_cardinal(node, direction, cost):
 
-        current_x, current_y = node
-        current_cost = cost
+def distance_field(grid, source):
+    """
+    Calculate the cost of the shortest path from source to every cell of the grid
+    with Dijkstra's algorithm, using the same octile movement model as astar.
 
-        while True:
+    Args:
+        grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+        source (tuple of int): The cell the distances are measured from (x, y).
 
-            current_x += direction[0]
-            current_y += direction[1]
-            current_cost += 1
+    Returns:
+        numpy.ndarray: A float array of the grid's shape with the distances, and
+        infinity for obstacles and unreachable cells.
+    """
+    height, width = grid.shape
+    blocked = (np.asarray(grid) != 0).ravel().tolist()
+    distances = [np.inf] * (height * width)
+    if not is_valid(source[0], source[1], grid):
+        return np.array(distances).reshape(height, width)
+
+    steps = [
+        (dx, dy, dx * width + dy, SQRT2 if dx and dy else 1) for dx, dy in DIRECTIONS
+    ]
+    start = source[0] * width + source[1]
+    distances[start] = 0
+    queue = [(0, start)]
+    while queue:
+        distance, index = heapq.heappop(queue)
+        if distance > distances[index]:
+            continue
+        x, y = divmod(index, width)
+        for dx, dy, offset, cost in steps:
+            if not (0 <= x + dx < height and 0 <= y + dy < width):
+                continue
+            neighbor = index + offset
+            new_distance = distance + cost
+            if not blocked[neighbor] and new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                heapq.heappush(queue, (new_distance, neighbor))
+    return np.array(distances).reshape(height, width)
+
+
+# For each cardinal direction, the bit of the cell ahead and the (blocked side,
+# free diagonal) bit pairs that make a cell on the way a jump point
+_STRAIGHT_CHECKS = {
+    (dx, dy): (
+        DIRECTION_BITS[dx, dy],
+        [
+            (DIRECTION_BITS[side], DIRECTION_BITS[side[0] + dx, side[1] + dy])
+            for side in ([(1, 0), (-1, 0)] if dx == 0 else [(0, 1), (0, -1)])
+        ],
+    )
+    for dx, dy in DIRECTIONS[:4]
+}
+
+
+def jump_straight(masks, node, direction, goal, stats=None):
+    """
+    Walks from node in a cardinal direction until it reaches a jump point, the goal
+    or an obstacle.
 
-            if (current_x, current_y) == goal:
-                came_from[(current_x, current_y)] = node
-                g_score[(current_x, current_y)] = current_cost
-                raise PathFound()
-            else:
-                pass
-            if not is_valid(current_x, current_y, grid):
-                return None
-            if (current_x, current_y) in came_from:
-                return None
-            if (current_x, current_y) not in g_score:
-                g_score[(current_x, current_y)] = current_cost
-                came_from[(current_x, current_y)] = node
-
-            if direction[0] == 0:
-                if not is_valid(current_x + 1, current_y, grid) and is_valid(
-                    current_x + 1, current_y + direction[1], grid
-                ):
-                    return current_x, current_y
-                if not is_valid(current_x - 1, current_y, grid) and is_valid(
-                    current_x - 1, current_y + direction[1], grid
-                ):
-                    return current_x, current_y
-            elif direction[1] == 0:
-                if not is_valid(current_x, current_y + 1, grid) and is_valid(
-                    current_x + direction[0], current_y + 1, grid
-                ):
-                    return current_x, current_y
-                if not is_valid(current_x, current_y - 1, grid) and is_valid(
-                    current_x + direction[0], current_y - 1, grid
-                ):
-                    return current_x, current_y
-
-    def step_diagonal(node, direction, cost):
-
-        current_x, current_y = node
-        current_cost = cost
-
-        while True:
-            current_x += direction[0]
-            current_y += direction[1]
-            current_cost += 1
-
-            if (current_x, current_y) == goal:
-                came_from[(current_x, current_y)] = node
-                g_score[(current_x, current_y)] = current_cost
-                raise PathFound()
-            else:
-                pass
-            if not is_valid(current_x, current_y, grid):
-                return None
-            if (current_x, current_y) in came_from:
-                return None
-            if (current_x, current_y) not in g_score:
-                g_score[(current_x, current_y)] = current_cost
-                came_from[(current_x, current_y)] = node
-
-            if not is_valid(current_x + direction[0], current_y, grid) and is_valid(
-                current_x + direction[0], current_y + direction[1], grid
-            ):
-                return current_x, current_y
-            else:
-                jump(
-                    step_cardinal(
-                        (current_x, current_y), (direction[0], 0), current_cost
-                    )
-                )
-
-            if not is_valid(current_x, current_y + direction[1], grid) and is_valid(
-                current_x + direction[0], current_y + direction[1], grid
-            ):
-                return current_x, current_y
-            else:
-                jump(
-                    step_cardinal(
-                        (current_x, current_y), (0, direction[1]), current_cost
-                    )
-                )
+    A cell is a jump point if it has a forced neighbour: a cell diagonally ahead
+    that can only be reached optimally through it because the cell beside it is
+    blocked.
+
+    Args:
+        masks (numpy.ndarray): The neighbour masks of the grid from neighbor_masks.
+        node (tuple of int): The cell the jump starts from (x, y).
+        direction (tuple of int): One of the four cardinal DIRECTIONS.
+        goal (tuple of int): The goal of the search.
+        stats (SearchStats, optional): Adds the cells walked to stats.jump_steps.
+
+    Returns:
+        tuple of int or None: The jump point or goal reached, or None if the walk
+        ran into an obstacle or the edge of the grid.
+    """
+    x, y = node
+    dx, dy = direction
+    ahead, ((side_a, diagonal_a), (side_b, diagonal_b)) = _STRAIGHT_CHECKS[direction]
+    mask = masks[x, y]
+    while True:
+        if not mask & ahead:
+            result = None
+            break
+        x += dx
+        y += dy
+        if (x, y) == goal:
+            result = x, y
+            break
+        mask = masks[x, y]
+        if (not mask & side_a and mask & diagonal_a) or (
+            not mask & side_b and mask & diagonal_b
+        ):
+            result = x, y
+            break
+    if stats is not None:
+        stats.jump_steps += abs(x - node[0]) + abs(y - node[1])
+    return result
+
+
+def jump_diagonal(
+    masks, node, direction, goal, jump_straight=jump_straight, stats=None
+):
+    """
+    Walks from node in a diagonal direction until it reaches a jump point, the goal
+    or an obstacle. A cell on the diagonal is also a jump point if a straight jump
+    along either component of the direction finds something from it.
+
+    Args:
+        masks (numpy.ndarray): The neighbour masks of the grid from neighbor_masks.
+        node (tuple of int): The cell the jump starts from (x, y).
+        direction (tuple of int): One of the four diagonal DIRECTIONS.
+        goal (tuple of int): The goal of the search.
+        jump_straight (callable, optional): The function used for the straight
+            jumps. Defaults to jump_straight.
+        stats (SearchStats, optional): Adds the diagonal cells walked to
+            stats.jump_steps. The straight jumps count their own steps if
+            jump_straight is given the stats object.
+
+    Returns:
+        tuple of int or None: The jump point or goal reached, or None if the walk
+        ran into an obstacle or the edge of the grid.
+    """
+    x, y = node
+    dx, dy = direction
+    ahead = DIRECTION_BITS[direction]
+    # A blocked cell behind on one side with a free cell ahead of it forces a turn
+    side_a, diagonal_a = DIRECTION_BITS[-dx, 0], DIRECTION_BITS[-dx, dy]
+    side_b, diagonal_b = DIRECTION_BITS[0, -dy], DIRECTION_BITS[dx, -dy]
+    mask = masks[x, y]
+    while True:
+        if not mask & ahead:
+            result = None
+            break
+        x += dx
+        y += dy
+        if (x, y) == goal:
+            result = x, y
+            break
+        mask = masks[x, y]
+        if (not mask & side_a and mask & diagonal_a) or (
+            not mask & side_b and mask & diagonal_b
+        ):
+            result = x, y
+            break
+        if (
+            jump_straight(masks, (x, y), (dx, 0), goal) is not None
+            or jump_straight(masks, (x, y), (0, dy), goal) is not None
+        ):
+            result = x, y
+            break
+    if stats is not None:
+        stats.jump_steps += abs(x - node[0])
+    return result
+
+
+def pruned_directions(masks, node, parent):
+    """
+    Returns the directions JPS has to search from node when it was reached from
+    parent: the natural neighbours in the direction of travel and the forced
+    neighbours created by adjacent obstacles.
+
+    Args:
+        masks (numpy.ndarray): The neighbour masks of the grid from neighbor_masks.
+        node (tuple of int): The jump point being expanded (x, y).
+        parent (tuple of int or None): The jump point node was reached from, or
+            None for the start node.
+
+    Returns:
+        list of tuple of int: The directions to jump in.
+    """
+    if parent is None:
+        return DIRECTIONS
+
+    x, y = node
+    dx = determine_direction(x - parent[0])
+    dy = determine_direction(y - parent[1])
+    mask = masks[x, y]
+    directions = []
+
+    if dx != 0 and dy != 0:
+        directions += [(dx, 0), (0, dy), (dx, dy)]
+        if not mask & DIRECTION_BITS[-dx, 0]:
+            directions.append((-dx, dy))
+        if not mask & DIRECTION_BITS[0, -dy]:
+            directions.append((dx, -dy))
+    elif dx == 0:
+        directions.append((0, dy))
+        if not mask & DIRECTION_BITS[1, 0]:
+            directions.append((1, dy))
+        if not mask & DIRECTION_BITS[-1, 0]:
+            directions.append((-1, dy))
+    else:
+        directions.append((dx, 0))
+        if not mask & DIRECTION_BITS[0, 1]:
+            directions.append((dx, 1))
+        if not mask & DIRECTION_BITS[0, -1]:
+            directions.append((dx, -1))
+    return directions
+
+
+def jps(
+    grid,
+    start,
+    goal,
+    state=None,
+    observer=None,
+    components=None,
+    stats=None,
+    masks=None,
+):
+    """
+    Perform the Jump Point Search algorithm to find the shortest path from start to
+    goal in a grid. JPS runs A* over jump points only: from each expanded node it
+    jumps in straight lines along the pruned directions and adds the jump points it
+    finds to the open list, skipping the cells in between.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        state (optional): The search state backend, e.g. an ArraySearchState that is
+            reused between queries on the same grid. Defaults to a new DictSearchState.
+        observer (callable, optional): Called as observer("expand", node) for every
+            expanded jump point and observer("jump", node) for every jump point found.
+        components (ComponentIndex, optional): Connected components of the grid.
+            Queries between different components are rejected without searching.
+        stats (SearchStats, optional): Counters of the search's work, filled in if
+            given, including the cells walked by the jumps.
+        masks (numpy.ndarray, optional): The neighbour masks of the grid from
+            neighbor_masks. Computing them takes a pass over the whole grid, so
+            compute them once and pass them to every query on the same grid.
+            Computed for this query only if not given.
+    Returns:
+        tuple: A tuple containing:
+            - list of tuple of int: The full path from start to goal as a list of positions (x, y).
+            - int: The length of the path.
+    Notes:
+        - The function returns an empty list and a path length of 0 if no path is found.
+    """
+    if masks is None:
+        masks = neighbor_masks(grid)
+
+    if stats is None:
 
-    unexplored_nodes = PriorityQueue()
-    unexplored_nodes.put((octile_heuristic(start, goal), start))
-    came_from = {}
-    g_score = {start: 0}  # Cost from start along best path
+        def jump(node, direction):
+            if direction[0] == 0 or direction[1] == 0:
+                return jump_straight(masks, node, direction, goal)
+            return jump_diagonal(masks, node, direction, goal)
 
-    jump(start)
+    else:
+
+        def counted_jump_straight(masks, node, direction, goal):
+            return jump_straight(masks, node, direction, goal, stats)
+
+        def jump(node, direction):
+            if direction[0] == 0 or direction[1] == 0:
+                return jump_straight(masks, node, direction, goal, stats)
+            return jump_diagonal(
+                masks, node, direction, goal, counted_jump_straight, stats
+            )
+
+    return search_jump_points(
+        grid, start, goal, jump, state, observer, components, stats, masks
+    )
+
+
+def search_jump_points(
+    grid,
+    start,
+    goal,
+    jump,
+    state=None,
+    observer=None,
+    components=None,
+    stats=None,
+    masks=None,
+):
+    """
+    Runs A* over jump points: every expanded node is connected only to the jump
+    points found by jumping from it along its pruned directions. This is the search
+    loop shared by jps and its variants, which differ only in how they jump.
+    Args:
+        grid (np.array): The grid representing the map where the pathfinding is performed.
+        start (tuple of int): The starting position in the grid (x, y).
+        goal (tuple of int): The goal position in the grid (x, y).
+        jump (callable): jump(node, direction) returns the jump point (or goal)
+            reached from node in direction, or None.
+        state (optional): The search state backend. Defaults to a new DictSearchState.
+        observer (callable, optional): Called as observer("expand", node) for every
+            expanded jump point and observer("jump", node) for every jump point found.
+        components (ComponentIndex, optional): See jps.
+        stats (SearchStats, optional): See astar. jump_steps is left to jump.
+        masks (numpy.ndarray, optional): See jps.
+    Returns:
+        tuple: The full path from start to goal and its length, as returned by jps.
+    """
+    if start == goal:
+        return [start], 0
+    if not is_valid(start[0], start[1], grid) or not is_valid(goal[0], goal[1], grid):
+        return [], 0  # No path found
+    if components is not None and not components.connected(start, goal):
+        return [], 0  # No path found
+
+    if state is None:
+        state = DictSearchState()
+    else:
+        state.reset()
+    if masks is None:
+        masks = neighbor_masks(grid)
+
+    unexplored_nodes = IndexedHeap()  # Jump points to be evaluated
+    state.set(start, 0, None)
+    unexplored_nodes.push(start, (octile_heuristic(start, goal), 0))
+    if stats is not None:
+        stats.pushed(1)
 
     while unexplored_nodes:
-        cost, current = unexplored_nodes.get()
-        if DRAW_IN_PROGRESS:
-            draw_grid(
-                grid,
-                path=came_from,
-                path_color=(66, 66, 66),
-                start=start,
-                goal=goal,
+        current, _ = unexplored_nodes.pop()
+        if stats is not None:
+            stats.pops += 1
+
+        if current == goal:
+            path = reconstruct_full_jps_path(state.path_to(goal))
+            return path, len(path)
+
+        if observer is not None:
+            observer("expand", current)
+        if stats is not None:
+            stats.expanded += 1
+
+        state.close(current)
+        current_g = state.get_g(current)
+
+        for direction in pruned_directions(masks, current, state.parent_of(current)):
+            jump_point = jump(current, direction)
+            if jump_point is None or state.is_closed(jump_point):
+                continue
+            if observer is not None:
+                observer("jump", jump_point)
+            if stats is not None:
+                stats.generated += 1
+
+            # Jumps are straight lines, so their cost is the octile distance
+            new_g_score = current_g + octile_heuristic(current, jump_point)
+            if new_g_score >= state.get_g(jump_point):
+                continue
+
+            state.set(jump_point, new_g_score, current)
+            unexplored_nodes.push(
+                jump_point,
+                (new_g_score + octile_heuristic(jump_point, goal), -new_g_score),
             )
-        for direction in range(8):
-            try:
-                if direction < 4:
-                    jump(step_cardinal(current, DIRECTIONS[direction], cost))
-                else:
-                    jump(step_diagonal(current, DIRECTIONS[direction], cost))
-            except PathFound:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                return reconstruct_full_jps_path(list(reversed(path))), len(
-                    reconstruct_full_jps_path(list(reversed(path)))
-                )
-        if unexplored_nodes.empty():
-            break
+            if stats is not None:
+                stats.pushed(len(unexplored_nodes))
+
     return [], 0  # No path found
 
 
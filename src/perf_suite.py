@@ -0,0 +1,202 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from helpers import convert_map_to_grid
+from pathfinding import astar, jps, neighbor_masks
+from search_stats import run_search
+
+MAPS = ("src/tests/maps/test.map", "src/tests/maps/ca_caverns1.map")
+ALGORITHMS = {"astar": astar, "jps": jps}
+BASELINE_PATH = "src/tests/perf_baseline.json"
+
+# Timings this close to the baseline are never reported, whatever the ratio,
+# because the timer noise of sub-millisecond measurements is larger than that
+MIN_REGRESSION_MS = 0.25
+
+
+def sample_queries(grid, count, seed=0):
+    """
+    Draws start and goal pairs from the free cells of a grid.
+    The free cells are listed once with np.argwhere and all the pairs are drawn in
+    one call, so the same seed always gives the same queries.
+    Args:
+        grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+        count (int): The number of queries.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+    Returns:
+        list of tuple: (start, goal) pairs of (x, y) positions, start != goal.
+    """
+    free = np.argwhere(np.asarray(grid) == 0)
+    rng = np.random.default_rng(seed)
+    queries = []
+    while len(queries) < count:
+        pairs = rng.integers(len(free), size=(count - len(queries), 2))
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        queries.extend(
+            (tuple(map(int, free[start])), tuple(map(int, free[goal])))
+            for start, goal in pairs
+        )
+    return queries
+
+
+def _timings(times_ms):
+    return {
+        "median_ms": float(np.median(times_ms)),
+        "p95_ms": float(np.percentile(times_ms, 95)),
+    }
+
+
+def measure_search(grid, queries, algorithm, repeats=3):
+    """
+    Runs a search on every query. Each query is repeated and its fastest run kept,
+    which filters out most of the noise from the rest of the system. The neighbour
+    masks are computed once, like in an application running many queries.
+    Returns:
+        dict: The median and 95th percentile time per query in milliseconds and
+        the total number of expanded nodes.
+    """
+    masks = neighbor_masks(grid)
+    times = []
+    expanded = 0
+    for start, goal in queries:
+        results = [
+            run_search(algorithm, grid, start, goal, masks=masks)
+            for _ in range(repeats)
+        ]
+        times.append(min(result.stats.wall_time for result in results) * 1000)
+        expanded += results[0].stats.expanded
+    return _timings(times) | {"expansions": expanded}
+
+
+def measure_loader(map_path, samples=20, loads=10):
+    """
+    Times convert_map_to_grid without and with the binary grid cache. Each sample
+    is the mean of several loads, since a single load takes about a millisecond.
+    Returns:
+        dict: {"convert_map_to_grid": timings, "convert_map_to_grid_cached": timings}
+    """
+    results = {}
+    for name, use_cache in (
+        ("convert_map_to_grid", False),
+        ("convert_map_to_grid_cached", True),
+    ):
+        convert_map_to_grid(map_path, use_cache=use_cache)  # Build the cache
+        times = []
+        for _ in range(samples):
+            begin = time.perf_counter()
+            for _ in range(loads):
+                convert_map_to_grid(map_path, use_cache=use_cache)
+            times.append((time.perf_counter() - begin) * 1000 / loads)
+        results[name] = _timings(times)
+    return results
+
+
+def run_suite(maps=MAPS, queries=200, seed=0, algorithms=ALGORITHMS):
+    """
+    Measures the loader and every algorithm on every map.
+    Args:
+        maps (iterable of str, optional): The map files. Defaults to both test maps.
+        queries (int, optional): The number of random queries per map. Defaults to 200.
+        seed (int, optional): The seed of the queries. Defaults to 0.
+        algorithms (dict, optional): Algorithm names mapped to search functions.
+    Returns:
+        dict: The configuration and {map: {benchmark: measurements}} results, in
+        the format of the baseline file.
+    """
+    results = {}
+    for map_path in maps:
+        grid, _, _ = convert_map_to_grid(map_path)
+        map_queries = sample_queries(grid, queries, seed)
+        results[map_path] = measure_loader(map_path)
+        for name, algorithm in algorithms.items():
+            results[map_path][name] = measure_search(grid, map_queries, algorithm)
+    return {"queries": queries, "seed": seed, "results": results}
+
+
+def compare(current, baseline, threshold=0.5):
+    """
+    Compares suite results with a baseline.
+    A timing regresses when it is more than threshold slower than the baseline (and
+    by more than MIN_REGRESSION_MS). The expansion counts are deterministic for a
+    seed, so any increase of them is a regression.
+    Args:
+        current (dict): The results from run_suite.
+        baseline (dict): The results stored earlier.
+        threshold (float, optional): The allowed relative slowdown. Defaults to 0.5.
+    Returns:
+        list of str: A description of every regression, empty if there are none.
+    Raises:
+        ValueError: If the results were measured with different queries.
+    """
+    if (current["queries"], current["seed"]) != (baseline["queries"], baseline["seed"]):
+        raise ValueError(
+            "The baseline was measured with different queries; update it first"
+        )
+
+    regressions = []
+    for map_path, benchmarks in current["results"].items():
+        for name, measured in benchmarks.items():
+            expected = baseline["results"].get(map_path, {}).get(name)
+            if expected is None:
+                continue
+            for key in ("median_ms", "p95_ms"):
+                limit = max(
+                    expected[key] * (1 + threshold), expected[key] + MIN_REGRESSION_MS
+                )
+                if measured[key] > limit:
+                    regressions.append(
+                        f"{map_path} {name} {key}: {measured[key]:.3f} "
+                        f"> {expected[key]:.3f} + {threshold:.0%}"
+                    )
+            if measured.get("expansions", 0) > expected.get("expansions", np.inf):
+                regressions.append(
+                    f"{map_path} {name} expansions: {measured['expansions']} "
+                    f"> {expected['expansions']}"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the performance regression suite against a stored baseline"
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="the baseline JSON")
+    parser.add_argument(
+        "--update", action="store_true", help="store the results as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.5, help="allowed relative slowdown"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="queries per map")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the queries")
+    args = parser.parse_args(argv)
+
+    current = run_suite(queries=args.queries, seed=args.seed)
+    for map_path, benchmarks in current["results"].items():
+        for name, measured in benchmarks.items():
+            expansions = measured.get("expansions")
+            print(
+                f"{map_path} {name}: median {measured['median_ms']:.3f} ms, "
+                f"p95 {measured['p95_ms']:.3f} ms"
+                + ("" if expansions is None else f", {expansions} expansions")
+            )
+
+    if args.update:
+        with open(args.baseline, "w") as file:
+            json.dump(current, file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(current, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
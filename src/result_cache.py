@@ -0,0 +1,170 @@
+import functools
+import hashlib
+import inspect
+from collections import OrderedDict
+
+import numpy as np
+
+from pathfinding import neighbor_masks
+
+# Rough memory use of a cache entry: the key and entry objects plus one
+# (x, y) tuple of two small ints per path node
+ENTRY_OVERHEAD_BYTES = 200
+NODE_BYTES = 64
+
+
+def grid_key(grid):
+    """
+    Returns a hash of the contents and shape of a grid. Any change to the grid
+    changes the key, so results cached for the old grid are no longer found.
+    Hashing reads the whole grid, about a millisecond per million cells.
+    """
+    grid = np.ascontiguousarray(grid)
+    digest = hashlib.blake2b(grid.tobytes(), digest_size=16)
+    digest.update(repr((grid.shape, grid.dtype.str)).encode())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts_masks(algorithm):
+    try:
+        return "masks" in inspect.signature(algorithm).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class ResultCache:
+    """
+    An LRU cache of search results keyed by grid, algorithm, start and goal.
+
+    Movement costs are symmetric, so a query for (goal, start) is answered from a
+    cached (start, goal) result by reversing the path.
+
+    By default the grid is identified by the cache's version counter, so a lookup
+    costs no more than a dictionary access. The cache cannot see changes made to
+    the grid in place (by ComponentIndex.set_cell, DStarLite.update_cells or any
+    other writer): grid_changed() must be called after every such change, or
+    the paths cached for the old contents keep being returned. Solving on a
+    different grid object bumps the version by itself. A caller can pass its own
+    version instead, e.g. version=grid_key(grid), which is always correct but
+    hashes the whole grid on every lookup, hits included. invalidate() drops
+    everything at once.
+
+    Results are cached per algorithm object, so two lambdas or two closures of
+    the same function never share entries.
+
+    The neighbour masks of the grid are computed on the first miss and passed to
+    every algorithm that takes a masks argument, until the grid's version changes.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int, optional): The estimated memory the cached paths may
+                use before the least recently used entries are evicted.
+                Defaults to 64 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.grid_version = 0
+        self._grid = None  # The grid the version counter refers to
+        self._entries = OrderedDict()
+        self._masks = (None, None)  # (grid version, neighbour masks)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def entry_size(path):
+        return ENTRY_OVERHEAD_BYTES + NODE_BYTES * len(path)
+
+    def solve(self, algorithm, grid, start, goal, version=None, **kwargs):
+        """
+        Returns the result of algorithm(grid, start, goal, **kwargs), from the
+        cache if the same or the reversed query was solved before.
+        Args:
+            algorithm (callable): The search function, e.g. astar or jps.
+            grid (numpy.ndarray): The grid to search.
+            start (tuple of int): The start position (x, y).
+            goal (tuple of int): The goal position (x, y).
+            version (hashable, optional): Identifies the grid contents. Defaults
+                to the cache's grid_version.
+            **kwargs: Passed on to algorithm on a miss. They are not part of the
+                key, so they must not change the result (e.g. state, components).
+        Returns:
+            tuple: (path, length) as returned by algorithm.
+        """
+        if version is None:
+            if grid is not self._grid:
+                self.grid_changed()
+                self._grid = grid
+            version = self.grid_version
+        key = (version, algorithm, tuple(start), tuple(goal))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0]), entry[1]
+
+        reversed_key = (version, algorithm, tuple(goal), tuple(start))
+        entry = self._entries.get(reversed_key)
+        if entry is not None:
+            self._entries.move_to_end(reversed_key)
+            self.hits += 1
+            return list(reversed(entry[0])), entry[1]
+
+        self.misses += 1
+        if "masks" not in kwargs and _accepts_masks(algorithm):
+            if self._masks[0] != version:
+                self._masks = (version, neighbor_masks(grid))
+            kwargs["masks"] = self._masks[1]
+        path, length = algorithm(grid, start, goal, **kwargs)
+        self._store(key, (tuple(path), length))
+        return path, length
+
+    def _store(self, key, entry):
+        size = self.entry_size(entry[0])
+        if size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= self.entry_size(evicted[0])
+            self.evictions += 1
+
+    def grid_changed(self):
+        """
+        Bumps grid_version after the grid has been mutated in place, so the
+        results cached for the old contents are no longer found. They are evicted
+        as the cache fills up.
+        """
+        self.grid_version += 1
+        self._masks = (None, None)
+
+    def invalidate(self):
+        """
+        Drops every cached result, e.g. after the grid has been mutated in place
+        when the results were cached with an explicit version.
+        """
+        self._entries.clear()
+        self.size_bytes = 0
+        self._masks = (None, None)
+
+    def stats(self):
+        """
+        Returns the hit and miss counters and the current size of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+        }
@@ -0,0 +1,143 @@
+import numpy as np
+
+
+class DictSearchState:
+    """
+    Search state (g-scores, parents and the closed set) stored in dicts and sets
+    keyed by (x, y) tuples. Only the cells touched by the search use memory, which
+    makes this the right choice for one-off queries. This is the default backend of
+    astar and jps.
+    """
+
+    def __init__(self):
+        self.g_score = {}
+        self.came_from = {}
+        self.closed = set()
+
+    def reset(self):
+        """
+        Forgets the state of the previous query.
+        """
+        self.g_score = {}
+        self.came_from = {}
+        self.closed = set()
+
+    def get_g(self, node):
+        """
+        Returns the best known cost from start to node, or infinity if the node has
+        not been reached.
+        """
+        return self.g_score.get(node, np.inf)
+
+    def set(self, node, g, parent):
+        """
+        Records a new best cost for node and the node it was reached from.
+        A parent of None marks the start node.
+        """
+        self.g_score[node] = g
+        if parent is not None:
+            self.came_from[node] = parent
+
+    def parent_of(self, node):
+        return self.came_from.get(node)
+
+    def close(self, node):
+        self.closed.add(node)
+
+    def is_closed(self, node):
+        return node in self.closed
+
+    def closed_nodes(self):
+        return list(self.closed)
+
+    def path_to(self, node):
+        """
+        Follows the parent links from node back to the start.
+
+        Returns:
+            list of tuple of int: The nodes from start to node.
+        """
+        path = [node]
+        while node in self.came_from:
+            node = self.came_from[node]
+            path.append(node)
+        return path[::-1]
+
+
+class ArraySearchState:
+    """
+    Search state stored in preallocated NumPy arrays indexed by the flat cell id
+    x * width + y.
+
+    g-scores are kept in a float32 array and parents in an int32 array. Instead of
+    clearing the arrays between queries every entry is stamped with the generation
+    of the query that wrote it, so reset() only increments a counter. One instance
+    can be reused for any number of queries on grids of the same shape, which
+    avoids allocating per-node tuples and dict entries on large maps.
+    """
+
+    def __init__(self, shape):
+        """
+        Args:
+            shape (tuple of int): The shape (height, width) of the grids searched.
+        """
+        self.shape = tuple(shape)
+        self.width = self.shape[1]
+        size = self.shape[0] * self.shape[1]
+        self.g_score = np.empty(size, dtype=np.float32)
+        self.came_from = np.empty(size, dtype=np.int32)
+        self.seen = np.zeros(size, dtype=np.uint32)  # generation that wrote g/parent
+        self.closed = np.zeros(size, dtype=np.uint32)  # generation that closed cell
+        self.generation = 1
+
+    def reset(self):
+        """
+        Forgets the state of the previous query in O(1) by starting a new generation.
+        The stamp arrays are only cleared when the generation counter wraps around.
+        """
+        self.generation += 1
+        if self.generation == np.iinfo(np.uint32).max:
+            self.seen.fill(0)
+            self.closed.fill(0)
+            self.generation = 1
+
+    def index(self, node):
+        return node[0] * self.width + node[1]
+
+    def node(self, index):
+        return divmod(int(index), self.width)
+
+    def get_g(self, node):
+        index = node[0] * self.width + node[1]
+        if self.seen[index] != self.generation:
+            return np.inf
+        return float(self.g_score[index])
+
+    def set(self, node, g, parent):
+        index = node[0] * self.width + node[1]
+        self.seen[index] = self.generation
+        self.g_score[index] = g
+        self.came_from[index] = -1 if parent is None else self.index(parent)
+
+    def parent_of(self, node):
+        index = node[0] * self.width + node[1]
+        if self.seen[index] != self.generation or self.came_from[index] < 0:
+            return None
+        return self.node(self.came_from[index])
+
+    def close(self, node):
+        self.closed[node[0] * self.width + node[1]] = self.generation
+
+    def is_closed(self, node):
+        return self.closed[node[0] * self.width + node[1]] == self.generation
+
+    def closed_nodes(self):
+        return [self.node(i) for i in np.flatnonzero(self.closed == self.generation)]
+
+    def path_to(self, node):
+        index = self.index(node)
+        path = [index]
+        while self.came_from[index] >= 0:
+            index = self.came_from[index]
+            path.append(index)
+        return [self.node(i) for i in reversed(path)]
@@ -0,0 +1,88 @@
+import time
+from collections import namedtuple
+
+from pathfinding import path_cost
+
+# The outcome of run_search: the path, its node count (as returned by the search),
+# its octile cost (infinity if no path was found) and the SearchStats of the query
+SearchResult = namedtuple("SearchResult", ["path", "length", "cost", "stats"])
+
+
+class SearchStats:
+    """
+    Counters of the work done by one search, filled in by the search functions
+    when they are given a stats object. Without one they skip the counting
+    entirely, so the instrumentation costs nothing when it is not used.
+
+    Attributes:
+        expanded (int): Nodes taken from the open list and expanded.
+        generated (int): Successors produced by the expansions that were not
+            closed yet: free neighbours for astar and bidirectional_astar, jump
+            points for JPS. Closed successors are skipped before they are counted.
+        pushes (int): Open list insertions and decrease-key updates.
+        pops (int): Nodes removed from the open list.
+        peak_open (int): The largest size of the open list.
+        jump_steps (int): Cells walked by JPS jump scans, including the straight
+            scans started from every cell of a diagonal jump.
+        wall_time (float): Elapsed wall clock seconds, set by run_search.
+        cpu_time (float): Process CPU seconds, set by run_search.
+    """
+
+    FIELDS = (
+        "expanded",
+        "generated",
+        "pushes",
+        "pops",
+        "peak_open",
+        "jump_steps",
+        "wall_time",
+        "cpu_time",
+    )
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.pushes = 0
+        self.pops = 0
+        self.peak_open = 0
+        self.jump_steps = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)}" for name in self.FIELDS)
+        return f"SearchStats({fields})"
+
+    def pushed(self, open_size):
+        """
+        Records an open list push that left open_size nodes on the open list.
+        """
+        self.pushes += 1
+        if open_size > self.peak_open:
+            self.peak_open = open_size
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def run_search(algorithm, grid, start, goal, **kwargs):
+    """
+    Runs a search with instrumentation and timing.
+    Args:
+        algorithm (callable): The search function, e.g. astar or jps. It must accept
+            a stats keyword argument.
+        grid (numpy.ndarray): The grid to search.
+        start (tuple of int): The start position (x, y).
+        goal (tuple of int): The goal position (x, y).
+        **kwargs: Passed on to algorithm, e.g. observer or state.
+    Returns:
+        SearchResult: The path, its length and cost, and the counters and times.
+    """
+    stats = SearchStats()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    path, length = algorithm(grid, start, goal, stats=stats, **kwargs)
+    stats.cpu_time = time.process_time() - cpu_start
+    stats.wall_time = time.perf_counter() - wall_start
+    cost = path_cost(path) if path else float("inf")
+    return SearchResult(path, length, cost, stats)
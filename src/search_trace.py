@@ -0,0 +1,139 @@
+import numpy as np
+
+# The event kinds stored in the lowest bit of a trace entry
+EXPAND = 0
+JUMP = 1
+_EVENT_KINDS = {"expand": EXPAND, "jump": JUMP}
+
+
+def event_dtype(shape):
+    """
+    Returns the dtype of the events of a grid: int32 while every shifted cell id
+    fits in it, i.e. up to 2**30 cells, and int64 for larger grids.
+    """
+    cells = int(shape[0]) * int(shape[1])
+    return np.dtype(np.int32 if cells <= 1 << 30 else np.int64)
+
+
+class SearchTrace:
+    """
+    The expansions and jump points of one search in the order they happened.
+
+    Every event is a single int32: the flat cell id (x * width + y) shifted left by
+    one, with the kind (EXPAND or JUMP) in the lowest bit. A search of a million
+    expansions takes 4 MB. Grids of more than 2**30 cells use int64 events, see
+    event_dtype.
+    """
+
+    def __init__(self, shape, events, start=None, goal=None):
+        """
+        Args:
+            shape (tuple of int): The shape of the searched grid.
+            events (numpy.ndarray): The encoded events.
+            start (tuple of int, optional): The start of the search (x, y).
+            goal (tuple of int, optional): The goal of the search (x, y).
+        """
+        self.shape = tuple(int(size) for size in shape)
+        self.events = np.asarray(events, dtype=event_dtype(self.shape))
+        self.start = None if start is None else tuple(start)
+        self.goal = None if goal is None else tuple(goal)
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def kinds(self):
+        return self.events & 1
+
+    @property
+    def cells(self):
+        """
+        The cells of the events as an (n, 2) array of (x, y).
+        """
+        return np.column_stack(np.divmod(self.events >> 1, self.shape[1]))
+
+    def expanded(self, end=None):
+        """
+        Returns the cells expanded by the first end events, in order.
+        """
+        events = self.events[:end]
+        ids = events[(events & 1) == EXPAND] >> 1
+        return np.column_stack(np.divmod(ids, self.shape[1]))
+
+    def save(self, path):
+        """
+        Writes the trace to an .npz file.
+        """
+        np.savez(
+            path,
+            shape=np.array(self.shape),
+            events=self.events,
+            start=np.array(self.start if self.start is not None else (-1, -1)),
+            goal=np.array(self.goal if self.goal is not None else (-1, -1)),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a trace written by save().
+        """
+        with np.load(path) as data:
+            start, goal = tuple(data["start"]), tuple(data["goal"])
+            return cls(
+                data["shape"],
+                data["events"],
+                None if start == (-1, -1) else start,
+                None if goal == (-1, -1) else goal,
+            )
+
+
+class TraceRecorder:
+    """
+    An observer that records a search into a preallocated int32 array (int64 for
+    grids of more than 2**30 cells). Pass it as the observer argument of astar, jps
+    or any other search that takes one. Each event costs one array store, so a
+    search can be recorded at close to its full speed and replayed later with
+    ui.TraceReplay, instead of being drawn live.
+
+    The array doubles in size when it fills up.
+    """
+
+    def __init__(self, shape, capacity=1 << 16):
+        """
+        Args:
+            shape (tuple of int): The shape of the grid that will be searched.
+            capacity (int, optional): The number of events to allocate room for.
+                Defaults to 65536.
+        """
+        self.shape = tuple(shape)
+        self.width = self.shape[1]
+        self._events = np.empty(capacity, dtype=event_dtype(self.shape))
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __call__(self, event, node):
+        if self._size == len(self._events):
+            self._events = np.concatenate([self._events, np.empty_like(self._events)])
+        self._events[self._size] = (
+            (node[0] * self.width + node[1]) << 1
+        ) | _EVENT_KINDS[event]
+        self._size += 1
+
+    def clear(self):
+        """
+        Forgets the recorded events, keeping the array for the next search.
+        """
+        self._size = 0
+
+    def trace(self, start=None, goal=None):
+        """
+        Returns the events recorded so far.
+        Args:
+            start (tuple of int, optional): The start of the search, kept with the trace.
+            goal (tuple of int, optional): The goal of the search, kept with the trace.
+        Returns:
+            SearchTrace: A copy of the recorded events.
+        """
+        return SearchTrace(self.shape, self._events[: self._size].copy(), start, goal)
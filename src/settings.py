@@ -2,9 +2,13 @@ SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
 
 MAP_FILE_PATH = "src/tests/maps/test.map"
+# Keep parsed grids in a binary cache next to the map files
+MAP_CACHE = True
 
 DRAW_IN_PROGRESS = True
 DRAWING_FREQ = 1
+# Record the searches when they are not drawn live and replay them afterwards
+RECORD_TRACE = True
 
 GRID_COLOR = (200, 200, 200)
 OBSTACLE_COLOR = (0, 0, 0)
@@ -13,6 +17,7 @@ GOAL_COLOR = (255, 0, 255)
 
 A_STAR_COLOR = (255, 0, 0)
 JPS_COLOR = (0, 0, 255)
+JUMP_POINT_COLOR = (120, 120, 200)
 
 BUTTON_COLOR = (0, 150, 0)
 BUTTON_HOVER_COLOR = (0, 200, 0)
@@ -0,0 +1,260 @@
+import time
+from abc import ABC, abstractmethod
+
+from heap import IndexedHeap
+from pathfinding import (
+    MASK_STEPS,
+    is_valid,
+    jump_diagonal,
+    jump_straight,
+    neighbor_masks,
+    octile_heuristic,
+    pruned_directions,
+    reconstruct_full_jps_path,
+)
+from search_state import DictSearchState
+
+RUNNING = "running"
+FOUND = "found"
+NO_PATH = "no_path"
+CANCELLED = "cancelled"
+BUDGET_EXHAUSTED = "budget_exhausted"
+
+
+class SteppingSearch(ABC):
+    """
+    A search that runs in slices instead of to completion in one call. Each call of
+    step() expands nodes until its slice of expansions or time is used up and then
+    returns, keeping the open list and the search state for the next call. A game
+    loop can advance many searches a little every frame, and an asyncio task can
+    await between slices, without any single search stalling the others.
+
+    The search as a whole can be limited with a wall clock deadline and a cap on
+    the total expansions, and cancelled at any time. While it is unfinished, the
+    frontier and the path to the most promising node so far stay available, e.g. to
+    start moving a unit before the full path is known.
+
+    The subclasses AStarSearch and JPSSearch define how a node is expanded by
+    implementing _expand; the class itself cannot be instantiated.
+    """
+
+    def __init__(
+        self,
+        grid,
+        start,
+        goal,
+        deadline=None,
+        max_expansions=None,
+        observer=None,
+        masks=None,
+    ):
+        """
+        Args:
+            grid (numpy.ndarray): The grid, nonzero cells are obstacles.
+            start (tuple of int): The starting position in the grid (x, y).
+            goal (tuple of int): The goal position in the grid (x, y).
+            deadline (float, optional): A time.perf_counter() value after which the
+                search stops with the status BUDGET_EXHAUSTED. Defaults to none.
+            max_expansions (int, optional): The total number of expansions after
+                which the search stops with the status BUDGET_EXHAUSTED. Defaults
+                to no limit.
+            observer (callable, optional): Called as observer(event, node) like in
+                astar and jps.
+            masks (numpy.ndarray, optional): The neighbour masks of the grid from
+                neighbor_masks, reused between queries. Computed if not given.
+        """
+        self.grid = grid
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+        self.deadline = deadline
+        self.max_expansions = max_expansions
+        self.observer = observer
+        self.masks = neighbor_masks(grid) if masks is None else masks
+        self.state = DictSearchState()
+        self.open = IndexedHeap()  # Nodes to be evaluated, ordered by (f, -g)
+        self.expanded = 0
+        self.path = []
+        self.status = RUNNING
+        self._closest = self.start  # The reached node with the smallest heuristic
+
+        if not is_valid(*self.start, grid) or not is_valid(*self.goal, grid):
+            self.status = NO_PATH
+            return
+        self.state.set(self.start, 0, None)
+        self.open.push(self.start, (octile_heuristic(self.start, self.goal), 0))
+
+    @property
+    def done(self):
+        return self.status != RUNNING
+
+    def result(self):
+        """
+        Returns the path as (path, length) like the search function the subclass
+        steps through. The path is empty until the status is FOUND.
+        """
+        return self.path, len(self.path)
+
+    def cancel(self):
+        """
+        Stops the search. The frontier and the partial path stay available.
+        """
+        if self.status == RUNNING:
+            self.status = CANCELLED
+
+    def step(self, expansions=None, time_slice=None):
+        """
+        Advances the search by one slice.
+        Args:
+            expansions (int, optional): The most nodes to expand in this slice.
+                Defaults to no limit.
+            time_slice (float, optional): The most seconds to spend in this slice.
+                Defaults to no limit.
+        Returns:
+            bool: True if the search has finished, see status.
+        """
+        if self.status != RUNNING:
+            return True
+        slice_end = None if time_slice is None else time.perf_counter() + time_slice
+        if self.deadline is not None and (
+            slice_end is None or self.deadline < slice_end
+        ):
+            slice_end = self.deadline
+        limit = expansions
+        if self.max_expansions is not None:
+            remaining = self.max_expansions - self.expanded
+            limit = remaining if limit is None else min(limit, remaining)
+
+        count = 0
+        while self.open:
+            if limit is not None and count >= limit:
+                break
+            if slice_end is not None and time.perf_counter() >= slice_end:
+                break
+            current, _ = self.open.pop()
+            if current == self.goal:
+                self.expanded += count
+                self.path = self._full_path(self.state.path_to(current))
+                self.status = FOUND
+                return True
+            if self.observer is not None:
+                self.observer("expand", current)
+            self.state.close(current)
+            self._expand(current)
+            count += 1
+        self.expanded += count
+
+        if not self.open:
+            self.status = NO_PATH
+        elif (
+            self.max_expansions is not None and self.expanded >= self.max_expansions
+        ) or (self.deadline is not None and time.perf_counter() >= self.deadline):
+            self.status = BUDGET_EXHAUSTED
+        return self.status != RUNNING
+
+    def slices(self, expansions=None, time_slice=None):
+        """
+        Steps the search until it finishes, yielding after every slice. Stop
+        iterating or call cancel() to abandon the search.
+        Args:
+            expansions (int, optional): See step.
+            time_slice (float, optional): See step.
+        Yields:
+            SteppingSearch: This search, after each unfinished slice.
+        """
+        while not self.step(expansions, time_slice):
+            yield self
+
+    def run(self):
+        """
+        Runs the search to completion within its budget and returns the result.
+        """
+        self.step()
+        return self.result()
+
+    def frontier(self):
+        """
+        Returns the open list ordered by priority.
+        Returns:
+            list of tuple: (node, f, g) for every node waiting to be expanded.
+        """
+        entries = sorted((self.open.priority(node), node) for node in self.open)
+        return [(node, f, -negative_g) for (f, negative_g), node in entries]
+
+    def partial_path(self):
+        """
+        Returns the path to the reached node closest to the goal by the heuristic,
+        the full path if the goal has been found.
+        """
+        if self.status == FOUND:
+            return self.path
+        if self.state.get_g(self.start) != 0:
+            return []  # The start or goal is not valid
+        return self._full_path(self.state.path_to(self._closest))
+
+    def _reached(self, node):
+        if octile_heuristic(node, self.goal) < octile_heuristic(
+            self._closest, self.goal
+        ):
+            self._closest = node
+
+    def _relax(self, node, parent, g):
+        if g >= self.state.get_g(node):
+            return
+        self.state.set(node, g, parent)
+        self.open.push(node, (g + octile_heuristic(node, self.goal), -g))
+        self._reached(node)
+
+    @abstractmethod
+    def _expand(self, node):
+        """
+        Relaxes the successors of node, which has just been closed.
+        """
+
+    def _full_path(self, path):
+        return path
+
+
+class AStarSearch(SteppingSearch):
+    """
+    A stepping version of astar with the octile heuristic.
+    """
+
+    def _expand(self, node):
+        current_g = self.state.get_g(node)
+        x, y = node
+        for dx, dy, cost in MASK_STEPS[self.masks[x, y]]:
+            neighbor = (x + dx, y + dy)
+            if not self.state.is_closed(neighbor):
+                self._relax(neighbor, node, current_g + cost)
+
+
+class JPSSearch(SteppingSearch):
+    """
+    A stepping version of jps. The frontier holds jump points and the paths are
+    expanded to every cell like the paths of jps.
+    """
+
+    def _expand(self, node):
+        current_g = self.state.get_g(node)
+        parent = self.state.parent_of(node)
+        for direction in pruned_directions(self.masks, node, parent):
+            if direction[0] == 0 or direction[1] == 0:
+                jump_point = jump_straight(self.masks, node, direction, self.goal)
+            else:
+                jump_point = jump_diagonal(self.masks, node, direction, self.goal)
+            if jump_point is None or self.state.is_closed(jump_point):
+                continue
+            if self.observer is not None:
+                self.observer("jump", jump_point)
+            self._relax(
+                jump_point, node, current_g + octile_heuristic(node, jump_point)
+            )
+
+    def _full_path(self, path):
+        return reconstruct_full_jps_path(path)
+
+    def result(self):
+        # jps counts a path with the start as the goal as length 0
+        if self.path == [self.start] and self.start == self.goal:
+            return self.path, 0
+        return super().result()
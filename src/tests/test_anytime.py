@@ -0,0 +1,64 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from anytime import anytime_astar, ara_star
+from helpers import load_map
+from pathfinding import astar, path_cost
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+START, GOAL = (524, 203), (187, 143)
+
+
+def test_solutions_improve_until_optimal(grid):
+    optimal = path_cost(astar(grid, START, GOAL)[0])
+    solutions = list(ara_star(grid, START, GOAL, epsilon=3))
+    assert solutions
+    assert solutions[0].cost <= 3 * optimal + 1e-9
+    for previous, current in zip(solutions, solutions[1:]):
+        assert current.cost <= previous.cost + 1e-9
+        assert current.bound <= previous.bound
+        assert current.expanded >= previous.expanded
+    for solution in solutions:
+        assert solution.path[0] == START and solution.path[-1] == GOAL
+        assert solution.cost <= solution.bound * optimal + 1e-9
+    assert solutions[-1].bound == 1
+    assert solutions[-1].cost == pytest.approx(optimal)
+
+
+def test_first_solution_is_cheaper_to_find(grid):
+    expanded = []
+    astar(grid, START, GOAL, observer=lambda event, node: expanded.append(node))
+    first = next(ara_star(grid, START, GOAL, epsilon=3))
+    assert first.expanded < len(expanded)
+
+
+def test_start_is_goal(grid):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        solutions = list(ara_star(grid, START, START, epsilon=3))
+    assert len(solutions) == 1
+    assert solutions[0].path == [START]
+    assert solutions[0].cost == 0
+    assert solutions[0].bound == 1
+
+
+def test_node_budget_stops_the_search(grid):
+    first = next(ara_star(grid, START, GOAL, epsilon=3))
+    solution = anytime_astar(grid, START, GOAL, node_budget=first.expanded + 1)
+    assert solution is not None
+    assert solution.expanded <= first.expanded + 1
+    assert anytime_astar(grid, START, GOAL, node_budget=1) is None
+
+
+def test_no_path():
+    grid = np.zeros((5, 5), dtype=np.uint8)
+    grid[:, 2] = 1
+    assert list(ara_star(grid, (0, 0), (4, 4))) == []
+    assert anytime_astar(grid, (0, 0), (0, 0)).path == [(0, 0)]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import batch
+from batch import _attach_grid, _share_grid, _solve_chunk, solve_many
+from helpers import convert_map_to_grid
+from pathfinding import astar, jps, neighbor_masks
+
+
+@pytest.fixture
+def grid():
+    grid, _, _ = convert_map_to_grid()
+    yield grid
+
+
+QUERIES = [((1, 1), (13, 13)), ((9, 1), (1, 13)), ((13, 8), (1, 1)), ((5, 5), (5, 5))]
+
+
+@pytest.mark.parametrize("algorithm", [astar, jps])
+def test_solve_many_matches_serial_results_in_order(grid, algorithm):
+    queries = QUERIES * 5
+    results = list(solve_many(grid, queries, algorithm, workers=2, chunksize=3))
+    assert results == [algorithm(grid, start, goal) for start, goal in queries]
+
+
+def test_solve_many_accepts_lazy_queries(grid):
+    queries = (query for query in QUERIES)
+    assert len(list(solve_many(grid, queries, workers=1))) == len(QUERIES)
+
+
+def test_solve_many_without_queries(grid):
+    assert list(solve_many(grid, [], workers=1)) == []
+
+
+def test_workers_map_the_masks_from_shared_memory(grid):
+    grid = np.ascontiguousarray(grid)
+    memory = _share_grid(grid)
+    try:
+        _attach_grid(memory.name, grid.shape, grid.dtype, astar)
+        assert np.array_equal(batch._worker_grid, grid)
+        assert np.array_equal(batch._worker_masks, neighbor_masks(grid))
+        assert _solve_chunk(QUERIES) == [astar(grid, *query) for query in QUERIES]
+    finally:
+        batch._worker_grid = batch._worker_masks = None
+        batch._worker_memory.close()
+        memory.close()
+        memory.unlink()
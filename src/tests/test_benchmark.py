@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+
+import pytest
+
+from benchmark import ALGORITHMS, read_scenarios, run_benchmark, summarize
+
+SCEN = (
+    "version 1\n"
+    "0\ttest.map\t15\t15\t10\t13\t11\t10\t3.41421356\n"
+    "1\ttest.map\t15\t15\t13\t9\t10\t13\t5.82842712\n"
+)
+
+
+def test_read_scenarios_converts_to_row_column():
+    scenarios = list(read_scenarios(io.StringIO(SCEN)))
+    assert len(scenarios) == 2
+    assert scenarios[0].bucket == 0
+    assert scenarios[0].start == (13, 10)
+    assert scenarios[0].goal == (10, 11)
+    assert scenarios[0].optimal == pytest.approx(3.41421356)
+
+
+def test_summarize_percentiles_per_bucket():
+    rows = [
+        {"algorithm": "astar", "bucket": 0, "time_ms": t, "expansions": 10}
+        | {"cost": 2.0, "suboptimality": 1.0}
+        for t in range(1, 101)
+    ]
+    stats = summarize(rows)["astar"]["0"]
+    assert stats["queries"] == 100
+    assert stats["time_ms_p50"] == pytest.approx(50.5)
+    assert stats["mean_expansions"] == 10
+    assert stats["not_found"] == 0
+
+
+def test_run_benchmark_writes_csv_and_json(tmp_path):
+    prefix = str(tmp_path / "out")
+    summary = run_benchmark(
+        "src/tests/maps/test.map", "src/tests/maps/test.map.scen", prefix
+    )
+    with open(prefix + ".csv") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 20 * len(ALGORITHMS)
+    assert all(float(row["suboptimality"]) == pytest.approx(1.0) for row in rows)
+    with open(prefix + ".json") as file:
+        assert json.load(file)["results"] == summary
+    assert set(summary) == set(ALGORITHMS)
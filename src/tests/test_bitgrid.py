@@ -0,0 +1,98 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from bitgrid import BandedNeighborMasks, BitGrid, load_bit_grid
+from helpers import load_map
+from pathfinding import astar, is_valid, jps, neighbor_masks, row_neighbor_masks
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+@pytest.fixture(scope="module")
+def bit_grid(grid):
+    yield BitGrid.from_array(grid)
+
+
+def test_round_trip_and_size(grid, bit_grid):
+    assert bit_grid.shape == grid.shape
+    assert np.array_equal(np.asarray(bit_grid), grid)
+    assert bit_grid.nbytes == grid.shape[0] * ((grid.shape[1] + 7) // 8)
+    assert bit_grid == load_bit_grid("src/tests/maps/ca_caverns1.map")
+
+
+def test_cells_rows_columns_and_slices(grid, bit_grid):
+    rng = np.random.default_rng(0)
+    for x, y in zip(
+        rng.integers(grid.shape[0], size=100), rng.integers(grid.shape[1], size=100)
+    ):
+        assert bit_grid[x, y] == grid[x, y]
+        assert bit_grid.is_free(x, y) == is_valid(x, y, grid)
+    assert not bit_grid.is_free(-1, 0)
+    assert not bit_grid.is_free(0, grid.shape[1])
+    assert bit_grid[-1, -1] == grid[-1, -1]
+    assert np.array_equal(bit_grid.row(17), grid[17])
+    assert np.array_equal(bit_grid.column(13), grid[:, 13])
+    assert np.array_equal(bit_grid[10:20, 5:9], grid[10:20, 5:9])
+    assert np.array_equal(bit_grid[3, 100:200], grid[3, 100:200])
+    assert np.array_equal(bit_grid[:, 7], grid[:, 7])
+    with pytest.raises(IndexError):
+        bit_grid[grid.shape[0], 0]
+
+
+def test_set_cells():
+    bit_grid = BitGrid.from_array(np.zeros((3, 11), dtype=np.uint8))
+    bit_grid[1, 9] = 1
+    bit_grid[2, 0] = 1
+    assert np.asarray(bit_grid).sum() == 2
+    assert bit_grid[1, 9] == 1 and bit_grid[1, 8] == 0
+    bit_grid[1, 9] = 0
+    assert bit_grid[1, 9] == 0
+
+
+def test_neighbor_masks_in_bands(grid, bit_grid):
+    expected = neighbor_masks(grid)
+    assert np.array_equal(neighbor_masks(grid, band_rows=7), expected)
+    assert np.array_equal(row_neighbor_masks(bit_grid, 100, 130), expected[100:130])
+
+    masks = BandedNeighborMasks(bit_grid, band_rows=16, max_bytes=4 * 16 * 324)
+    rng = np.random.default_rng(0)
+    for x, y in zip(
+        rng.integers(grid.shape[0], size=2000), rng.integers(grid.shape[1], size=2000)
+    ):
+        assert masks[x, y] == expected[x, y]
+    assert masks.nbytes <= 4 * 16 * grid.shape[1]
+    assert isinstance(neighbor_masks(bit_grid), BandedNeighborMasks)
+
+
+def test_searches_do_not_unpack_a_large_grid():
+    # A walled room in the middle of an open map keeps the jumps of jps short
+    blocked = np.zeros((4000, 4000), dtype=np.uint8)
+    blocked[1980:2041, 1980:2041] = 1
+    blocked[1981:2040, 1981:2040] = 0
+    blocked[1995:2005, 2010] = 1
+    bit_grid = BitGrid.from_array(blocked)
+    del blocked
+    start, goal = (2000, 2000), (2000, 2020)
+
+    tracemalloc.start()
+    try:
+        for algorithm in (astar, jps):
+            path, _ = algorithm(bit_grid, start, goal)
+            assert path[0] == start and path[-1] == goal
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The unpacked grid or its full masks would take 16 MB
+    assert peak < 4 * 1024 * 1024
+
+
+def test_searches_accept_a_bit_grid(grid, bit_grid):
+    start, goal = (524, 203), (187, 143)
+    assert astar(bit_grid, start, goal) == astar(grid, start, goal)
+    assert jps(bit_grid, start, goal) == jps(grid, start, goal)
+    assert astar(bit_grid, (0, 0), goal) == ([], 0)
@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+import pytest
+
+from block_jps import BitRows, block_jps
+from helpers import convert_map_to_grid
+from pathfinding import DIRECTIONS, astar, jump_straight, neighbor_masks, path_cost
+
+
+@pytest.fixture
+def grid():
+    grid, _, _ = convert_map_to_grid()
+    yield grid
+
+
+def test_bit_rows_jumps_match_cell_by_cell_jumps():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        grid = (rng.random((12, 70)) < 0.25).astype(np.uint8)
+        bits = BitRows(grid)
+        masks = neighbor_masks(grid)
+        free = [tuple(cell) for cell in np.argwhere(grid == 0)]
+        for node in free[::3]:
+            goal = free[rng.integers(len(free))]
+            for direction in DIRECTIONS[:4]:
+                for target in (goal, None):
+                    assert bits.jump_straight(
+                        masks, node, direction, target
+                    ) == jump_straight(masks, node, direction, target)
+
+
+def test_bit_rows_jump_stops_at_goal():
+    grid = np.zeros((3, 10), dtype=np.uint8)
+    bits = BitRows(grid)
+    assert bits.jump_straight(grid, (1, 1), (0, 1), (1, 6)) == (1, 6)
+    assert bits.jump_straight(grid, (1, 8), (0, -1), (1, 6)) == (1, 6)
+    assert bits.jump_straight(grid, (1, 1), (0, 1), None) is None
+
+
+def test_block_jps_finds_optimal_paths(grid):
+    bits = BitRows(grid)
+    free = [tuple(cell) for cell in np.argwhere(grid == 0)]
+    for _ in range(30):
+        start, goal = random.sample(free, 2)
+        astar_path, astar_length = astar(grid, start, goal)
+        path, length = block_jps(grid, start, goal, bits)
+        assert length == astar_length
+        assert path_cost(path) == pytest.approx(path_cost(astar_path))
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from components import ComponentIndex, label_components, load_component_labels
+from helpers import convert_map_to_grid
+from pathfinding import DIRECTIONS, astar, jps
+
+
+@pytest.fixture
+def grid():
+    grid, _, _ = convert_map_to_grid()
+    yield np.array(grid)
+
+
+def flood_fill_partition(grid):
+    """The components as a set of frozensets of cells, found with a BFS."""
+    seen = set()
+    components = set()
+    for start in map(tuple, np.argwhere(grid == 0)):
+        if start in seen:
+            continue
+        component = {start}
+        queue = [start]
+        while queue:
+            x, y = queue.pop()
+            for dx, dy in DIRECTIONS:
+                cell = (x + dx, y + dy)
+                if (
+                    0 <= cell[0] < grid.shape[0]
+                    and 0 <= cell[1] < grid.shape[1]
+                    and grid[cell] == 0
+                    and cell not in component
+                ):
+                    component.add(cell)
+                    queue.append(cell)
+        seen |= component
+        components.add(frozenset(component))
+    return components
+
+
+def label_partition(labels):
+    cells = {}
+    for cell in map(tuple, np.argwhere(labels >= 0)):
+        cells.setdefault(labels[cell], set()).add(cell)
+    return {frozenset(component) for component in cells.values()}
+
+
+def test_label_components_matches_flood_fill():
+    rng = np.random.default_rng(11)
+    for _ in range(30):
+        grid = (rng.random((15, 17)) < 0.45).astype(np.uint8)
+        labels = label_components(grid)
+        assert labels.dtype == np.int32
+        assert np.all((labels == -1) == (grid != 0))
+        assert label_partition(labels) == flood_fill_partition(grid)
+
+
+def test_label_components_test_map(grid):
+    labels = label_components(grid)
+    assert labels[13, 8] != labels[1, 1]  # The dead end on test.map
+    assert labels[1, 1] == labels[13, 13]
+
+
+def test_component_index_follows_toggled_cells():
+    rng = np.random.default_rng(3)
+    grid = (rng.random((20, 20)) < 0.4).astype(np.uint8)
+    index = ComponentIndex(grid)
+    for _ in range(300):
+        cell = tuple(rng.integers(0, 20, size=2))
+        index.set_cell(cell, not grid[cell])
+        assert label_partition(index.labels) == flood_fill_partition(grid)
+
+
+def test_searches_reject_unreachable_goal_without_expanding(grid):
+    index = ComponentIndex(grid)
+    for algorithm in (astar, jps):
+        events = []
+        result = algorithm(
+            grid,
+            (1, 1),
+            (13, 8),
+            observer=lambda *event: events.append(event),
+            components=index,
+        )
+        assert result == ([], 0)
+        assert events == []
+        assert algorithm(grid, (1, 1), (13, 13), components=index)[0] != []
+
+
+def test_opening_a_wall_connects_components(grid):
+    index = ComponentIndex(grid)
+    assert not index.connected((1, 1), (13, 8))
+    index.set_cell((12, 8), False)
+    assert index.connected((1, 1), (13, 8))
+    assert astar(grid, (1, 1), (13, 8), components=index)[0] != []
+
+
+def test_load_component_labels_is_cached(tmp_path):
+    map_path = tmp_path / "test.map"
+    with open("src/tests/maps/test.map") as file:
+        map_path.write_text(file.read())
+    labels = load_component_labels(map_path)
+    assert (tmp_path / "test.map.components.npy").exists()
+    assert np.array_equal(labels, label_components(convert_map_to_grid(map_path)[0]))
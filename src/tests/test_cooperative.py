@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from cooperative import (
+    ReservationTable,
+    cooperative_paths,
+    find_conflicts,
+)
+from helpers import load_map
+from pathfinding import DIRECTIONS
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+def assert_valid_moves(grid, path):
+    for a, b in zip(path, path[1:]):
+        assert grid[b] == 0
+        assert a == b or (b[0] - a[0], b[1] - a[1]) in DIRECTIONS
+
+
+def test_reservation_table_blocks_cells_and_swaps():
+    table = ReservationTable()
+    table.reserve(0, [(0, 0), (0, 1), (0, 1)], start_time=5)
+    assert len(table) == 3
+    assert not table.is_free(1, (0, 1), 6)
+    assert table.is_free(0, (0, 1), 6)
+    assert table.is_free(1, (0, 1), 8)
+    assert not table.can_move(1, (0, 2), (0, 1), 5)
+    # Moving into (0, 0) as agent 0 leaves it would swap the two agents
+    assert not table.can_move(1, (0, 1), (0, 0), 5)
+    assert table.can_move(1, (1, 1), (0, 0), 5)
+    assert not table.path_is_free(1, [(0, 2), (0, 1)], 5)
+    table.release(0, [(0, 0), (0, 1), (0, 1)], start_time=5)
+    assert len(table) == 0
+    assert table.path_is_free(1, [(0, 2), (0, 1)], 5)
+
+
+def test_agents_pass_each_other_in_a_corridor():
+    grid = np.ones((3, 7), dtype=np.uint8)
+    grid[1, :] = 0
+    grid[0, 3] = 0  # A niche to step aside into
+    result = cooperative_paths(grid, [((1, 0), (1, 6)), ((1, 6), (1, 0))])
+    assert result.arrived == [True, True]
+    assert find_conflicts(result.paths) == []
+    for path in result.paths:
+        assert_valid_moves(grid, path)
+    assert result.makespan == max(len(path) - 1 for path in result.paths)
+
+
+def test_agents_never_collide_head_on():
+    grid = np.zeros((1, 6), dtype=np.uint8)
+    result = cooperative_paths(grid, [((0, 0), (0, 5)), ((0, 5), (0, 0))])
+    assert result.arrived == [False, False]
+    assert find_conflicts(result.paths) == []
+
+
+def test_small_batches_are_conflict_free():
+    rng = np.random.default_rng(1)
+    for _ in range(150):
+        grid = (rng.random((8, 8)) < 0.25).astype(np.uint8)
+        free = np.argwhere(grid == 0)
+        cells = [
+            tuple(map(int, cell)) for cell in free[rng.choice(len(free), 12, False)]
+        ]
+        agents = list(zip(cells[:6], cells[6:]))
+        result = cooperative_paths(grid, agents, window=6)
+        assert find_conflicts(result.paths) == []
+        for (start, goal), path, arrived in zip(agents, result.paths, result.arrived):
+            assert path[0] == start and arrived == (path[-1] == goal)
+            assert_valid_moves(grid, path)
+
+
+def test_batch_is_conflict_free(grid):
+    free = np.argwhere(grid == 0)
+    rng = np.random.default_rng(0)
+    cells = [
+        tuple(map(int, cell)) for cell in free[rng.choice(len(free), 40, replace=False)]
+    ]
+    agents = list(zip(cells[:20], cells[20:]))
+    result = cooperative_paths(grid, agents, window=8)
+    assert all(result.arrived)
+    assert find_conflicts(result.paths) == []
+    for (start, goal), path in zip(agents, result.paths):
+        assert path[0] == start and path[-1] == goal
+        assert_valid_moves(grid, path)
+    assert result.agents_per_second > 0
+
+
+def test_find_conflicts():
+    paths = [[(0, 0), (0, 1)], [(0, 1), (0, 0)], [(2, 2), (0, 1)]]
+    assert find_conflicts(paths) == [(0, 0, 1, "swap"), (1, 0, 2, "vertex")]
+
+
+def test_invalid_agents():
+    grid = np.zeros((3, 3), dtype=np.uint8)
+    grid[1, 1] = 1
+    with pytest.raises(ValueError):
+        cooperative_paths(grid, [((1, 1), (0, 0))])
+    with pytest.raises(ValueError):
+        cooperative_paths(grid, [((0, 0), (2, 2)), ((0, 1), (2, 2))])
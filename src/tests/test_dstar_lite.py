@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from dstar_lite import DStarLite
+from helpers import load_map
+from pathfinding import astar, path_cost
+
+
+@pytest.fixture
+def grid():
+    yield np.array(load_map("src/tests/maps/ca_caverns1.map"))
+
+
+class ExpansionCounter:
+    def __init__(self):
+        self.expansions = 0
+
+    def __call__(self, event, node):
+        self.expansions += 1
+
+
+def test_first_plan_is_optimal(grid):
+    start, goal = (524, 203), (187, 143)
+    path, length = DStarLite(grid, start, goal).replan()
+    assert length == len(path)
+    assert path[0] == start and path[-1] == goal
+    assert path_cost(path) == pytest.approx(path_cost(astar(grid, start, goal)[0]))
+
+
+def test_replan_after_changes_matches_astar(grid):
+    start, goal = (343, 140), (390, 91)
+    planner = DStarLite(grid, start, goal)
+    path, _ = planner.replan()
+    rng = np.random.default_rng(0)
+    for step in range(5):
+        start = path[3]
+        planner.move_start(start)
+        blocked = path[len(path) // 2]
+        freed = tuple(map(int, np.argwhere(grid != 0)[rng.integers(1000)]))
+        planner.update_cells([(blocked, True), (freed, False)])
+        assert grid[blocked] != 0 and grid[freed] == 0
+
+        path, _ = planner.replan()
+        expected, _ = astar(grid, start, goal)
+        assert path_cost(path) == pytest.approx(path_cost(expected))
+        assert all(grid[node] == 0 for node in path)
+
+
+def test_small_change_repairs_locally(grid):
+    start, goal = (524, 203), (187, 143)
+    counter = ExpansionCounter()
+    planner = DStarLite(grid, start, goal, observer=counter)
+    path, _ = planner.replan()
+    first_search = counter.expansions
+
+    counter.expansions = 0
+    far_away = tuple(map(int, np.argwhere(grid == 0)[0]))
+    planner.update_cells([(far_away, True)])
+    assert planner.replan()[0] == path
+    assert counter.expansions < first_search // 100
+
+
+def test_goal_cut_off_and_reopened():
+    grid = np.zeros((5, 5), dtype=np.uint8)
+    planner = DStarLite(grid, (0, 0), (4, 4))
+    assert planner.replan()[1] == 5
+
+    wall = [((2, y), True) for y in range(5)]
+    planner.update_cells(wall)
+    assert planner.replan() == ([], 0)
+
+    planner.update_cells([((2, 4), False)])
+    path, length = planner.replan()
+    assert path[0] == (0, 0) and path[-1] == (4, 4) and (2, 4) in path
+    assert length == len(path)
+
+
+def test_invalid_endpoints(grid):
+    blocked = tuple(map(int, np.argwhere(grid != 0)[0]))
+    free = tuple(map(int, np.argwhere(grid == 0)[0]))
+    assert DStarLite(grid, blocked, free).replan() == ([], 0)
+    assert DStarLite(grid, free, blocked).replan() == ([], 0)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from flowfield import FlowField, FlowFieldCache, compute_distances
+from helpers import load_map
+from pathfinding import astar, distance_field, path_cost
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+def test_distances_match_dijkstra(grid):
+    expected = distance_field(grid, (187, 143))
+    np.testing.assert_allclose(compute_distances(grid, (187, 143)), expected)
+
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        random_grid = (rng.random((30, 40)) < 0.35).astype(np.uint8)
+        goal = tuple(map(int, np.argwhere(random_grid == 0)[0]))
+        np.testing.assert_allclose(
+            compute_distances(random_grid, goal), distance_field(random_grid, goal)
+        )
+
+
+def test_invalid_goal(grid):
+    assert np.isinf(compute_distances(grid, (-1, 5))).all()
+    blocked = tuple(np.argwhere(grid != 0)[0])
+    assert np.isinf(compute_distances(grid, blocked)).all()
+
+
+def test_paths_follow_the_field(grid):
+    goal = (187, 143)
+    field = FlowField(grid, goal)
+    assert field.distances.dtype == np.float32
+    assert field.directions.dtype == np.int8
+    assert field.next_step(goal) is None
+    rng = np.random.default_rng(1)
+    for start in map(tuple, np.argwhere(grid == 0)[rng.integers(10000, size=10)]):
+        path, length = field.path_from(start)
+        expected, _ = astar(grid, start, goal)
+        assert length == len(path)
+        if not expected:
+            assert path == [] and field.cost(start) == np.inf
+            continue
+        assert path[0] == start and path[-1] == goal
+        assert all(grid[node] == 0 for node in path)
+        assert path_cost(path) == pytest.approx(path_cost(expected))
+        assert field.cost(start) == pytest.approx(path_cost(expected))
+
+
+def test_cache_evicts_least_recently_used(grid):
+    field_bytes = FlowField(grid, (187, 143)).nbytes
+    cache = FlowFieldCache(grid, max_bytes=2 * field_bytes)
+    goals = [(187, 143), (524, 203), (343, 140)]
+    cache.field(goals[0])
+    cache.field(goals[1])
+    assert cache.field(goals[0]) is cache.field(goals[0])
+    cache.field(goals[2])
+    assert goals[1] not in cache
+    assert goals[0] in cache and goals[2] in cache
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+    assert stats["size_bytes"] == 2 * field_bytes
+
+    assert cache.path((524, 203), goals[0])[0][-1] == goals[0]
+    cache.invalidate()
+    assert len(cache) == 0 and cache.size_bytes == 0
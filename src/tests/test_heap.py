@@ -0,0 +1,51 @@
+import pytest
+
+from heap import IndexedHeap
+
+
+def test_pop_returns_items_in_priority_order():
+    heap = IndexedHeap()
+    for item, priority in [("a", 3), ("b", 1), ("c", 2)]:
+        heap.push(item, priority)
+    assert [heap.pop() for _ in range(3)] == [("b", 1), ("c", 2), ("a", 3)]
+    assert not heap
+
+
+def test_push_existing_item_decreases_key():
+    heap = IndexedHeap()
+    heap.push("a", 5)
+    heap.push("b", 3)
+    heap.push("a", 1)
+    assert len(heap) == 2
+    assert heap.peek() == ("a", 1)
+
+
+def test_push_existing_item_increases_key():
+    heap = IndexedHeap()
+    heap.push("a", 1)
+    heap.push("b", 3)
+    heap.push("a", 5)
+    assert heap.pop() == ("b", 3)
+    assert heap.priority("a") == 5
+
+
+def test_remove():
+    heap = IndexedHeap()
+    for item, priority in [("a", 3), ("b", 1), ("c", 2), ("d", 4)]:
+        heap.push(item, priority)
+    heap.remove("b")
+    heap.remove("d")
+    assert "b" not in heap
+    assert [heap.pop() for _ in range(2)] == [("c", 2), ("a", 3)]
+
+
+def test_tuple_priorities_break_ties():
+    heap = IndexedHeap()
+    heap.push("shallow", (10.0, -2.0))
+    heap.push("deep", (10.0, -8.0))
+    assert heap.pop()[0] == "deep"
+
+
+def test_pop_empty_raises():
+    with pytest.raises(IndexError):
+        IndexedHeap().pop()
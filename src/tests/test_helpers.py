@@ -0,0 +1,103 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from components import ComponentIndex
+from dstar_lite import DStarLite
+from helpers import convert_map_to_grid, load_cached_array, load_grid_cached, load_map
+
+MAP = "type octile\nheight 2\nwidth 4\nmap\n.@T.\nOSW.\n"
+
+
+def test_load_map_from_file_object():
+    grid = load_map(io.StringIO(MAP))
+    assert grid.dtype == np.uint8
+    assert grid.tolist() == [[0, 1, 1, 0], [1, 1, 1, 0]]
+
+
+def test_load_map_from_binary_file_with_crlf():
+    grid = load_map(io.BytesIO(MAP.replace("\n", "\r\n").encode()))
+    assert grid.tolist() == [[0, 1, 1, 0], [1, 1, 1, 0]]
+
+
+def test_load_map_without_trailing_newline():
+    assert load_map(io.StringIO(MAP.rstrip("\n"))).shape == (2, 4)
+
+
+def test_load_map_matches_character_loop():
+    grid = load_map("src/tests/maps/ca_caverns1.map")
+    with open("src/tests/maps/ca_caverns1.map") as file:
+        rows = file.read().splitlines()[4:]
+    expected = [[1 if char in "@TOSW" else 0 for char in row] for row in rows]
+    assert grid.shape == (596, 324)
+    assert np.array_equal(grid, expected)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "type octile\nheight 3\nwidth 4\nmap\n.@T.\nOSW.\n",  # too few rows
+        "type octile\nheight 2\nwidth 4\nmap\n.@T..\nOSW\n",  # ragged rows
+        "type octile\nheight 2\nwidth 5\nmap\n.@T.\nOSW.\n",  # too narrow
+        "type octile\nheight x\nwidth 4\nmap\n.@T.\nOSW.\n",  # bad number
+        "type octile\nheight 2\nwidth 4\n.@T.\nOSW.\n",  # no map line
+    ],
+)
+def test_load_map_rejects_header_mismatch(text):
+    with pytest.raises(ValueError):
+        load_map(io.StringIO(text))
+
+
+def test_convert_map_to_grid_takes_path():
+    grid, width, height = convert_map_to_grid("src/tests/maps/test.map")
+    assert (height, width) == grid.shape == (15, 15)
+
+
+@pytest.fixture
+def map_copy(tmp_path):
+    path = tmp_path / "copy.map"
+    path.write_text(MAP)
+    yield path
+
+
+def test_load_grid_cached_writes_memory_mapped_cache(map_copy):
+    grid = load_grid_cached(map_copy)
+    assert isinstance(grid, np.memmap)
+    assert grid.tolist() == [[0, 1, 1, 0], [1, 1, 1, 0]]
+    assert (map_copy.parent / "copy.map.grid.npy").exists()
+
+
+def test_cached_grid_can_be_mutated(map_copy):
+    grid, _, _ = convert_map_to_grid(map_copy, use_cache=True)
+    index = ComponentIndex(grid)
+    index.set_cell((0, 1), False)
+    assert index.connected((0, 0), (0, 1))
+    planner = DStarLite(grid, (0, 0), (0, 3))
+    planner.update_cells([((0, 2), False)])
+    assert grid.tolist() == [[0, 0, 0, 0], [1, 1, 1, 0]]
+    # The changes stay in memory, the cache still holds the map
+    assert load_grid_cached(map_copy).tolist() == [[0, 1, 1, 0], [1, 1, 1, 0]]
+
+
+def test_load_grid_cached_reuses_cache(map_copy):
+    load_grid_cached(map_copy)
+    built = []
+    load_cached_array(map_copy, "grid", lambda: built.append(1))
+    assert built == []
+
+
+def test_load_grid_cached_rebuilds_stale_cache(map_copy):
+    load_grid_cached(map_copy)
+    map_copy.write_text(MAP.replace(".@T.", "...."))
+    assert load_grid_cached(map_copy).tolist() == [[0, 0, 0, 0], [1, 1, 1, 0]]
+
+
+def test_load_grid_cached_checks_hash_when_only_mtime_changes(map_copy):
+    load_grid_cached(map_copy)
+    os.utime(map_copy, ns=(0, 0))
+    built = []
+    grid = load_cached_array(map_copy, "grid", lambda: built.append(1))
+    assert built == []
+    assert grid.tolist() == [[0, 1, 1, 0], [1, 1, 1, 0]]
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from components import label_components
+from helpers import load_map
+from hpa import HPAGraph, hpa_star, load_hpa_graph
+from pathfinding import astar, path_cost
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+@pytest.fixture(scope="module")
+def graph(grid):
+    yield HPAGraph(grid, cluster_size=16)
+
+
+def random_queries(grid, count, seed=0):
+    free = np.argwhere(grid == 0)
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        start, goal = free[rng.integers(len(free), size=2)]
+        yield tuple(map(int, start)), tuple(map(int, goal))
+
+
+def assert_valid_path(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+        assert grid[b] == 0
+
+
+def test_hpa_paths_are_valid_and_near_optimal(grid, graph):
+    labels = label_components(grid)
+    for start, goal in random_queries(grid, 30):
+        path, length = graph.find_path(start, goal)
+        if labels[start] != labels[goal]:
+            assert (path, length) == ([], 0)
+            continue
+        assert length == len(path)
+        assert_valid_path(grid, path, start, goal)
+        optimal, _ = astar(grid, start, goal)
+        assert path_cost(optimal) - 1e-9 <= path_cost(path)
+        assert path_cost(path) <= 1.25 * path_cost(optimal) + 2
+
+
+def test_hpa_small_map():
+    grid = load_map("src/tests/maps/test.map")
+    graph = HPAGraph(grid, cluster_size=4)
+    for start, goal in random_queries(grid, 30):
+        path, _ = hpa_star(grid, start, goal, graph)
+        assert bool(path) == bool(astar(grid, start, goal)[0])
+        if path:
+            assert_valid_path(grid, path, start, goal)
+
+
+def test_hpa_start_equals_goal(grid, graph):
+    start, _ = next(random_queries(grid, 1))
+    assert graph.find_path(start, start) == ([start], 1)
+
+
+def test_abstract_path_refines_lazily(grid, graph):
+    start, goal = (524, 203), (187, 143)
+    waypoints, cost = graph.abstract_path(start, goal)
+    assert waypoints[0] == start and waypoints[-1] == goal
+    segments = graph.refine(waypoints)
+    first = next(segments)
+    assert first[0] == start and first[-1] == waypoints[1]
+
+    path = [start]
+    for segment in [first, *segments]:
+        path.extend(segment[1:])
+    assert_valid_path(grid, path, start, goal)
+    assert path_cost(path) == pytest.approx(cost)
+
+
+def sorted_edges(graph):
+    edges = graph.to_array()
+    return edges[np.lexsort(edges.T[::-1])]
+
+
+def test_save_and_load(grid, graph, tmp_path):
+    graph.save(tmp_path / "graph.npz")
+    loaded = HPAGraph.load(tmp_path / "graph.npz", grid)
+    assert loaded.cluster_size == graph.cluster_size
+    np.testing.assert_array_equal(sorted_edges(loaded), sorted_edges(graph))
+    with pytest.raises(ValueError):
+        HPAGraph.load(tmp_path / "graph.npz", grid[:10])
+
+
+def test_load_hpa_graph_caches_edges(tmp_path):
+    map_path = tmp_path / "test.map"
+    map_path.write_bytes(open("src/tests/maps/test.map", "rb").read())
+    graph = load_hpa_graph(map_path, cluster_size=4)
+    assert (tmp_path / "test.map.hpa4.npy").exists()
+    assert (tmp_path / "test.map.grid.npy").exists()
+    cached = load_hpa_graph(map_path, cluster_size=4)
+    np.testing.assert_array_equal(sorted_edges(cached), sorted_edges(graph))
+
+
+def test_load_hpa_graph_uses_the_given_grid(tmp_path, monkeypatch):
+    map_path = tmp_path / "test.map"
+    map_path.write_bytes(open("src/tests/maps/test.map", "rb").read())
+    grid = load_map(map_path)
+    monkeypatch.setattr(
+        "hpa.load_grid_cached", lambda path: pytest.fail("The map was loaded again")
+    )
+    graph = load_hpa_graph(map_path, cluster_size=4, grid=grid)
+    assert graph.grid is grid
@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from helpers import convert_map_to_grid
+from jps_plus import compute_jump_table, jps_plus, load_jump_table
+from pathfinding import (
+    DIRECTIONS,
+    astar,
+    is_valid,
+    jump_diagonal,
+    jump_straight,
+    neighbor_masks,
+    path_cost,
+)
+
+
+@pytest.fixture
+def grid():
+    grid, _, _ = convert_map_to_grid()
+    yield grid
+
+
+def walk_jump_distance(grid, node, direction):
+    jump = jump_straight if 0 in direction else jump_diagonal
+    jump_point = jump(neighbor_masks(grid), node, direction, None)
+    if jump_point is not None:
+        return max(abs(jump_point[0] - node[0]), abs(jump_point[1] - node[1]))
+    steps = 0
+    while is_valid(
+        node[0] + direction[0] * (steps + 1), node[1] + direction[1] * (steps + 1), grid
+    ):
+        steps += 1
+    return -steps
+
+
+def test_jump_table_matches_walking_jumps(grid):
+    table = compute_jump_table(grid)
+    assert table.dtype == np.int16
+    assert table.shape == grid.shape + (8,)
+    for x, y in np.argwhere(grid == 0):
+        for index, direction in enumerate(DIRECTIONS):
+            expected = walk_jump_distance(grid, (x, y), direction)
+            assert table[x, y, index] == expected, ((x, y), direction)
+
+
+def test_jump_table_on_random_grids():
+    rng = np.random.default_rng(5)
+    for _ in range(20):
+        grid = (rng.random((9, 11)) < 0.3).astype(np.uint8)
+        table = compute_jump_table(grid)
+        for x, y in np.argwhere(grid == 0):
+            for index, direction in enumerate(DIRECTIONS):
+                assert table[x, y, index] == walk_jump_distance(grid, (x, y), direction)
+
+
+def test_jps_plus_finds_optimal_paths(grid):
+    table = compute_jump_table(grid)
+    free = [tuple(cell) for cell in np.argwhere(grid == 0)]
+    for _ in range(30):
+        start, goal = random.sample(free, 2)
+        astar_path, astar_length = astar(grid, start, goal)
+        path, length = jps_plus(grid, start, goal, table)
+        assert length == astar_length
+        assert path_cost(path) == pytest.approx(path_cost(astar_path))
+
+
+def test_jps_plus_same_start_goal(grid):
+    assert jps_plus(grid, (1, 1), (1, 1)) == ([(1, 1)], 0)
+
+
+def test_load_jump_table_is_cached(tmp_path):
+    map_path = tmp_path / "test.map"
+    with open("src/tests/maps/test.map") as file:
+        map_path.write_text(file.read())
+    table = load_jump_table(map_path)
+    assert (tmp_path / "test.map.jps_plus.npy").exists()
+    grid, _, _ = convert_map_to_grid(map_path)
+    assert np.array_equal(table, compute_jump_table(grid))
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from benchmark import read_scenarios
+from helpers import load_map
+from landmarks import LandmarkHeuristic, compute_landmark_table, load_landmark_table
+from pathfinding import astar, distance_field, octile_heuristic
+from search_stats import run_search
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+@pytest.fixture(scope="module")
+def heuristic(grid):
+    yield LandmarkHeuristic(compute_landmark_table(grid, 4))
+
+
+def test_landmarks_are_spread_out(grid, heuristic):
+    landmarks = heuristic.landmarks
+    assert len(set(landmarks)) == 4
+    assert all(grid[landmark] == 0 for landmark in landmarks)
+    for a in landmarks:
+        for b in landmarks:
+            if a != b:
+                assert octile_heuristic(a, b) > 50
+
+
+def test_heuristic_is_admissible(grid, heuristic):
+    goal = (187, 143)
+    exact = distance_field(grid, goal)
+    rng = np.random.default_rng(0)
+    for node in map(tuple, np.argwhere(grid == 0)[rng.integers(10000, size=200)]):
+        assert octile_heuristic(node, goal) <= heuristic(node, goal)
+        assert heuristic(node, goal) <= exact[node] + 1e-9
+
+
+def test_astar_with_landmarks_is_optimal_and_expands_less(grid, heuristic):
+    scenarios = list(read_scenarios("src/tests/maps/ca_caverns1.map.scen"))[-10:]
+    octile_expansions = landmark_expansions = 0
+    for scenario in scenarios:
+        octile = run_search(astar, grid, scenario.start, scenario.goal)
+        landmark = run_search(
+            astar, grid, scenario.start, scenario.goal, heuristic=heuristic
+        )
+        assert landmark.cost == pytest.approx(octile.cost)
+        octile_expansions += octile.stats.expanded
+        landmark_expansions += landmark.stats.expanded
+    assert landmark_expansions < octile_expansions / 2
+
+
+def test_every_component_gets_a_landmark():
+    grid = np.zeros((5, 9), dtype=np.uint8)
+    grid[:, 4] = 1
+    table = compute_landmark_table(grid, 2)
+    heuristic = LandmarkHeuristic(table)
+    assert {landmark[1] < 4 for landmark in heuristic.landmarks} == {True, False}
+    assert table.dtype == np.float32
+    assert np.isinf(table[:, 4]).all()
+    assert astar(grid, (0, 0), (4, 3), heuristic=heuristic)[1] == 5
+    assert astar(grid, (0, 0), (4, 8), heuristic=heuristic) == ([], 0)
+
+
+def test_load_landmark_table_caches(tmp_path):
+    map_path = tmp_path / "test.map"
+    map_path.write_bytes(open("src/tests/maps/test.map", "rb").read())
+    table = load_landmark_table(map_path, 3)
+    assert (tmp_path / "test.map.landmarks3.npy").exists()
+    np.testing.assert_array_equal(load_landmark_table(map_path, 3), table)
+    np.testing.assert_array_equal(table, compute_landmark_table(load_map(map_path), 3))
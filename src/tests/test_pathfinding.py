@@ -1,9 +1,22 @@
-import random
+import subprocess
+import sys
 
+import numpy as np
 import pytest
 
 from helpers import convert_map_to_grid
-from pathfinding import astar, is_valid, jps, octile_heuristic
+from pathfinding import (
+    DIRECTIONS,
+    astar,
+    bidirectional_astar,
+    is_valid,
+    jps,
+    neighbor_masks,
+    octile_heuristic,
+    path_cost,
+    update_neighbor_masks,
+)
+from search_state import ArraySearchState
 
 
 # Create a fixture for the grid
@@ -16,23 +29,12 @@ def grid():
 # Create a fixture for the valid start and goal positions
 @pytest.fixture
 def create_valid_start_goal(grid):
+    free = np.argwhere(grid == 0)
+    rng = np.random.default_rng(0)
+
     def _create_valid_start_goal():
-        start = random.choice(
-            [(x, y) for x in range(len(grid[0])) for y in range(len(grid))]
-        )
-        while not is_valid(start[0], start[1], grid):
-            start = random.choice(
-                [(x, y) for x in range(len(grid[0])) for y in range(len(grid))]
-            )
-
-        goal = random.choice(
-            [(x, y) for x in range(len(grid[0])) for y in range(len(grid))]
-        )
-        while not is_valid(goal[0], goal[1], grid) or goal == start:
-            goal = random.choice(
-                [(x, y) for x in range(len(grid[0])) for y in range(len(grid))]
-            )
-        return start, goal
+        start_index, goal_index = rng.choice(len(free), size=2, replace=False)
+        return tuple(map(int, free[start_index])), tuple(map(int, free[goal_index]))
 
     yield _create_valid_start_goal
 
@@ -131,5 +133,84 @@ def test_astar_and_jps_same_length(grid, create_valid_start_goal):
     assert astar_length == jps_length
 
 
+def test_array_state_gives_same_lengths(grid, create_valid_start_goal):
+    state = ArraySearchState(grid.shape)
+    for _ in range(5):
+        start, goal = create_valid_start_goal()
+        assert astar(grid, start, goal, state)[1] == astar(grid, start, goal)[1]
+        assert jps(grid, start, goal, state)[1] == jps(grid, start, goal)[1]
+
+
+def test_observer_sees_every_expansion(grid):
+    events = []
+    path, _ = astar(grid, (1, 1), (3, 1), observer=lambda *event: events.append(event))
+    assert events[0] == ("expand", (1, 1))
+    assert all(event == "expand" for event, _ in events)
+
+    events.clear()
+    jps(grid, (1, 1), (3, 1), observer=lambda *event: events.append(event))
+    assert ("expand", (1, 1)) in events
+    assert {event for event, _ in events} == {"expand", "jump"}
+
+
+def test_bidirectional_astar_same_cost_as_astar(grid, create_valid_start_goal):
+    for _ in range(10):
+        start, goal = create_valid_start_goal()
+        path, length = bidirectional_astar(grid, start, goal)
+        expected, _ = astar(grid, start, goal)
+        assert length == len(path)
+        assert path_cost(path) == pytest.approx(path_cost(expected))
+        if path:
+            assert path[0] == start and path[-1] == goal
+            for a, b in zip(path, path[1:]):
+                assert max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+                assert is_valid(b[0], b[1], grid)
+
+
+def test_bidirectional_astar_edge_cases(grid):
+    assert bidirectional_astar(grid, (1, 1), (1, 1)) == ([(1, 1)], 1)
+    assert bidirectional_astar(grid, (-1, -1), (1, 1)) == ([], 0)
+    events = []
+    bidirectional_astar(
+        grid, (1, 1), (3, 1), observer=lambda *event: events.append(event)
+    )
+    assert events and all(event == "expand" for event, _ in events)
+
+
+def test_weighted_astar_is_bounded(grid, create_valid_start_goal):
+    for _ in range(5):
+        start, goal = create_valid_start_goal()
+        optimal, optimal_length = astar(grid, start, goal)
+        weighted, weighted_length = astar(grid, start, goal, weight=2)
+        assert (optimal_length == 0) == (weighted_length == 0)
+        if optimal:
+            assert path_cost(weighted) <= 2 * path_cost(optimal) + 1e-9
+
+
+def test_neighbor_masks_match_is_valid(grid):
+    masks = neighbor_masks(grid)
+    assert masks.dtype == np.uint8 and masks.shape == grid.shape
+    for x in range(grid.shape[0]):
+        for y in range(grid.shape[1]):
+            for index, (dx, dy) in enumerate(DIRECTIONS):
+                assert bool(masks[x, y] >> index & 1) == is_valid(x + dx, y + dy, grid)
+
+
+def test_update_neighbor_masks_matches_recomputing(grid):
+    grid = np.array(grid)
+    masks = neighbor_masks(grid)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        node = tuple(rng.integers(grid.shape))
+        grid[node] = 1 - grid[node]
+        update_neighbor_masks(masks, grid, node)
+        np.testing.assert_array_equal(masks, neighbor_masks(grid))
+
+
+def test_pathfinding_is_headless():
+    code = "import sys, pathfinding; assert 'pygame' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd="src", check=True)
+
+
 if __name__ == "__main__":
     pytest.main()  # pragma: no cover
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from helpers import load_map
+from perf_suite import compare, run_suite, sample_queries
+
+
+def test_sample_queries_is_seeded_and_valid():
+    grid = load_map("src/tests/maps/test.map")
+    queries = sample_queries(grid, 50, seed=3)
+    assert queries == sample_queries(grid, 50, seed=3)
+    assert queries != sample_queries(grid, 50, seed=4)
+    assert len(queries) == 50
+    for start, goal in queries:
+        assert start != goal
+        assert grid[start] == 0 and grid[goal] == 0
+
+
+def test_run_suite_covers_loader_and_searches():
+    results = run_suite(maps=["src/tests/maps/test.map"], queries=5)
+    benchmarks = results["results"]["src/tests/maps/test.map"]
+    assert set(benchmarks) == {
+        "convert_map_to_grid",
+        "convert_map_to_grid_cached",
+        "astar",
+        "jps",
+    }
+    assert benchmarks["astar"]["expansions"] > 0
+    assert benchmarks["jps"]["p95_ms"] >= benchmarks["jps"]["median_ms"]
+
+
+def baseline(median_ms, p95_ms, expansions):
+    return {
+        "queries": 10,
+        "seed": 0,
+        "results": {
+            "a.map": {
+                "astar": {
+                    "median_ms": median_ms,
+                    "p95_ms": p95_ms,
+                    "expansions": expansions,
+                }
+            }
+        },
+    }
+
+
+def test_compare_flags_regressions():
+    assert compare(baseline(1.1, 2.0, 100), baseline(1.0, 2.0, 100)) == []
+    assert compare(baseline(1.0, 2.0, 90), baseline(1.0, 2.0, 100)) == []
+    # Below MIN_REGRESSION_MS a large ratio is timer noise
+    assert compare(baseline(0.02, 0.04, 100), baseline(0.01, 0.02, 100)) == []
+
+    regressions = compare(baseline(1.6, 2.0, 101), baseline(1.0, 2.0, 100))
+    assert len(regressions) == 2
+    assert "median_ms" in regressions[0]
+    assert "expansions" in regressions[1]
+
+
+def test_compare_rejects_a_different_configuration():
+    current = baseline(1.0, 2.0, 100) | {"seed": 1}
+    with pytest.raises(ValueError):
+        compare(current, baseline(1.0, 2.0, 100))
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from helpers import convert_map_to_grid
+from pathfinding import astar, jps
+from result_cache import ResultCache, grid_key
+
+
+@pytest.fixture
+def grid():
+    grid, _, _ = convert_map_to_grid()
+    yield np.array(grid)
+
+
+def test_repeated_query_is_a_hit(grid):
+    cache = ResultCache()
+    first = cache.solve(astar, grid, (1, 1), (13, 13))
+    second = cache.solve(astar, grid, (1, 1), (13, 13))
+    assert first == second == astar(grid, (1, 1), (13, 13))
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_reversed_query_reverses_cached_path(grid):
+    cache = ResultCache()
+    path, length = cache.solve(jps, grid, (1, 1), (13, 13))
+    reversed_path, reversed_length = cache.solve(jps, grid, (13, 13), (1, 1))
+    assert reversed_path == path[::-1]
+    assert reversed_length == length
+    assert cache.hits == 1
+
+
+def test_algorithms_are_cached_separately(grid):
+    cache = ResultCache()
+    cache.solve(astar, grid, (1, 1), (13, 13))
+    cache.solve(jps, grid, (1, 1), (13, 13))
+    assert cache.misses == 2
+
+
+def test_grid_changed_bumps_the_version(grid):
+    cache = ResultCache()
+    path, _ = cache.solve(astar, grid, (1, 1), (13, 13))
+    grid[path[len(path) // 2]] = 1
+    cache.grid_changed()
+    new_path, _ = cache.solve(astar, grid, (1, 1), (13, 13))
+    assert cache.misses == 2
+    assert new_path != path
+
+
+def test_in_place_change_needs_grid_changed(grid):
+    cache = ResultCache()
+    path, _ = cache.solve(astar, grid, (1, 1), (13, 13))
+    grid[path[len(path) // 2]] = 1
+    # The cache cannot see the change and returns the old path
+    assert cache.solve(astar, grid, (1, 1), (13, 13))[0] == path
+    cache.grid_changed()
+    assert cache.solve(astar, grid, (1, 1), (13, 13)) == astar(grid, (1, 1), (13, 13))
+
+
+def test_another_grid_is_a_miss(grid):
+    cache = ResultCache()
+    cache.solve(astar, grid, (1, 1), (13, 13))
+    cache.solve(astar, grid.copy(), (1, 1), (13, 13))
+    assert cache.misses == 2
+
+
+def test_mutating_grid_changes_key(grid):
+    cache = ResultCache()
+    key = grid_key(grid)
+    path, _ = cache.solve(astar, grid, (1, 1), (13, 13), version=key)
+    grid[path[len(path) // 2]] = 1
+    assert grid_key(grid) != key
+    new_path, _ = cache.solve(astar, grid, (1, 1), (13, 13), version=grid_key(grid))
+    assert cache.misses == 2
+    assert new_path != path
+
+
+def test_lambdas_are_cached_separately(grid):
+    cache = ResultCache()
+    first, second = (
+        lambda grid, start, goal: astar(grid, start, goal),
+        lambda grid, start, goal: ([], 0),
+    )
+    assert first.__qualname__ == second.__qualname__
+    assert cache.solve(first, grid, (1, 1), (13, 13))[0]
+    assert cache.solve(second, grid, (1, 1), (13, 13)) == ([], 0)
+    assert cache.misses == 2
+
+
+def test_version_and_invalidate(grid):
+    cache = ResultCache()
+    cache.solve(astar, grid, (1, 1), (13, 13), version=1)
+    cache.solve(astar, grid, (1, 1), (13, 13), version=1)
+    assert cache.hits == 1
+    cache.invalidate()
+    assert len(cache) == 0 and cache.size_bytes == 0
+    cache.solve(astar, grid, (1, 1), (13, 13), version=1)
+    assert cache.misses == 2
+
+
+def test_lru_eviction_respects_memory_bound(grid):
+    entry_bytes = ResultCache.entry_size(astar(grid, (1, 1), (1, 2))[0])
+    cache = ResultCache(max_bytes=2 * entry_bytes)
+    cache.solve(astar, grid, (1, 1), (1, 2))
+    cache.solve(astar, grid, (1, 2), (1, 3))
+    cache.solve(astar, grid, (1, 1), (1, 2))  # Makes (1, 2) -> (1, 3) the oldest
+    cache.solve(astar, grid, (2, 1), (3, 1))
+    assert cache.evictions == 1
+    assert cache.size_bytes <= cache.max_bytes
+    cache.solve(astar, grid, (1, 1), (1, 2))
+    assert cache.hits == 2
+    cache.solve(astar, grid, (1, 2), (1, 3))
+    assert cache.misses == 4
+
+
+def test_masks_are_computed_once_per_grid(grid):
+    seen = []
+
+    def search(grid, start, goal, masks=None):
+        seen.append(masks)
+        return astar(grid, start, goal, masks=masks)
+
+    cache = ResultCache()
+    cache.solve(search, grid, (1, 1), (13, 13))
+    cache.solve(search, grid, (1, 1), (10, 13))
+    assert seen[0] is not None and seen[0] is seen[1]
+    grid[5, 5] = 1 - grid[5, 5]
+    cache.grid_changed()
+    cache.solve(search, grid, (1, 1), (13, 13))
+    assert seen[2] is not seen[1]
@@ -0,0 +1,46 @@
+import numpy as np
+
+from search_state import ArraySearchState, DictSearchState
+
+
+def test_dict_state_path_to():
+    state = DictSearchState()
+    state.set((0, 0), 0, None)
+    state.set((0, 1), 1, (0, 0))
+    state.set((1, 2), 1 + np.sqrt(2), (0, 1))
+    assert state.path_to((1, 2)) == [(0, 0), (0, 1), (1, 2)]
+    assert state.get_g((5, 5)) == np.inf
+
+
+def test_array_state_path_to():
+    state = ArraySearchState((3, 4))
+    state.reset()
+    state.set((0, 0), 0, None)
+    state.set((0, 1), 1, (0, 0))
+    state.set((1, 2), 1 + np.sqrt(2), (0, 1))
+    assert state.path_to((1, 2)) == [(0, 0), (0, 1), (1, 2)]
+    assert state.parent_of((0, 0)) is None
+    assert state.parent_of((1, 2)) == (0, 1)
+    assert state.get_g((1, 2)) == np.float32(1 + np.sqrt(2))
+
+
+def test_array_state_reset_forgets_previous_query():
+    state = ArraySearchState((3, 3))
+    state.reset()
+    state.set((1, 1), 2.0, None)
+    state.close((1, 1))
+    state.reset()
+    assert state.get_g((1, 1)) == np.inf
+    assert not state.is_closed((1, 1))
+    assert state.parent_of((1, 1)) is None
+    assert state.closed_nodes() == []
+
+
+def test_array_state_generation_wraps_around():
+    state = ArraySearchState((2, 2))
+    state.generation = np.iinfo(np.uint32).max - 2
+    state.reset()
+    state.close((0, 1))
+    state.reset()
+    assert state.generation == 1
+    assert not state.is_closed((0, 1))
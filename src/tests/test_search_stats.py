@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from block_jps import block_jps
+from helpers import convert_map_to_grid
+from jps_plus import jps_plus
+from pathfinding import astar, bidirectional_astar, jps, path_cost
+from search_stats import SearchStats, run_search
+
+ALGORITHMS = [astar, bidirectional_astar, jps, jps_plus, block_jps]
+
+
+@pytest.fixture
+def grid():
+    grid, _, _ = convert_map_to_grid()
+    yield grid
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_counters_match_observer(grid, algorithm):
+    events = []
+    stats = SearchStats()
+    path, length = algorithm(
+        grid,
+        (1, 1),
+        (13, 13),
+        observer=lambda *event: events.append(event),
+        stats=stats,
+    )
+    assert (path, length) == algorithm(grid, (1, 1), (13, 13))
+    assert stats.expanded == sum(event == "expand" for event, _ in events)
+    assert stats.pops >= stats.expanded
+    assert stats.pushes >= stats.pops
+    assert stats.generated >= stats.pushes - 2
+    assert 1 <= stats.peak_open <= stats.pushes
+
+
+@pytest.mark.parametrize("algorithm", [astar, bidirectional_astar])
+def test_generated_skips_closed_neighbours(algorithm):
+    # Every cell of a corridor has one neighbour that is not closed yet
+    corridor = np.zeros((1, 6), dtype=np.uint8)
+    stats = SearchStats()
+    algorithm(corridor, (0, 0), (0, 5), stats=stats)
+    assert stats.generated == stats.expanded
+
+
+def test_jump_steps(grid):
+    stats = SearchStats()
+    jps(grid, (1, 1), (13, 13), stats=stats)
+    assert stats.jump_steps > 0
+    stats = SearchStats()
+    astar(grid, (1, 1), (13, 13), stats=stats)
+    assert stats.jump_steps == 0
+
+
+def test_run_search(grid):
+    result = run_search(astar, grid, (1, 1), (13, 13))
+    assert result.path == astar(grid, (1, 1), (13, 13))[0]
+    assert result.length == len(result.path)
+    assert result.cost == pytest.approx(path_cost(result.path))
+    assert result.cost >= result.length - 1
+    assert result.stats.wall_time > 0
+    assert result.stats.as_dict()["expanded"] == result.stats.expanded
+
+    unreachable = run_search(jps, grid, (-1, -1), (13, 13))
+    assert unreachable.path == [] and unreachable.cost == float("inf")
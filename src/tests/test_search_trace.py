@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from helpers import load_map
+from pathfinding import jps
+from search_trace import EXPAND, JUMP, SearchTrace, TraceRecorder
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+def test_recorder_records_events_in_order(grid):
+    events = []
+    recorder = TraceRecorder(grid.shape, capacity=4)
+    start, goal = (524, 203), (187, 143)
+
+    def observer(event, node):
+        events.append((event, node))
+        recorder(event, node)
+
+    jps(grid, start, goal, observer=observer)
+    trace = recorder.trace(start, goal)
+    assert len(trace) == len(events) > 4
+    assert trace.events.dtype == np.int32
+    assert [tuple(cell) for cell in trace.cells.tolist()] == [
+        node for _, node in events
+    ]
+    assert trace.kinds.tolist() == [
+        JUMP if event == "jump" else EXPAND for event, _ in events
+    ]
+    expanded = [node for event, node in events if event == "expand"]
+    assert [tuple(cell) for cell in trace.expanded().tolist()] == expanded
+
+
+def test_save_and_load(tmp_path):
+    recorder = TraceRecorder((3, 4))
+    recorder("expand", (0, 0))
+    recorder("jump", (2, 3))
+    path = tmp_path / "search.npz"
+    recorder.trace((0, 0), (2, 3)).save(path)
+
+    trace = SearchTrace.load(path)
+    assert trace.shape == (3, 4)
+    assert trace.start == (0, 0) and trace.goal == (2, 3)
+    assert trace.cells.tolist() == [[0, 0], [2, 3]]
+    assert trace.kinds.tolist() == [EXPAND, JUMP]
+
+    recorder.clear()
+    assert len(recorder) == 0
+    recorder.trace().save(path)
+    assert SearchTrace.load(path).start is None
+
+
+def test_large_grids_use_int64_events():
+    shape = (1 << 16, 1 << 15)  # 2**31 cells, the ids overflow int32
+    recorder = TraceRecorder(shape, capacity=2)
+    last = (shape[0] - 1, shape[1] - 1)
+    recorder("jump", last)
+    recorder("expand", (0, 1))
+    trace = recorder.trace()
+    assert trace.events.dtype == np.int64
+    assert trace.cells.tolist() == [list(last), [0, 1]]
+    assert trace.kinds.tolist() == [JUMP, EXPAND]
+    assert TraceRecorder((1 << 15, 1 << 15), capacity=1).trace().events.dtype == (
+        np.int32
+    )
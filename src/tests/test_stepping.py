@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+import pytest
+
+from helpers import load_map
+from pathfinding import astar, jps, path_cost
+from stepping import (
+    BUDGET_EXHAUSTED,
+    CANCELLED,
+    FOUND,
+    NO_PATH,
+    AStarSearch,
+    JPSSearch,
+    SteppingSearch,
+)
+
+
+@pytest.fixture(scope="module")
+def grid():
+    yield load_map("src/tests/maps/ca_caverns1.map")
+
+
+START, GOAL = (524, 203), (187, 143)
+
+
+@pytest.mark.parametrize(
+    "search_class, algorithm", [(AStarSearch, astar), (JPSSearch, jps)]
+)
+def test_sliced_search_matches_the_full_search(grid, search_class, algorithm):
+    search = search_class(grid, START, GOAL)
+    slices = sum(1 for _ in search.slices(expansions=50))
+    assert slices > 1
+    assert search.status == FOUND
+    path, length = search.result()
+    expected, expected_length = algorithm(grid, START, GOAL)
+    assert length == expected_length
+    assert path_cost(path) == pytest.approx(path_cost(expected))
+
+
+def test_slices_respect_the_expansion_count(grid):
+    search = AStarSearch(grid, START, GOAL)
+    for expected in (10, 20, 30):
+        assert not search.step(expansions=10)
+        assert search.expanded == expected
+
+
+def test_max_expansions_stops_the_search(grid):
+    search = AStarSearch(grid, START, GOAL, max_expansions=100)
+    assert search.step(expansions=60) is False
+    assert search.step(expansions=60) is True
+    assert search.status == BUDGET_EXHAUSTED
+    assert search.expanded == 100
+    assert search.result() == ([], 0)
+
+
+def test_deadline_stops_the_search(grid):
+    search = AStarSearch(grid, START, GOAL, deadline=time.perf_counter())
+    assert search.run() == ([], 0)
+    assert search.status == BUDGET_EXHAUSTED
+
+
+def test_cancel_keeps_the_partial_frontier(grid):
+    search = AStarSearch(grid, START, GOAL)
+    search.step(expansions=200)
+    search.cancel()
+    assert search.step() is True
+    assert search.status == CANCELLED
+
+    frontier = search.frontier()
+    assert frontier
+    assert [f for _, f, _ in frontier] == sorted(f for _, f, _ in frontier)
+    partial = search.partial_path()
+    assert partial[0] == START
+    assert all(
+        max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+        for a, b in zip(partial, partial[1:])
+    )
+
+
+def test_no_path_and_same_start_goal():
+    grid = np.zeros((5, 5), dtype=np.uint8)
+    grid[:, 2] = 1
+    search = JPSSearch(grid, (0, 0), (4, 4))
+    assert search.run() == ([], 0)
+    assert search.status == NO_PATH
+    assert AStarSearch(grid, (0, 0), (0, 0)).run() == ([(0, 0)], 1)
+    assert AStarSearch(grid, (0, 2), (0, 0)).partial_path() == []
+
+
+def test_subclass_without_expand_cannot_be_created(grid):
+    class Incomplete(SteppingSearch):
+        pass
+
+    with pytest.raises(TypeError):
+        SteppingSearch(grid, START, GOAL)
+    with pytest.raises(TypeError):
+        Incomplete(grid, START, GOAL)
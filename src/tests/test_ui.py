@@ -1,6 +1,21 @@
 import numpy as np
+import pygame
 
-from ui import button_rect, handle_mouse_click, height, tile_size, width
+from bitgrid import BitGrid
+from search_trace import TraceRecorder
+from settings import GRID_COLOR, OBSTACLE_COLOR
+from ui import (
+    GridRenderer,
+    TraceReplay,
+    button_rect,
+    draw_grid,
+    get_renderer,
+    handle_mouse_click,
+    height,
+    search_observer,
+    tile_size,
+    width,
+)
 
 
 def test_handle_mouse_click_inside_grid():
@@ -30,3 +45,114 @@ def test_handle_mouse_click_on_valid_cell():
     grid = np.zeros((height, width))
     result = handle_mouse_click(pos, grid)
     assert result == (False, (2, 2))
+
+
+def test_renderer_background_colors():
+    grid = np.array([[0, 1], [0, 0]])
+    renderer = GridRenderer(grid, pygame.Surface((8, 8)), 4)
+    assert renderer.background.get_at((5, 1))[:3] == OBSTACLE_COLOR
+    assert renderer.background.get_at((1, 1))[:3] == GRID_COLOR
+    assert renderer.background.get_at((0, 1))[:3] == (255, 255, 255)
+    assert renderer.background.get_at((1, 7))[:3] == (255, 255, 255)
+
+
+def test_renderer_paint_cells_returns_dirty_rects():
+    grid = np.zeros((2, 2))
+    renderer = GridRenderer(grid, pygame.Surface((8, 8)), 4)
+    renderer.draw_background()
+    rects = renderer.paint_cells([(1, 0)], (1, 2, 3))
+    assert rects == [pygame.Rect(0, 4, 4, 4)]
+    assert renderer.surface.get_at((2, 6))[:3] == (1, 2, 3)
+
+
+def test_get_renderer_rerenders_only_changed_grid():
+    grid = np.zeros((height, width))
+    first = get_renderer(grid)
+    assert get_renderer(grid.copy()) is first
+    grid[0, 0] = 1
+    assert get_renderer(grid) is not first
+
+
+def test_search_observer_updates_only_dirty_rects(monkeypatch):
+    updates = []
+    monkeypatch.setattr(
+        pygame.display, "update", lambda rects=None: updates.append(list(rects or []))
+    )
+    grid = np.zeros((height, width))
+    observer = search_observer(grid, (0, 0), (1, 1), frequency=2)
+    updates.clear()
+    for node in [(0, 0), (0, 1), (1, 0), (2, 2)]:
+        observer("expand", node)
+    observer("jump", (3, 3))
+    assert len(updates) == 1
+    assert [rect.topleft for rect in updates[0]] == [
+        (tile_size, 0),
+        (0, tile_size),
+    ]
+
+
+def test_draw_grid_updates_only_changed_cells(monkeypatch):
+    updates = []
+    monkeypatch.setattr(
+        pygame.display, "update", lambda rects=None: updates.append(rects)
+    )
+    grid = np.zeros((height, width))
+    grid[-1, -1] = 1  # A grid no other test has drawn
+    draw_grid(grid, [(0, 1), (0, 2)], start=None, goal=None)
+    grid_renderer = get_renderer(grid)
+    assert updates[-1][0] == grid_renderer.background.get_rect()
+
+    draw_grid(grid, [(1, 1)], start=None, goal=None)
+    assert [rect.topleft for rect in updates[-1]] == [
+        (tile_size, 0),
+        (2 * tile_size, 0),
+        (tile_size, tile_size),
+    ]
+    surface = grid_renderer.surface
+    assert surface.get_at(grid_renderer.cell_rect((0, 1)).center)[:3] == GRID_COLOR
+
+
+def test_trace_replay_seeks_both_ways():
+    grid = np.zeros((height, width))
+    recorder = TraceRecorder(grid.shape)
+    for node in [(0, 1), (1, 1), (2, 2)]:
+        recorder("expand", node)
+    replay = TraceReplay(grid, recorder.trace((0, 0), (3, 3)), speed=2)
+    replay.draw()
+
+    assert len(replay.advance()) == 2
+    assert len(replay.advance()) == 1
+    assert replay.position == 3
+    assert replay.advance() == []
+
+    replay.handle_key(pygame.K_LEFT)
+    assert replay.position == 1
+    surface = get_renderer(grid).surface
+    assert surface.get_at(get_renderer(grid).cell_rect((0, 1)).center)[:3] == (
+        66,
+        66,
+        66,
+    )
+    assert surface.get_at(get_renderer(grid).cell_rect((2, 2)).center)[:3] == GRID_COLOR
+
+    replay.handle_key(pygame.K_SPACE)
+    assert replay.advance() == []
+    replay.handle_key(pygame.K_END)
+    assert replay.position == 3
+
+
+def test_draw_grid_accepts_a_bit_grid(monkeypatch):
+    grid = np.zeros((height, width), dtype=np.uint8)
+    grid[1, 2] = 1
+    bit_grid = BitGrid.from_array(grid)
+
+    def unpack_whole_grid(*args, **kwargs):
+        raise AssertionError("The renderer unpacked the whole grid")
+
+    monkeypatch.setattr(BitGrid, "__array__", unpack_whole_grid)
+    draw_grid(bit_grid, start=(0, 0))
+    grid_renderer = get_renderer(bit_grid)
+    assert grid_renderer.matches(bit_grid.copy())
+    assert not grid_renderer.matches(grid)
+    center = grid_renderer.cell_rect((1, 2)).center
+    assert grid_renderer.surface.get_at(center)[:3] == OBSTACLE_COLOR
@@ -1,5 +1,7 @@
+import numpy as np
 import pygame
 
+from bitgrid import BitGrid
 from helpers import convert_map_to_grid
 from settings import (
     BUTTON_COLOR,
@@ -7,13 +9,16 @@ from settings import (
     BUTTON_HOVER_COLOR,
     BUTTON_TEXT_COLOR,
     BUTTON_WIDTH,
+    DRAWING_FREQ,
     GOAL_COLOR,
     GRID_COLOR,
+    JUMP_POINT_COLOR,
     OBSTACLE_COLOR,
     SCREEN_HEIGHT,
     SCREEN_WIDTH,
     START_COLOR,
 )
+from search_trace import JUMP
 
 
 def calculate_tile_size(width, height):
@@ -69,11 +74,146 @@ def set_screen(height, width):
 screen = set_screen(width, height)
 
 
+class GridRenderer:
+    """
+    Draws a grid from a background surface that is rendered only once.
+
+    The obstacle layer is built with NumPy and pygame.surfarray instead of two
+    pygame.draw.rect calls per cell. Drawing a search on top of it only fills the
+    cells that changed, and only those rectangles need to be sent to the display.
+    """
+
+    def __init__(self, grid, surface, tile_size):
+        """
+        Args:
+            grid (numpy.ndarray or BitGrid): The grid to draw, 1 marks an obstacle.
+            surface (pygame.Surface): The surface to draw on.
+            tile_size (int): The size of a cell in pixels.
+        """
+        self.surface = surface
+        self.tile_size = tile_size
+        self.grid = grid.copy()
+        self.background = self.render_background(self.grid)
+        self.drawn = False  # Whether the background has been drawn on the surface
+        self.painted = []  # The cells painted over the background since then
+
+    def render_background(self, grid, band_rows=256):
+        """
+        Renders the grid into a surface: obstacle cells in OBSTACLE_COLOR and free
+        cells in GRID_COLOR with a white one pixel border.
+
+        The grid is read and rendered a band of rows at a time, so a bit-packed
+        grid is never unpacked whole.
+
+        Args:
+            grid (numpy.ndarray or BitGrid): The grid to render.
+            band_rows (int, optional): The number of rows rendered at a time.
+
+        Returns:
+            pygame.Surface: The rendered grid.
+        """
+        tile = self.tile_size
+        height, width = grid.shape
+        surface = pygame.Surface((width * tile, height * tile))
+        edge = np.zeros(tile, dtype=bool)
+        edge[[0, -1]] = True
+        columns = np.tile(edge, width)
+
+        for top in range(0, height, band_rows):
+            blocked = np.asarray(grid[top : top + band_rows]) != 0
+            colors = np.where(blocked[..., None], OBSTACLE_COLOR, GRID_COLOR)
+            # Scale every cell up to tile_size x tile_size pixels
+            pixels = colors.astype(np.uint8).repeat(tile, axis=0).repeat(tile, axis=1)
+
+            rows = np.tile(edge, blocked.shape[0])
+            border = rows[:, None] | columns[None, :]
+            free = ~blocked.repeat(tile, axis=0).repeat(tile, axis=1)
+            pixels[border & free] = (255, 255, 255)
+
+            # surfarray indexes pixels as [x, y], the grid as [row, column]
+            band = pygame.surfarray.make_surface(pixels.swapaxes(0, 1))
+            surface.blit(band, (0, top * tile))
+        return surface
+
+    def matches(self, grid):
+        """
+        Returns True if the cached background was rendered from this grid.
+        """
+        # A packed grid is compared packed and never matches an unpacked one
+        packed = isinstance(self.grid, BitGrid)
+        if self.grid.shape != grid.shape or packed != isinstance(grid, BitGrid):
+            return False
+        return self.grid == grid if packed else np.array_equal(self.grid, grid)
+
+    def cell_rect(self, cell):
+        size = self.tile_size
+        return pygame.Rect(cell[1] * size, cell[0] * size, size, size)
+
+    def draw_background(self):
+        """
+        Copies the cached background onto the surface.
+
+        Returns:
+            pygame.Rect: The area that was drawn.
+        """
+        self.drawn = True
+        self.painted = []
+        return self.surface.blit(self.background, (0, 0))
+
+    def restore_background(self):
+        """
+        Copies the cached background over the cells painted since it was last
+        drawn, or draws the whole background if it has not been drawn yet or most
+        of it has been painted over.
+
+        Returns:
+            list of pygame.Rect: The dirty rectangles to update on the display.
+        """
+        cells = self.grid.shape[0] * self.grid.shape[1]
+        if not self.drawn or len(self.painted) > cells // 4:
+            return [self.draw_background()]
+        rects, self.painted = self.painted, []
+        for rect in rects:
+            self.surface.blit(self.background, rect, rect)
+        return rects
+
+    def paint_cells(self, cells, color):
+        """
+        Fills the given cells with a color.
+
+        Args:
+            cells (iterable of tuple): The (x, y) cells to fill.
+            color (tuple): The RGB color.
+
+        Returns:
+            list of pygame.Rect: The dirty rectangles to update on the display.
+        """
+        rects = [self.cell_rect(cell) for cell in cells]
+        for rect in rects:
+            self.surface.fill(color, rect)
+        self.painted.extend(rects)
+        return rects
+
+
+renderer = None
+
+
+def get_renderer(grid):
+    """
+    Returns the renderer for a grid, re-rendering the background only when the grid
+    is different from the one drawn before.
+    """
+    global renderer
+    if renderer is None or not renderer.matches(grid):
+        renderer = GridRenderer(grid, screen, tile_size)
+    return renderer
+
+
 def draw_grid(grid, path=None, path_color=(33, 33, 33), start=(-1, -1), goal=(-1, -1)):
     """
     Draws a grid with optional path, start, and goal points using Pygame.
     Args:
-        grid (numpy.ndarray): A 2D array representing the grid where 1 indicates an obstacle and 0 indicates a free space.
+        grid (numpy.ndarray or BitGrid): A 2D array representing the grid where 1 indicates an obstacle and 0 indicates a free space.
         path (list of tuples, optional): A list of (x, y) tuples representing the path to be drawn. Defaults to None.
         path_color (tuple, optional): A tuple representing the RGB color of the path. Defaults to (33, 33, 33).
         start (tuple, optional): A tuple (x, y) representing the start point. Defaults to (-1, -1).
@@ -81,36 +221,172 @@ def draw_grid(grid, path=None, path_color=(33, 33, 33), start=(-1, -1), goal=(-1
     Returns:
         None
     """
-    # Draw the grid with obstacles
-    for x in range(grid.shape[0]):
-        for y in range(grid.shape[1]):
-            rect = pygame.Rect(y * tile_size, x * tile_size, tile_size, tile_size)
-            if grid[x, y] == 1:
-                pygame.draw.rect(screen, OBSTACLE_COLOR, rect)
-            else:
-                pygame.draw.rect(screen, GRID_COLOR, rect)
-                pygame.draw.rect(screen, (255, 255, 255), rect, 1)
+    grid_renderer = get_renderer(grid)
+
+    # Draw the grid with obstacles, or just erase what was drawn on it last time
+    rects = grid_renderer.restore_background()
 
     # Draw start and goal points
     if start:
-        rect = pygame.Rect(
-            start[1] * tile_size, start[0] * tile_size, tile_size, tile_size
-        )
-        pygame.draw.rect(screen, START_COLOR, rect)
+        rects.extend(grid_renderer.paint_cells([start], START_COLOR))
 
     if goal:
-        rect = pygame.Rect(
-            goal[1] * tile_size, goal[0] * tile_size, tile_size, tile_size
-        )
-        pygame.draw.rect(screen, GOAL_COLOR, rect)
+        rects.extend(grid_renderer.paint_cells([goal], GOAL_COLOR))
 
     # Draw the path
     if path:
-        for x, y in path:
-            rect = pygame.Rect(y * tile_size, x * tile_size, tile_size, tile_size)
-            pygame.draw.rect(screen, path_color, rect)
+        rects.extend(grid_renderer.paint_cells(path, path_color))
 
-    pygame.display.update()
+    pygame.display.update(rects)
+
+
+def search_observer(grid, start, goal, frequency=DRAWING_FREQ):
+    """
+    Creates an observer that draws a search in progress. Pass it as the observer
+    argument of astar or jps.
+    The grid is drawn once; after that only the newly expanded cells are painted
+    and only their rectangles are updated on the display.
+    Args:
+        grid (numpy.ndarray): The grid being searched.
+        start (tuple): The start point of the search (x, y).
+        goal (tuple): The goal point of the search (x, y).
+        frequency (int, optional): Update the display after every frequency
+            expansions. Defaults to DRAWING_FREQ.
+    Returns:
+        callable: An observer(event, node) callback.
+    """
+    draw_grid(grid, start=start, goal=goal)
+    grid_renderer = get_renderer(grid)
+    dirty_rects = []
+
+    def observer(event, node):
+        if event != "expand" or node == start or node == goal:
+            return
+        dirty_rects.extend(grid_renderer.paint_cells([node], (66, 66, 66)))
+        if len(dirty_rects) >= frequency:
+            pygame.display.update(dirty_rects)
+            dirty_rects.clear()
+
+    return observer
+
+
+class TraceReplay:
+    """
+    Replays a recorded search (search_trace.SearchTrace) on the grid at any speed,
+    forwards or backwards.
+
+    Moving forwards paints only the cells of the new events. Moving backwards
+    redraws the background and repaints the events up to the new position.
+    """
+
+    def __init__(self, grid, trace, speed=DRAWING_FREQ):
+        """
+        Args:
+            grid (numpy.ndarray): The grid the trace was recorded on.
+            trace (SearchTrace): The recorded search.
+            speed (int, optional): Events shown per frame. Defaults to DRAWING_FREQ.
+        """
+        self.grid = grid
+        self.trace = trace
+        self.cells = [tuple(cell) for cell in trace.cells.tolist()]
+        self.kinds = trace.kinds.tolist()
+        self.speed = max(1, speed)
+        self.position = 0
+        self.paused = False
+
+    def draw(self):
+        """
+        Draws the grid and the events up to the current position.
+        """
+        draw_grid(self.grid, start=self.trace.start, goal=self.trace.goal)
+        pygame.display.update(self._paint(0, self.position))
+
+    def seek(self, position):
+        """
+        Moves the replay to a position between 0 and the length of the trace.
+        Returns:
+            list of pygame.Rect: The dirty rectangles to update on the display.
+        """
+        position = min(max(position, 0), len(self.cells))
+        if position < self.position:
+            self.position = position
+            grid_renderer = get_renderer(self.grid)
+            rects = [grid_renderer.draw_background()]
+            for cell, color in (
+                (self.trace.start, START_COLOR),
+                (self.trace.goal, GOAL_COLOR),
+            ):
+                if cell is not None:
+                    grid_renderer.paint_cells([cell], color)
+            self._paint(0, position)
+            return rects
+        rects = self._paint(self.position, position)
+        self.position = position
+        return rects
+
+    def advance(self):
+        """
+        Moves the replay forwards by one frame unless it is paused.
+        """
+        if self.paused:
+            return []
+        return self.seek(self.position + self.speed)
+
+    def handle_key(self, key):
+        """
+        Space pauses, the left and right arrows step one frame, the up and down
+        arrows double and halve the speed, and Home and End jump to the ends.
+        Returns:
+            list of pygame.Rect: The dirty rectangles to update on the display.
+        """
+        if key == pygame.K_SPACE:
+            self.paused = not self.paused
+        elif key == pygame.K_UP:
+            self.speed *= 2
+        elif key == pygame.K_DOWN:
+            self.speed = max(1, self.speed // 2)
+        elif key == pygame.K_RIGHT:
+            return self.seek(self.position + self.speed)
+        elif key == pygame.K_LEFT:
+            return self.seek(self.position - self.speed)
+        elif key == pygame.K_HOME:
+            return self.seek(0)
+        elif key == pygame.K_END:
+            return self.seek(len(self.cells))
+        return []
+
+    def run(self, fps=60):
+        """
+        Plays the replay until the left mouse button is clicked.
+        Returns:
+            bool: False if the window was closed.
+        """
+        self.draw()
+        clock = pygame.time.Clock()
+        while True:
+            rects = []
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return False
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    return True
+                if event.type == pygame.KEYDOWN:
+                    rects.extend(self.handle_key(event.key))
+            rects.extend(self.advance())
+            if rects:
+                pygame.display.update(rects)
+            clock.tick(fps)
+
+    def _paint(self, begin, end):
+        grid_renderer = get_renderer(self.grid)
+        ends = {self.trace.start, self.trace.goal}
+        rects = []
+        for cell, kind in zip(self.cells[begin:end], self.kinds[begin:end]):
+            if cell in ends:
+                continue
+            color = JUMP_POINT_COLOR if kind == JUMP else (66, 66, 66)
+            rects.extend(grid_renderer.paint_cells([cell], color))
+        return rects
 
 
 def draw_button():
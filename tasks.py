@@ -11,6 +11,28 @@ def test(ctx):
     ctx.run("pytest src -p no:warnings")
 
 
+@task
+def benchmark(
+    ctx,
+    map="src/tests/maps/ca_caverns1.map",
+    scenarios="src/tests/maps/ca_caverns1.map.scen",
+    output="benchmark_results/ca_caverns1",
+    algorithms="astar,jps",
+):
+    ctx.run(
+        f"python -u src/benchmark.py {map} {scenarios} "
+        f"--output {output} --algorithms {algorithms}"
+    )
+
+
+@task
+def perf(ctx, update=False, threshold=0.5):
+    ctx.run(
+        f"python -u src/perf_suite.py --threshold {threshold}"
+        + (" --update" if update else "")
+    )
+
+
 @task
 def lint(ctx):
     ctx.run("pylint src/")